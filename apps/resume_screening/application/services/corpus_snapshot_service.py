@@ -0,0 +1,296 @@
+"""
+Corpus snapshot service - export/import of the resume corpus as one columnar file.
+
+Bootstraps a new node without re-running the embedding pipeline: the snapshot
+holds every resume's id, float32 embedding, skills and metadata as numpy
+columns in an .npz archive (no pickling). Strings are stored Arrow-style as
+one UTF-8 byte buffer plus row offsets. Import streams the columns batch by
+batch, bulk-loading the database rows and building the vector index straight
+from the embedding matrix.
+
+Columns:
+    ids              S16 (n,)        resume UUID bytes
+    created_at       datetime64[us]  UTC
+    has_embedding    bool (n,)
+    embeddings       float32 (n, d)  zero rows where has_embedding is False
+    <name>_data      uint8           filename, file_path, raw_text, skills (JSON)
+    <name>_offsets   int64 (n + 1)
+    meta             JSON string     format, version, dimension, count, model
+"""
+import json
+import logging
+import time
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from django.conf import settings
+
+from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_vector_index
+from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+from apps.resume_screening.models import Resume
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "resume-corpus"
+SNAPSHOT_VERSION = 1
+STRING_COLUMNS = ("filename", "file_path", "raw_text", "skills")
+EXPORT_CHUNK_SIZE = 2000  # rows per DB fetch
+IMPORT_BATCH_SIZE = 2000  # rows per INSERT and per index batch
+
+
+def _grown(array: np.ndarray, rows: int) -> np.ndarray:
+    """Copy of `array` with room for `rows` rows (the new rows zeroed)."""
+    out = np.zeros((rows,) + array.shape[1:], dtype=array.dtype)
+    out[:len(array)] = array
+    return out
+
+
+class _ColumnStream:
+    """Sequential reader of one column (.npy member) of a snapshot archive."""
+    
+    def __init__(self, archive: zipfile.ZipFile, name: str):
+        self._file = archive.open(f"{name}.npy")
+        major, _ = np.lib.format.read_magic(self._file)
+        read_header = np.lib.format.read_array_header_1_0 if major == 1 else np.lib.format.read_array_header_2_0
+        shape, fortran_order, self._dtype = read_header(self._file)
+        if fortran_order:
+            raise ValueError(f"Snapshot column {name} is not C-ordered")
+        self._row_shape = shape[1:]
+        self._row_bytes = self._dtype.itemsize * int(np.prod(self._row_shape, dtype=np.int64))
+    
+    def read(self, rows: int) -> np.ndarray:
+        """The next `rows` rows."""
+        return np.frombuffer(self.read_bytes(rows * self._row_bytes), dtype=self._dtype).reshape(
+            (-1,) + self._row_shape
+        )
+    
+    def read_bytes(self, size: int) -> bytes:
+        data = self._file.read(size)
+        if len(data) != size:
+            raise ValueError("Snapshot column is truncated")
+        return data
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+def _iter_batches(
+    archive: zipfile.ZipFile,
+    count: int,
+    batch_size: int,
+    columns: Sequence[str],
+    string_columns: Sequence[str] = (),
+) -> Iterator[Dict[str, object]]:
+    """
+    Rows of a snapshot in batches of `batch_size`: per batch, an array for
+    each of `columns` and a list of str for each of `string_columns`. Only
+    one batch of every column is held in memory.
+    """
+    streams = {name: _ColumnStream(archive, name) for name in columns}
+    offsets = {name: _ColumnStream(archive, f"{name}_offsets") for name in string_columns}
+    data = {name: _ColumnStream(archive, f"{name}_data") for name in string_columns}
+    try:
+        ends = {name: int(stream.read(1)[0]) for name, stream in offsets.items()}
+        for start in range(0, count, batch_size):
+            rows = min(batch_size, count - start)
+            batch: Dict[str, object] = {name: stream.read(rows) for name, stream in streams.items()}
+            for name in string_columns:
+                bounds = [ends[name]] + offsets[name].read(rows).tolist()
+                raw = data[name].read_bytes(bounds[-1] - bounds[0])
+                batch[name] = [
+                    raw[begin - bounds[0]:end - bounds[0]].decode("utf-8")
+                    for begin, end in zip(bounds, bounds[1:])
+                ]
+                ends[name] = bounds[-1]
+            yield batch
+    finally:
+        for stream in (*streams.values(), *offsets.values(), *data.values()):
+            stream.close()
+
+
+class CorpusSnapshotService:
+    """Service for exporting and importing corpus snapshots."""
+    
+    @classmethod
+    def export_corpus(cls, path: Path, include_text: bool = True, compress: bool = False) -> Dict[str, int]:
+        """
+        Write every resume to an .npz snapshot at `path`.
+        
+        Args:
+            include_text: Store raw_text (the largest column); without it
+                imported resumes have no text preview
+            compress: zlib-compress the archive (smaller, slower to write and read)
+        
+        Returns:
+            Dict with resumes, embeddings, bytes
+        """
+        started = time.perf_counter()
+        dimension = EmbeddingService().dimension
+        # Columns are filled in place as rows stream in; grown only if rows
+        # are added during the export.
+        capacity = ResumeRepository.count()
+        ids = np.zeros((capacity, 16), dtype=np.uint8)
+        created_at = np.zeros(capacity, dtype="datetime64[us]")
+        has_embedding = np.zeros(capacity, dtype=bool)
+        embeddings = np.zeros((capacity, dimension), dtype=np.float32)
+        string_data = {name: bytearray() for name in STRING_COLUMNS}
+        string_offsets = {name: np.zeros(capacity + 1, dtype=np.int64) for name in STRING_COLUMNS}
+        
+        n = 0
+        for rid, filename, file_path, raw_text, skills, embedding, created in ResumeRepository.iter_corpus(
+            chunk_size=EXPORT_CHUNK_SIZE
+        ):
+            if n == capacity:
+                capacity = max(2 * capacity, EXPORT_CHUNK_SIZE)
+                ids, created_at, has_embedding, embeddings = (
+                    _grown(column, capacity) for column in (ids, created_at, has_embedding, embeddings)
+                )
+                string_offsets = {name: _grown(offsets, capacity + 1) for name, offsets in string_offsets.items()}
+            ids[n] = np.frombuffer(rid.bytes, dtype=np.uint8)
+            created_at[n] = created.astimezone(timezone.utc).replace(tzinfo=None) if created.tzinfo else created
+            values = {
+                "filename": filename,
+                "file_path": file_path,
+                "raw_text": raw_text if include_text else "",
+                "skills": json.dumps(skills),
+            }
+            for name, value in values.items():
+                string_data[name] += value.encode("utf-8")
+                string_offsets[name][n + 1] = len(string_data[name])
+            if embedding is not None and len(embedding) == dimension:
+                has_embedding[n] = True
+                embeddings[n] = embedding
+            n += 1
+        
+        columns = {
+            "ids": ids[:n].reshape(-1).view("S16"),
+            "created_at": created_at[:n],
+            "has_embedding": has_embedding[:n],
+            "embeddings": embeddings[:n],
+            "meta": np.array(json.dumps({
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "dimension": dimension,
+                "count": n,
+                "model": getattr(settings, 'HF_MODEL_NAME', None),
+                "include_text": include_text,
+                "exported_at": datetime.now(timezone.utc).isoformat(),
+            })),
+        }
+        for name in STRING_COLUMNS:
+            columns[f"{name}_data"] = np.frombuffer(string_data[name], dtype=np.uint8)
+            columns[f"{name}_offsets"] = string_offsets[name][:n + 1]
+        
+        path = Path(path)
+        with open(path, "wb") as f:
+            (np.savez_compressed if compress else np.savez)(f, **columns)
+        report = {
+            "resumes": n,
+            "embeddings": int(columns["has_embedding"].sum()),
+            "bytes": path.stat().st_size,
+        }
+        logger.info(f"Corpus exported to {path}: {report} in {time.perf_counter() - started:.1f}s")
+        return report
+    
+    @classmethod
+    def import_corpus(
+        cls,
+        path: Path,
+        load_database: bool = True,
+        build_index: bool = True,
+        batch_size: int = IMPORT_BATCH_SIZE,
+    ) -> Dict[str, int]:
+        """
+        Load a snapshot written by export_corpus: bulk-insert the resume rows
+        (existing ids are kept as they are) and rebuild the vector index from
+        the embedding matrix, with no model calls.
+        
+        Raises:
+            ValueError: If the file is not a corpus snapshot or its embedding
+                dimension differs from the configured model's
+        """
+        started = time.perf_counter()
+        with np.load(path, allow_pickle=False) as archive:
+            meta = cls._check_meta(archive)
+            n = int(meta["count"])
+            report = {"resumes": n, "embeddings": int(archive["has_embedding"].sum()), "indexed": 0}
+            
+            if load_database:
+                cls._load_rows(archive.zip, n, batch_size)
+            if build_index:
+                indexed = get_vector_index(dimension=int(meta["dimension"])).rebuild(
+                    cls._index_items(archive.zip, n, batch_size), chunk_size=batch_size
+                )
+                report["indexed"] = sum(indexed.values()) if isinstance(indexed, dict) else indexed
+        logger.info(f"Corpus imported from {path}: {report} in {time.perf_counter() - started:.1f}s")
+        return report
+    
+    @staticmethod
+    def _check_meta(archive) -> dict:
+        if "meta" not in archive.files:
+            raise ValueError("Not a corpus snapshot (no meta column)")
+        meta = json.loads(str(archive["meta"]))
+        if meta.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Not a corpus snapshot: format {meta.get('format')!r}")
+        if meta.get("version", 0) > SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot version {meta['version']} is newer than supported ({SNAPSHOT_VERSION})")
+        dimension = EmbeddingService().dimension
+        if int(meta["dimension"]) != dimension:
+            raise ValueError(f"Snapshot embeddings have dimension {meta['dimension']}, model has {dimension}")
+        model = getattr(settings, 'HF_MODEL_NAME', None)
+        if meta.get("model") and model and meta["model"] != model:
+            logger.warning(f"Snapshot was embedded with {meta['model']}, configured model is {model}")
+        return meta
+    
+    @staticmethod
+    def _ids(ids: np.ndarray) -> List[UUID]:
+        # Elements of an S16 array drop trailing NUL bytes; slice the raw buffer instead
+        raw = ids.tobytes()
+        return [UUID(bytes=raw[i:i + 16]) for i in range(0, len(raw), 16)]
+    
+    @staticmethod
+    def _created_at(created_at: np.ndarray) -> List[datetime]:
+        tz = timezone.utc if settings.USE_TZ else None
+        return [dt.replace(tzinfo=tz) for dt in created_at.astype("datetime64[us]").tolist()]
+    
+    @classmethod
+    def _load_rows(cls, archive: zipfile.ZipFile, count: int, batch_size: int) -> None:
+        for batch in _iter_batches(
+            archive, count, batch_size, ("ids", "created_at", "has_embedding", "embeddings"), STRING_COLUMNS
+        ):
+            ResumeRepository.bulk_insert([
+                Resume(
+                    id=rid,
+                    filename=filename,
+                    file_path=file_path,
+                    raw_text=raw_text,
+                    extracted_skills=json.loads(skills),
+                    embedding=embedding.tolist() if has_embedding else None,
+                    created_at=created,
+                )
+                for rid, created, has_embedding, embedding, filename, file_path, raw_text, skills in zip(
+                    cls._ids(batch["ids"]),
+                    cls._created_at(batch["created_at"]),
+                    batch["has_embedding"],
+                    batch["embeddings"],
+                    *(batch[name] for name in STRING_COLUMNS),
+                )
+            ], batch_size=batch_size)
+    
+    @classmethod
+    def _index_items(
+        cls,
+        archive: zipfile.ZipFile,
+        count: int,
+        batch_size: int,
+    ) -> Iterator[Tuple[UUID, np.ndarray, datetime]]:
+        for batch in _iter_batches(archive, count, batch_size, ("ids", "created_at", "has_embedding", "embeddings")):
+            ids, created_at = cls._ids(batch["ids"]), cls._created_at(batch["created_at"])
+            embeddings = batch["embeddings"]
+            for i in np.flatnonzero(batch["has_embedding"]).tolist():
+                yield ids[i], embeddings[i], created_at[i]
@@ -27,5 +27,6 @@ class EmbeddingGenerationService:
         
         ResumeRepository.update_embedding(resume_id, embedding)
         
+        # Group commit: concurrent workers share one index writer
         vector_index = get_vector_index(dimension=embedding_svc.dimension)
-        vector_index.add(resume_id, embedding)
+        vector_index.enqueue(resume_id, embedding, created_at=resume.created_at)
@@ -0,0 +1,104 @@
+"""
+Index reconciliation service - repairs drift between the vector index and the resumes table.
+
+Drift comes from embedding tasks that failed after saving (resume never
+indexed) and rows deleted without their index entry (orphans that waste
+top-k slots). Both id sets are compared as sorted arrays of 16-byte UUIDs;
+only the ids are read from the database, never the rows.
+"""
+import logging
+import time
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_vector_index, iter_chunks
+from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+
+logger = logging.getLogger(__name__)
+
+ID_FETCH_SIZE = 20000  # ids per DB fetch
+INDEX_BATCH_SIZE = 2000  # missing resumes loaded and indexed per batch
+
+
+def _not_in(values: np.ndarray, sorted_other: np.ndarray) -> np.ndarray:
+    """Elements of `values` absent from the sorted array `sorted_other`."""
+    if not len(sorted_other) or not len(values):
+        return values
+    pos = np.minimum(np.searchsorted(sorted_other, values), len(sorted_other) - 1)
+    return values[sorted_other[pos] != values]
+
+
+def _as_uuids(values: np.ndarray) -> List[UUID]:
+    # Elements of an S16 array drop trailing NUL bytes; slice the raw buffer instead
+    raw = values.tobytes()
+    return [UUID(bytes=raw[i:i + 16]) for i in range(0, len(raw), 16)]
+
+
+class IndexReconciliationService:
+    """Service for detecting and repairing index <-> database drift."""
+    
+    def __init__(self):
+        self._vector_index = get_vector_index(dimension=EmbeddingService().dimension)
+    
+    def reconcile(self, dry_run: bool = False) -> Dict[str, float]:
+        """
+        Index resumes that have a stored embedding but no index entry, and drop
+        index entries whose resume no longer exists.
+        
+        Args:
+            dry_run: Only count the drift, change nothing
+        
+        Returns:
+            Dict with indexed, resumes, missing, orphans, added, removed, seconds
+        """
+        started = time.perf_counter()
+        # Index first: a resume indexed after this snapshot can then only look
+        # missing (re-adding it is harmless), never orphaned
+        indexed = self._vector_index.indexed_ids()
+        resumes, embedded = self._db_ids()
+        missing = _not_in(embedded, indexed)
+        orphans = _not_in(indexed, resumes)
+        
+        added = removed = 0
+        if not dry_run:
+            added = self._index_missing(missing)
+            if len(orphans):
+                removed = self._vector_index.delete_batch(_as_uuids(orphans))
+        report = {
+            "indexed": len(indexed),
+            "resumes": len(resumes),
+            "missing": len(missing),
+            "orphans": len(orphans),
+            "added": added,
+            "removed": removed,
+            "seconds": round(time.perf_counter() - started, 2),
+        }
+        logger.info(f"Vector index reconciliation: {report}")
+        return report
+    
+    @staticmethod
+    def _db_ids() -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted S16 ids of all resumes and of those with a stored embedding."""
+        ids = bytearray()
+        flags = []
+        for resume_id, has_embedding in ResumeRepository.iter_ids(chunk_size=ID_FETCH_SIZE):
+            ids += resume_id.bytes
+            flags.append(has_embedding)
+        resumes = np.frombuffer(bytes(ids), dtype="S16")
+        has_embedding = np.array(flags, dtype=bool)
+        order = np.argsort(resumes, kind="stable")
+        return resumes[order], resumes[order[has_embedding[order]]]
+    
+    def _index_missing(self, missing: np.ndarray) -> int:
+        """Add the stored embeddings of `missing` in bulk. Returns how many were indexed."""
+        added = 0
+        for chunk in iter_chunks(_as_uuids(missing), INDEX_BATCH_SIZE):
+            # Rows deleted or cleared since the snapshot are simply not returned
+            rows = ResumeRepository.get_embeddings(chunk)
+            if rows:
+                self._vector_index.add_batch(rows)
+                added += len(rows)
+        return added
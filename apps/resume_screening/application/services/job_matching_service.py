@@ -0,0 +1,82 @@
+"""
+Job matching service - reverse matching of a resume to the best-fit job postings.
+
+Job embeddings live in their own vector index (see get_job_index), kept in
+sync by sync_job_index_task, so a resume is matched against every job with one
+FAISS search instead of loading each job's JSON embedding.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+
+from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_job_index, get_search_index
+from apps.resume_screening.infrastructure.repositories.job_repository import JobPostingRepository
+from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+
+TOP_JOBS = 5
+
+
+class JobMatchingService:
+    """Service for matching resumes to job postings via the job index."""
+    
+    def __init__(self):
+        self._dimension = EmbeddingService().dimension
+        self._job_index = get_job_index(dimension=self._dimension)
+    
+    def index_job(self, job_id: UUID, embedding: List[float]) -> None:
+        """Add or replace a job's vector."""
+        self._job_index.add(job_id, embedding)
+    
+    def remove_job(self, job_id: UUID) -> bool:
+        return self._job_index.delete(job_id)
+    
+    def rebuild_index(self, jobs: Iterable[Tuple[UUID, List[float]]]) -> int:
+        """Replace the job index with `jobs` ((id, embedding) pairs)."""
+        return self._job_index.rebuild(jobs)
+    
+    def find_jobs_for_resume(self, resume_id: UUID, k: int = TOP_JOBS) -> List[Dict[str, Any]]:
+        """
+        Job postings that best fit a resume. The query is the resume's indexed
+        vector (its stored embedding if it is not in the index yet), so the
+        model is never called.
+        
+        Raises:
+            ValueError: If the resume does not exist or has no embedding
+        """
+        query_embedding = get_search_index(dimension=self._dimension).get_vector(resume_id)
+        if query_embedding is None:
+            stored = ResumeRepository.get_embeddings([resume_id])
+            if not stored:
+                raise ValueError(f"Resume not found or not embedded yet: {resume_id}")
+            query_embedding = stored[0][1]
+        return self._top_jobs(query_embedding, k)
+    
+    def record_top_jobs(self, resume_id: UUID, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Find a resume's best-fit jobs and store them on the resume (Resume.top_jobs)."""
+        k = k or int(getattr(settings, 'JOB_MATCH_TOP_K', TOP_JOBS))
+        jobs = self.find_jobs_for_resume(resume_id, k)
+        ResumeRepository.update_top_jobs(
+            resume_id,
+            [{"job_id": j["job_id"], "title": j["title"], "similarity_score": j["similarity_score"]} for j in jobs],
+        )
+        return jobs
+    
+    def _top_jobs(self, query_embedding, k: int) -> List[Dict[str, Any]]:
+        results = self._job_index.search(query_embedding, k=k)
+        if not results:
+            return []
+        jobs = {str(j.id): j for j in JobPostingRepository.get_by_ids([UUID(jid) for jid, _ in results])}
+        return [
+            {
+                "job_id": jid,
+                "title": jobs[jid].title,
+                "similarity_score": round(score, 4),
+                "description_preview": (
+                    jobs[jid].description[:200] + "..." if len(jobs[jid].description) > 200 else jobs[jid].description
+                ),
+            }
+            for jid, score in results
+            if jid in jobs
+        ]
@@ -1,7 +1,10 @@
 """
 Job posting service - CRUD with embedding generation.
+Every change is reported to an optional `sync_index` callback, which keeps
+the job vector index used for resume -> jobs matching in line (the views
+pass one that queues sync_job_index_task).
 """
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from uuid import UUID, uuid4
 
 from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
@@ -11,6 +14,14 @@ from apps.resume_screening.infrastructure.repositories.job_repository import Job
 class JobPostingService:
     """Service for job posting operations."""
     
+    def __init__(self, sync_index: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            sync_index: Called with the id (str) of every job created, deleted
+                or given a new description, after the database change
+        """
+        self._sync_index = sync_index
+    
     def create_job(self, title: str, description: str) -> Dict[str, Any]:
         """
         Create job posting and generate embedding.
@@ -25,6 +36,7 @@ class JobPostingService:
             description=description,
             embedding=embedding,
         )
+        self._changed(job.id)
         return {
             "id": str(job.id),
             "title": job.title,
@@ -59,8 +71,17 @@ class JobPostingService:
             embedding_svc = EmbeddingService()
             embedding = embedding_svc.encode_job_description(description)
         JobPostingRepository.update(job_id, title=title, description=description, embedding=embedding)
+        if embedding is not None:
+            self._changed(job_id)
         job = JobPostingRepository.get_by_id(job_id)
         return {"id": str(job.id), "title": job.title, "description": job.description, "created_at": job.created_at.isoformat()}
     
     def delete_job(self, job_id: UUID) -> bool:
-        return JobPostingRepository.delete(job_id)
+        deleted = JobPostingRepository.delete(job_id)
+        if deleted:
+            self._changed(job_id)
+        return deleted
+    
+    def _changed(self, job_id: UUID) -> None:
+        if self._sync_index is not None:
+            self._sync_index(str(job_id))
@@ -1,16 +1,105 @@
 """
 Matching service - job-to-resume similarity search with Redis caching.
 """
+from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from uuid import UUID
 
+from django.utils import timezone
+
 from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
-from apps.resume_screening.infrastructure.ai.vector_index_service import get_vector_index
+from apps.resume_screening.infrastructure.ai.skill_index import SkillFilter, get_skill_index
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_search_index
 from apps.resume_screening.infrastructure.repositories.job_repository import JobPostingRepository
 from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
 from apps.resume_screening.infrastructure.services.cache_service import get_cached_search, set_cached_search
 
 TOP_K = 5
+# Time-bounded searches fetch extra candidates: shards are month-granular, the exact cut-off is applied in the DB
+TIME_BOUNDED_FETCH_FACTOR = 3
+
+
+def uploaded_since(days: Optional[int]) -> Optional[datetime]:
+    """Start of an "uploaded in the last N days" window (None = no bound)."""
+    return timezone.now() - timedelta(days=days) if days else None
+
+
+def select_skills(
+    skills_all: Optional[List[str]] = None,
+    skills_any: Optional[List[str]] = None,
+) -> Optional[SkillFilter]:
+    """Skill prefilter for a search (None = no skills requested)."""
+    return get_skill_index().select(skills_all, skills_any)
+
+
+def search_resumes(
+    vector_index,
+    query_embedding: List[float],
+    k: int,
+    since: Optional[datetime] = None,
+    skill_filter: Optional[SkillFilter] = None,
+    min_score: Optional[float] = None,
+):
+    """
+    Index search. A time bound only visits the matching shards of a
+    month-sharded index; a skill filter is applied inside FAISS.
+    With min_score, returns every resume scoring at least that (threshold
+    mode, one range search) and k only caps the number of results.
+    """
+    if skill_filter is not None and not len(skill_filter):
+        return []
+    if since is not None:
+        k *= TIME_BOUNDED_FETCH_FACTOR
+    if min_score is not None:
+        return vector_index.range_search(
+            query_embedding, min_score, max_results=k, since=since, skill_filter=skill_filter
+        )
+    return vector_index.search(query_embedding, k=k, since=since, skill_filter=skill_filter)
+
+
+def search_resumes_batch(
+    vector_index,
+    query_embeddings,
+    k: int,
+    since: Optional[datetime] = None,
+    skill_filter: Optional[SkillFilter] = None,
+) -> List[List[tuple]]:
+    """search_resumes for many queries with one matrix search (top-k only, no threshold mode)."""
+    if skill_filter is not None and not len(skill_filter):
+        return [[] for _ in range(len(query_embeddings))]
+    if since is not None:
+        k *= TIME_BOUNDED_FETCH_FACTOR
+    return vector_index.search_batch(query_embeddings, k=k, since=since, skill_filter=skill_filter)
+
+
+def hydrate_results(results: List[tuple], since: Optional[datetime] = None) -> list:
+    """Resume per (resume_id, score) result, None if deleted or uploaded before `since`."""
+    return hydrate_result_lists([results], since)[0]
+
+
+def hydrate_result_lists(result_lists: List[List[tuple]], since: Optional[datetime] = None) -> List[list]:
+    """hydrate_results for several result lists, with one query over the union of their ids."""
+    ids = {rid for results in result_lists for rid, _ in results}
+    found = {
+        str(r.id): r
+        for r in ResumeRepository.get_by_ids([UUID(rid) for rid in ids], created_since=since)
+    }
+    return [[found.get(rid) for rid, _ in results] for results in result_lists]
+
+
+def format_results(results: List[tuple], resumes: list, k: int) -> List[Dict[str, Any]]:
+    """API result dicts for (resume_id, score) results and their hydrated resumes, skipping missing ones."""
+    return [
+        {
+            "resume_id": str(r.id),
+            "filename": r.filename,
+            "similarity_score": round(score, 4),
+            "raw_text_preview": r.raw_text[:500] + "..." if len(r.raw_text) > 500 else r.raw_text,
+            "extracted_skills": r.extracted_skills or [],
+        }
+        for (_, score), r in zip(results, resumes)
+        if r is not None
+    ][:k]
 
 
 class MatchingService:
@@ -18,13 +107,17 @@ class MatchingService:
     
     def __init__(self):
         self._embedding_service = EmbeddingService()
-        self._vector_index = get_vector_index(dimension=self._embedding_service.dimension)
+        self._vector_index = get_search_index(dimension=self._embedding_service.dimension)
     
     def find_top_resumes(
         self,
         job_id: UUID,
         k: int = TOP_K,
         use_cache: bool = True,
+        uploaded_within_days: Optional[int] = None,
+        skills_all: Optional[List[str]] = None,
+        skills_any: Optional[List[str]] = None,
+        min_score: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
         """
         Find top-k resumes matching a job posting.
@@ -33,11 +126,19 @@ class MatchingService:
         Args:
             job_id: Job posting UUID
             k: Number of results (default 5)
-            use_cache: Whether to use Redis cache
+            use_cache: Whether to use Redis cache (not used for filtered or threshold searches)
+            uploaded_within_days: Only resumes uploaded in the last N days
+            skills_all: Only resumes with all of these skills
+            skills_any: Only resumes with at least one of these skills
+            min_score: Threshold mode: every resume with similarity >= min_score
+                (k becomes the maximum number of results)
             
         Returns:
             List of dicts with resume_id, filename, similarity_score, raw_text_preview
         """
+        since = uploaded_since(uploaded_within_days)
+        skill_filter = select_skills(skills_all, skills_any)
+        use_cache = use_cache and since is None and skill_filter is None and min_score is None
         if use_cache:
             cached = get_cached_search(str(job_id), k, None)
             if cached is not None:
@@ -53,24 +154,11 @@ class MatchingService:
             query_embedding = self._embedding_service.encode_job_description(job.description)
             JobPostingRepository.update_embedding(job_id, query_embedding)
         
-        results = self._vector_index.search(query_embedding, k=k)
+        results = search_resumes(self._vector_index, query_embedding, k, since, skill_filter, min_score)
         if not results:
             return []
         
-        resume_ids = [UUID(rid) for rid, _ in results]
-        resumes = ResumeRepository.get_by_ids(resume_ids)
-        
-        output = []
-        for (resume_id_str, score), resume in zip(results, resumes):
-            if resume is None:
-                continue
-            output.append({
-                "resume_id": str(resume.id),
-                "filename": resume.filename,
-                "similarity_score": round(score, 4),
-                "raw_text_preview": resume.raw_text[:500] + "..." if len(resume.raw_text) > 500 else resume.raw_text,
-                "extracted_skills": resume.extracted_skills or [],
-            })
+        output = format_results(results, hydrate_results(results, since), k)
         if use_cache and output:
             set_cached_search(str(job_id), k, output, None)
         return output
@@ -80,34 +168,56 @@ class MatchingService:
         description: str,
         k: int = TOP_K,
         use_cache: bool = True,
+        uploaded_within_days: Optional[int] = None,
+        skills_all: Optional[List[str]] = None,
+        skills_any: Optional[List[str]] = None,
+        min_score: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
         """
         Find top-k resumes matching a job description string (no stored job).
-        Results are cached when use_cache=True.
+        Results are cached when use_cache=True (except filtered searches).
+        Filters and min_score as for find_top_resumes.
         """
+        since = uploaded_since(uploaded_within_days)
+        skill_filter = select_skills(skills_all, skills_any)
+        use_cache = use_cache and since is None and skill_filter is None and min_score is None
         if use_cache:
             cached = get_cached_search(None, k, description)
             if cached is not None:
                 return cached
         query_embedding = self._embedding_service.encode_job_description(description)
-        results = self._vector_index.search(query_embedding, k=k)
+        results = search_resumes(self._vector_index, query_embedding, k, since, skill_filter, min_score)
         if not results:
             return []
         
-        resume_ids = [UUID(rid) for rid, _ in results]
-        resumes = ResumeRepository.get_by_ids(resume_ids)
-        
-        output = [
-            {
-                "resume_id": str(r.id),
-                "filename": r.filename,
-                "similarity_score": round(score, 4),
-                "raw_text_preview": r.raw_text[:500] + "..." if len(r.raw_text) > 500 else r.raw_text,
-                "extracted_skills": r.extracted_skills or [],
-            }
-            for (_, score), r in zip(results, resumes)
-            if r is not None
-        ]
+        output = format_results(results, hydrate_results(results, since), k)
         if use_cache and output:
             set_cached_search(None, k, output, description)
         return output
+    
+    def find_similar_resumes(self, resume_id: UUID, k: int = TOP_K) -> List[Dict[str, Any]]:
+        """
+        Resumes most similar to a given one ("more like this"). The query is
+        the resume's indexed vector (its stored embedding if it is not in
+        the index yet), so the model is never called.
+        
+        Raises:
+            ValueError: If the resume does not exist or has no embedding
+        """
+        query_embedding = self._vector_index.get_vector(resume_id)
+        if query_embedding is None:
+            stored = ResumeRepository.get_embeddings([resume_id])
+            if not stored:
+                raise ValueError(f"Resume not found or not embedded yet: {resume_id}")
+            query_embedding = stored[0][1]
+        
+        # One extra hit: the resume itself is its own best match
+        results = [
+            (rid, score)
+            for rid, score in self._vector_index.search(query_embedding, k=k + 1)
+            if rid != str(resume_id)
+        ][:k]
+        if not results:
+            return []
+        
+        return format_results(results, hydrate_results(results), k)
@@ -0,0 +1,81 @@
+"""
+Resume deletion service - application layer.
+Removes a resume from the vector index, the database and file storage.
+Index work that cannot run in the request (compaction, and the tombstone on
+a read-only replica) goes to callbacks; the views pass ones that queue the
+index tasks.
+"""
+import logging
+from pathlib import Path
+from typing import Callable, Optional
+from uuid import UUID
+
+from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
+from apps.resume_screening.infrastructure.ai.replication import ROLE_REPLICA, replication_role
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_vector_index
+from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeDeletionService:
+    """Service for resume deletion."""
+    
+    def __init__(
+        self,
+        remove_from_index: Optional[Callable[[str, str], None]] = None,
+        compact_index: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            remove_from_index: On a replica, called with the resume id and its
+                created_at (ISO format) to tombstone it on the publisher
+            compact_index: Called when tombstones make compaction due
+        """
+        self._remove_from_index = remove_from_index
+        self._compact_index = compact_index
+    
+    def delete_resume(self, resume_id: UUID) -> bool:
+        """
+        Delete a resume. Its vector is tombstoned first, so searches stop
+        returning it immediately (instead of spending top-k slots on a row
+        that no longer exists); the slot is reclaimed by background compaction
+        once tombstones exceed FAISS_TOMBSTONE_COMPACT_FRACTION.
+        
+        A replica's index is read-only: there the row is deleted first and
+        the tombstone queued for the publisher, and the resume leaves this
+        node's searches with the next snapshot.
+        
+        Returns:
+            False if the resume does not exist
+        """
+        resume = ResumeRepository.get_by_id(resume_id)
+        if not resume:
+            return False
+        
+        if replication_role() == ROLE_REPLICA:
+            if self._remove_from_index is None:
+                raise RuntimeError("This node's index is read-only; deleting here needs a remove_from_index callback")
+            ResumeRepository.delete(resume.id)
+            self._delete_file(resume.file_path)
+            self._remove_from_index(str(resume.id), resume.created_at.isoformat())
+            return True
+        
+        vector_index = get_vector_index(dimension=EmbeddingService().dimension)
+        vector_index.delete(resume.id, created_at=resume.created_at)
+        
+        ResumeRepository.delete(resume.id)
+        self._delete_file(resume.file_path)
+        
+        if self._compact_index is not None and vector_index.needs_compaction():
+            self._compact_index()
+        return True
+    
+    @staticmethod
+    def _delete_file(file_path: str) -> None:
+        if not file_path:
+            return
+        try:
+            Path(file_path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not delete resume file {file_path}: {e}")
@@ -1,12 +1,21 @@
 """
 Semantic search - free-text search over resumes using embeddings.
 """
-from typing import List, Dict, Any
-from uuid import UUID
+from typing import List, Dict, Any, Optional
 
+from apps.resume_screening.application.services.matching_service import (
+    format_results,
+    hydrate_result_lists,
+    hydrate_results,
+    search_resumes,
+    search_resumes_batch,
+    select_skills,
+    uploaded_since,
+)
 from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
-from apps.resume_screening.infrastructure.ai.vector_index_service import get_vector_index
-from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_search_index
+
+MAX_QUERY_CHARS = 2000
 
 
 class SemanticSearchService:
@@ -14,12 +23,15 @@ class SemanticSearchService:
     
     def __init__(self):
         self._embedding_service = EmbeddingService()
-        self._vector_index = get_vector_index(dimension=self._embedding_service.dimension)
+        self._vector_index = get_search_index(dimension=self._embedding_service.dimension)
     
     def search(
         self,
         query: str,
         k: int = 10,
+        uploaded_within_days: Optional[int] = None,
+        skills_all: Optional[List[str]] = None,
+        skills_any: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search resumes by semantic similarity to query text.
@@ -27,29 +39,53 @@ class SemanticSearchService:
         Args:
             query: Natural language search query
             k: Number of results
-            
+            uploaded_within_days: Only resumes uploaded in the last N days
+            skills_all: Only resumes with all of these skills
+            skills_any: Only resumes with at least one of these skills
+        
         Returns:
             List of dicts with resume_id, filename, similarity_score, raw_text_preview, extracted_skills
         """
         if not query or not query.strip():
             return []
         
-        query_embedding = self._embedding_service.encode_single(query.strip()[:2000])
-        results = self._vector_index.search(query_embedding, k=k)
+        since = uploaded_since(uploaded_within_days)
+        skill_filter = select_skills(skills_all, skills_any)
+        query_embedding = self._embedding_service.encode_single(query.strip()[:MAX_QUERY_CHARS])
+        results = search_resumes(self._vector_index, query_embedding, k, since, skill_filter)
         if not results:
             return []
         
-        resume_ids = [UUID(rid) for rid, _ in results]
-        resumes = ResumeRepository.get_by_ids(resume_ids)
+        return format_results(results, hydrate_results(results, since), k)
+    
+    def search_batch(
+        self,
+        queries: List[str],
+        k: int = 10,
+        uploaded_within_days: Optional[int] = None,
+        skills_all: Optional[List[str]] = None,
+        skills_any: Optional[List[str]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for many queries at once: one batched encode, one matrix index
+        search and one database query for all of them. Filters apply to every
+        query, as for search.
+        
+        Returns:
+            One result list (as returned by search) per query, in input order;
+            empty for blank queries
+        """
+        texts = [(query or "").strip()[:MAX_QUERY_CHARS] for query in queries]
+        positions = [i for i, text in enumerate(texts) if text]
+        output: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        if not positions:
+            return output
         
-        return [
-            {
-                "resume_id": str(r.id),
-                "filename": r.filename,
-                "similarity_score": round(score, 4),
-                "raw_text_preview": r.raw_text[:500] + "..." if len(r.raw_text) > 500 else r.raw_text,
-                "extracted_skills": r.extracted_skills or [],
-            }
-            for (_, score), r in zip(results, resumes)
-            if r is not None
-        ]
+        since = uploaded_since(uploaded_within_days)
+        skill_filter = select_skills(skills_all, skills_any)
+        embeddings = self._embedding_service.encode([texts[i] for i in positions])
+        result_lists = search_resumes_batch(self._vector_index, embeddings, k, since, skill_filter)
+        resume_lists = hydrate_result_lists(result_lists, since)
+        for i, results, resumes in zip(positions, result_lists, resume_lists):
+            output[i] = format_results(results, resumes, k)
+        return output
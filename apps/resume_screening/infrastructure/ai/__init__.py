@@ -2,14 +2,27 @@
 AI/ML infrastructure services.
 """
 from .embedding_service import EmbeddingService
+from .embedding_cache import EmbeddingCache, embedding_cache_stats, get_embedding_cache
 from .embedding_protocol import EmbeddingProvider
 from .sentence_transformer_provider import SentenceTransformerProvider
+from .batching_provider import BatchingEmbeddingProvider
+from .onnx_provider import OnnxEmbeddingProvider
 from .vector_index_service import VectorIndexService, get_vector_index
+from .sharded_index import ShardedVectorIndex
+from .skill_index import SkillIndex, get_skill_index
 
 __all__ = [
     'EmbeddingService',
+    'EmbeddingCache',
+    'get_embedding_cache',
+    'embedding_cache_stats',
     'EmbeddingProvider',
     'SentenceTransformerProvider',
+    'BatchingEmbeddingProvider',
+    'OnnxEmbeddingProvider',
     'VectorIndexService',
+    'ShardedVectorIndex',
     'get_vector_index',
+    'SkillIndex',
+    'get_skill_index',
 ]
@@ -0,0 +1,162 @@
+"""
+Micro-batching embedding provider - coalesces concurrent encode calls.
+
+Search and match requests each encode one short query, which leaves most of
+the model's batch throughput unused. BatchingEmbeddingProvider wraps another
+provider: concurrent callers (request threads) queue their texts, one of them
+becomes the leader, waits up to `max_wait` seconds or until `max_items` texts
+are queued, runs a single batched forward pass and hands every caller its own
+rows. No background thread is involved, so it is safe across forks (Celery,
+gunicorn). Callers arriving while a batch runs form the next batch; calls of
+`max_items` texts or more go straight to the wrapped provider.
+"""
+import threading
+import time
+from typing import List, Union
+
+import numpy as np
+
+from .embedding_protocol import EmbeddingProvider
+
+DEFAULT_MAX_ITEMS = 32
+DEFAULT_MAX_WAIT_MS = 5
+
+
+class _Request:
+    __slots__ = ("texts", "normalize", "result", "error", "done")
+    
+    def __init__(self, texts: List[str], normalize: bool):
+        self.texts = texts
+        self.normalize = normalize
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class BatchingEmbeddingProvider(EmbeddingProvider):
+    """EmbeddingProvider that merges concurrent encode calls into shared batches."""
+    
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        max_items: int = DEFAULT_MAX_ITEMS,
+        max_wait: float = DEFAULT_MAX_WAIT_MS / 1000,
+    ):
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+        self._provider = provider
+        self._max_items = max_items
+        self._max_wait = max(0.0, max_wait)
+        self._cond = threading.Condition()
+        self._pending: List[_Request] = []
+        self._pending_items = 0
+        self._leading = False
+        self._batches = 0
+        self._batched_items = 0
+    
+    @property
+    def dimension(self) -> int:
+        return self._provider.dimension
+    
+    @property
+    def model_name(self) -> str:
+        return getattr(self._provider, 'model_name', type(self._provider).__name__)
+    
+    def stats(self) -> dict:
+        """Forward passes run and texts encoded, for the mean batch size."""
+        with self._cond:
+            batches, items = self._batches, self._batched_items
+        return {"batches": batches, "items": items, "mean_batch_size": round(items / batches, 2) if batches else 0.0}
+    
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        *,
+        batch_size: int = 32,
+        show_progress: bool = False,
+        normalize: bool = True,
+    ) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        if len(texts) >= self._max_items:
+            # Bulk encodes fill a batch on their own
+            return self._provider.encode(
+                texts, batch_size=batch_size, show_progress=show_progress, normalize=normalize
+            )
+        
+        request = _Request(list(texts), normalize)
+        with self._cond:
+            self._pending.append(request)
+            self._pending_items += len(request.texts)
+            self._cond.notify_all()
+        
+        while True:
+            with self._cond:
+                while not request.done and self._leading:
+                    self._cond.wait()
+                if request.done:
+                    break
+                self._leading = True
+                self._fill()
+                batch = self._take()
+            try:
+                self._run(batch, batch_size)
+            finally:
+                with self._cond:
+                    self._leading = False
+                    self._cond.notify_all()
+        
+        if request.error is not None:
+            raise request.error
+        return request.result
+    
+    def encode_single(self, text: str, *, normalize: bool = True) -> List[float]:
+        return self.encode([text], normalize=normalize)[0].tolist()
+    
+    def _fill(self) -> None:
+        # Leader, lock held: let the batch fill for up to max_wait
+        deadline = time.monotonic() + self._max_wait
+        while self._pending_items < self._max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            self._cond.wait(remaining)
+    
+    def _take(self) -> List[_Request]:
+        # Lock held: oldest requests up to max_items texts (always at least one)
+        batch, items = [], 0
+        while self._pending and (not batch or items + len(self._pending[0].texts) <= self._max_items):
+            request = self._pending.pop(0)
+            batch.append(request)
+            items += len(request.texts)
+        self._pending_items -= items
+        return batch
+    
+    def _run(self, batch: List[_Request], batch_size: int) -> None:
+        for normalize in (True, False):
+            group = [request for request in batch if request.normalize == normalize]
+            if not group:
+                continue
+            texts = [text for request in group for text in request.texts]
+            try:
+                embeddings = self._provider.encode(
+                    texts,
+                    batch_size=max(batch_size, self._max_items),
+                    show_progress=False,
+                    normalize=normalize,
+                )
+                error = None
+            except BaseException as e:
+                embeddings, error = None, e
+            start = 0
+            with self._cond:
+                for request in group:
+                    if error is None:
+                        request.result = embeddings[start:start + len(request.texts)]
+                        start += len(request.texts)
+                    request.error = error
+                    request.done = True
+                self._batches += 1
+                self._batched_items += len(texts)
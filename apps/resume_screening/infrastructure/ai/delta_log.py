@@ -0,0 +1,107 @@
+"""
+Append-only delta log for the vector index.
+
+Each base generation of the index has one log file. Every upsert/delete is
+appended as a fixed-width binary record, so a write costs O(batch) instead of
+rewriting the whole index. Loading replays the log on top of the base; a
+checkpoint folds it into a new base generation with an empty log.
+
+Layout: 16-byte header (magic, dimension) followed by records of
+op (u1) | padding | label (i8) | resume uuid (16 bytes) | vector (f4 x dimension).
+A partially written trailing record (crash mid-append) is ignored on read and
+overwritten by the next append.
+"""
+import os
+from pathlib import Path
+from typing import List, Tuple
+from uuid import UUID
+
+import numpy as np
+
+LOG_MAGIC = b"RIDXLOG1"
+HEADER_SIZE = 16
+
+OP_UPSERT = 1
+OP_DELETE = 2
+
+
+def record_dtype(dimension: int) -> np.dtype:
+    return np.dtype([
+        ("op", "u1"),
+        ("_pad", "V7"),
+        ("label", "<i8"),
+        ("uuid", "V16"),
+        ("vector", "<f4", (dimension,)),
+    ])
+
+
+def make_records(
+    dimension: int,
+    op: int,
+    labels: np.ndarray,
+    resume_ids: List[str],
+    vectors: np.ndarray = None,
+) -> np.ndarray:
+    records = np.zeros(len(labels), dtype=record_dtype(dimension))
+    records["op"] = op
+    records["label"] = labels
+    records["uuid"] = [UUID(rid).bytes for rid in resume_ids]
+    if vectors is not None:
+        records["vector"] = vectors
+    return records
+
+
+def record_ids(records: np.ndarray) -> List[str]:
+    return [str(UUID(bytes=bytes(raw))) for raw in records["uuid"]]
+
+
+def create_log(path: Path, dimension: int) -> int:
+    """Create an empty log. Returns the offset of the first record."""
+    header = LOG_MAGIC + np.array([dimension, 0], dtype="<u4").tobytes()
+    with open(path, "wb") as f:
+        f.write(header)
+        f.flush()
+        os.fsync(f.fileno())
+    return HEADER_SIZE
+
+
+def append_records(path: Path, records: np.ndarray, offset: int) -> int:
+    """
+    Write records durably at `offset` (just past the last complete record)
+    and cut off anything after them, so a torn tail left by a crashed append
+    cannot misalign the records that follow. Returns the new end offset.
+    """
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(records.tobytes())
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def log_size(path: Path) -> int:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def read_records(path: Path, dimension: int, offset: int = HEADER_SIZE) -> Tuple[np.ndarray, int]:
+    """
+    Read complete records from `offset` to the end of the log.
+    Returns (records, offset just past the last complete record).
+    """
+    dtype = record_dtype(dimension)
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        if header[:8] != LOG_MAGIC:
+            raise ValueError(f"Not an index delta log: {path}")
+        logged_dimension = int(np.frombuffer(header[8:12], dtype="<u4")[0])
+        if logged_dimension != dimension:
+            raise ValueError(f"Delta log dimension {logged_dimension} != {dimension}")
+        f.seek(offset)
+        data = f.read()
+    count = len(data) // dtype.itemsize
+    records = np.frombuffer(data, dtype=dtype, count=count)
+    return records, offset + count * dtype.itemsize
@@ -0,0 +1,223 @@
+"""
+Content-hash embedding cache - skips the model for text it has already encoded.
+
+Keys are a SHA-256 of the model name, the normalize flag and the text with
+whitespace collapsed, so duplicate uploads, unchanged job descriptions and
+index rebuilds reuse earlier vectors. Two tiers:
+- memory: per-process LRU of the most recent vectors
+- shared: raw float32 bytes in the Django cache (Redis) or a local directory,
+  shared by every worker
+Cache failures are logged and treated as misses; they never fail an encode.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "embedding"
+BACKEND_REDIS = "redis"
+BACKEND_DISK = "disk"
+BACKEND_NONE = "none"
+DEFAULT_MEMORY_ENTRIES = 5000  # ~8 MB of 384-dim vectors
+DEFAULT_TTL = 7 * 24 * 3600  # shared tier (redis); disk entries do not expire
+DEFAULT_CACHE_DIRNAME = "embedding_cache"
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form of a text, as hashed into its cache key."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """Two-tier (process LRU + shared store) cache of embedding vectors."""
+    
+    def __init__(
+        self,
+        model_name: str,
+        dimension: int,
+        *,
+        max_entries: int = DEFAULT_MEMORY_ENTRIES,
+        backend: str = BACKEND_REDIS,
+        cache_dir: Optional[Path] = None,
+        ttl: int = DEFAULT_TTL,
+    ):
+        if backend not in (BACKEND_REDIS, BACKEND_DISK, BACKEND_NONE):
+            raise ValueError(f"Unknown embedding cache backend: {backend!r}")
+        self.model_name = model_name
+        self.dimension = dimension
+        self._max_entries = max_entries
+        self._backend = backend
+        self._dir = Path(cache_dir) if cache_dir else None
+        self._ttl = ttl
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"memory_hits": 0, "shared_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+    
+    def key(self, text: str, normalize: bool = True) -> str:
+        raw = f"{self.model_name}\0{int(normalize)}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for the keys found in either tier; the rest count as misses."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            self._counts["memory_hits"] += len(found)
+        
+        remaining = [key for key in keys if key not in found]
+        shared = self._shared_get(remaining) if remaining else {}
+        with self._lock:
+            for key, vector in shared.items():
+                self._remember(key, vector)
+            self._counts["shared_hits"] += len(shared)
+            self._counts["misses"] += len(remaining) - len(shared)
+        found.update(shared)
+        return found
+    
+    def set_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Store freshly encoded vectors in both tiers."""
+        if not vectors:
+            return
+        vectors = {key: np.asarray(vector, dtype=np.float32) for key, vector in vectors.items()}
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            self._counts["stores"] += len(vectors)
+        self._shared_set(vectors)
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters of this process since start (or reset_stats)."""
+        with self._lock:
+            counts = dict(self._counts)
+            counts["memory_entries"] = len(self._memory)
+        lookups = counts["memory_hits"] + counts["shared_hits"] + counts["misses"]
+        counts["hit_rate"] = round((counts["memory_hits"] + counts["shared_hits"]) / lookups, 4) if lookups else 0.0
+        counts["backend"] = self._backend
+        return counts
+    
+    def reset_stats(self) -> None:
+        with self._lock:
+            for name in self._counts:
+                self._counts[name] = 0
+    
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+    
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        # Caller holds the lock
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+    
+    def _decode(self, data) -> Optional[np.ndarray]:
+        if not isinstance(data, (bytes, bytearray)) or len(data) != self.dimension * 4:
+            return None
+        return np.frombuffer(data, dtype=np.float32).copy()
+    
+    def _shared_get(self, keys) -> Dict[str, np.ndarray]:
+        if self._backend == BACKEND_NONE:
+            return {}
+        found = {}
+        try:
+            if self._backend == BACKEND_REDIS:
+                stored = cache.get_many([f"{CACHE_PREFIX}:{key}" for key in keys])
+                raw = {key: stored.get(f"{CACHE_PREFIX}:{key}") for key in keys}
+            else:
+                raw = {key: self._read_file(key) for key in keys}
+            for key, data in raw.items():
+                vector = self._decode(data) if data is not None else None
+                if vector is not None:
+                    found[key] = vector
+        except Exception as e:
+            with self._lock:
+                self._counts["errors"] += 1
+            logger.warning(f"Embedding cache get failed: {e}")
+        return found
+    
+    def _shared_set(self, vectors: Dict[str, np.ndarray]) -> None:
+        if self._backend == BACKEND_NONE:
+            return
+        try:
+            if self._backend == BACKEND_REDIS:
+                cache.set_many(
+                    {f"{CACHE_PREFIX}:{key}": vector.tobytes() for key, vector in vectors.items()},
+                    timeout=self._ttl,
+                )
+            else:
+                for key, vector in vectors.items():
+                    self._write_file(key, vector.tobytes())
+        except Exception as e:
+            with self._lock:
+                self._counts["errors"] += 1
+            logger.warning(f"Embedding cache set failed: {e}")
+    
+    def _path(self, key: str) -> Path:
+        return self._dir / key[:2] / f"{key}.f32"
+    
+    def _read_file(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+    
+    def _write_file(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial vector
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str, dimension: int) -> Optional[EmbeddingCache]:
+    """
+    Process-wide cache for a model, configured from settings; None when
+    EMBEDDING_CACHE_ENABLED is off.
+    """
+    if not getattr(settings, 'EMBEDDING_CACHE_ENABLED', True):
+        return None
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(
+                model_name,
+                dimension,
+                max_entries=int(getattr(settings, 'EMBEDDING_CACHE_MEMORY_ENTRIES', DEFAULT_MEMORY_ENTRIES)),
+                backend=getattr(settings, 'EMBEDDING_CACHE_BACKEND', BACKEND_REDIS),
+                cache_dir=getattr(settings, 'EMBEDDING_CACHE_DIR', None) or DEFAULT_CACHE_DIRNAME,
+                ttl=int(getattr(settings, 'EMBEDDING_CACHE_TTL', DEFAULT_TTL)),
+            )
+        return _caches[model_name]
+
+
+def embedding_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Counters of every embedding cache in this process, by model name."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: c.stats() for name, c in caches.items()}
@@ -15,6 +15,11 @@ class EmbeddingProvider(ABC):
         """Return embedding dimension."""
         ...
     
+    @property
+    def model_name(self) -> str:
+        """Model identifier; embedding cache keys include it."""
+        return type(self).__name__
+    
     @abstractmethod
     def encode(
         self,
@@ -2,22 +2,50 @@
 Embedding service - factory and singleton access.
 Provides clean abstraction over embedding providers.
 """
-from typing import List, Union
+from typing import Any, Dict, List, Optional, Union
 
 import numpy as np
+from django.conf import settings
 
+from .batching_provider import DEFAULT_MAX_ITEMS, DEFAULT_MAX_WAIT_MS, BatchingEmbeddingProvider
+from .embedding_cache import EmbeddingCache, get_embedding_cache
 from .embedding_protocol import EmbeddingProvider
+from .onnx_provider import OnnxEmbeddingProvider
 from .sentence_transformer_provider import SentenceTransformerProvider
 
+PROVIDER_SENTENCE_TRANSFORMERS = "sentence_transformers"
+PROVIDER_ONNX = "onnx"
+
 # Default provider instance (lazy singleton)
 _default_provider: EmbeddingProvider | None = None
 
 
+def create_embedding_provider(name: str = None) -> EmbeddingProvider:
+    """Model provider named by EMBEDDING_PROVIDER: sentence_transformers (torch) or onnx."""
+    name = name or getattr(settings, 'EMBEDDING_PROVIDER', PROVIDER_SENTENCE_TRANSFORMERS)
+    if name == PROVIDER_SENTENCE_TRANSFORMERS:
+        return SentenceTransformerProvider()
+    if name == PROVIDER_ONNX:
+        return OnnxEmbeddingProvider()
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {name!r}")
+
+
 def get_embedding_provider() -> EmbeddingProvider:
-    """Get the default embedding provider (thread-safe for Celery/Django)."""
+    """
+    Get the default embedding provider (thread-safe for Celery/Django),
+    as selected by EMBEDDING_PROVIDER. With EMBEDDING_BATCHING, concurrent encodes are coalesced into shared
+    forward passes (BatchingEmbeddingProvider).
+    """
     global _default_provider
     if _default_provider is None:
-        _default_provider = SentenceTransformerProvider()
+        provider = create_embedding_provider()
+        if getattr(settings, 'EMBEDDING_BATCHING', False):
+            provider = BatchingEmbeddingProvider(
+                provider,
+                max_items=int(getattr(settings, 'EMBEDDING_BATCH_MAX_ITEMS', DEFAULT_MAX_ITEMS)),
+                max_wait=float(getattr(settings, 'EMBEDDING_BATCH_WAIT_MS', DEFAULT_MAX_WAIT_MS)) / 1000,
+            )
+        _default_provider = provider
     return _default_provider
 
 
@@ -30,16 +58,24 @@ def set_embedding_provider(provider: EmbeddingProvider) -> None:
 class EmbeddingService:
     """
     Production embedding service facade.
-    Delegates to configured EmbeddingProvider.
+    Delegates to configured EmbeddingProvider; texts already encoded by the
+    same model are served from the embedding cache (see embedding_cache).
     """
     
-    def __init__(self, provider: EmbeddingProvider = None):
+    def __init__(self, provider: EmbeddingProvider = None, cache: EmbeddingCache = None):
         self._provider = provider or get_embedding_provider()
+        self._cache = cache or get_embedding_cache(
+            getattr(self._provider, 'model_name', type(self._provider).__name__), self._provider.dimension
+        )
     
     @property
     def dimension(self) -> int:
         return self._provider.dimension
     
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Embedding cache hit/miss counters of this process (None if the cache is off)."""
+        return self._cache.stats() if self._cache is not None else None
+    
     def encode(
         self,
         texts: Union[str, List[str]],
@@ -48,16 +84,42 @@ class EmbeddingService:
         normalize: bool = True,
     ) -> np.ndarray:
         """Encode texts to normalized embeddings (for cosine similarity)."""
-        return self._provider.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress=False,
-            normalize=normalize,
-        )
+        if isinstance(texts, str):
+            texts = [texts]
+        if self._cache is None or not texts:
+            return self._provider.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress=False,
+                normalize=normalize,
+            )
+        
+        keys = [self._cache.key(text, normalize) for text in texts]
+        vectors = self._cache.get_many(keys)
+        # Each distinct uncached text is encoded once, in one provider call
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            encoded = self._provider.encode(
+                list(missing.values()),
+                batch_size=batch_size,
+                show_progress=False,
+                normalize=normalize,
+            )
+            fresh = dict(zip(missing, encoded))
+            self._cache.set_many(fresh)
+            vectors.update(fresh)
+        return np.array([vectors[key] for key in keys], dtype=np.float32).reshape(len(keys), self.dimension)
     
     def encode_single(self, text: str) -> List[float]:
         """Encode single text."""
-        return self._provider.encode_single(text, normalize=True)
+        if self._cache is None:
+            return self._provider.encode_single(text, normalize=True)
+        key = self._cache.key(text)
+        vector = self._cache.get_many([key]).get(key)
+        if vector is None:
+            vector = np.asarray(self._provider.encode_single(text, normalize=True), dtype=np.float32)
+            self._cache.set_many({key: vector})
+        return vector.tolist()
     
     def encode_resume_text(self, raw_text: str) -> List[float]:
         """
@@ -70,6 +132,11 @@ class EmbeddingService:
         truncated = raw_text[:4000].strip() if len(raw_text) > 4000 else raw_text
         return self.encode_single(truncated)
     
+    def encode_resume_texts(self, raw_texts: List[str]) -> np.ndarray:
+        """Batch version of encode_resume_text (same truncation); one row per text."""
+        truncated = [text[:4000].strip() if len(text) > 4000 else text for text in raw_texts]
+        return self.encode(truncated)
+    
     def encode_job_description(self, description: str) -> List[float]:
         """Encode job description."""
         if not description or not description.strip():
@@ -0,0 +1,58 @@
+"""
+Advisory inter-process file lock (flock) for the vector index writer.
+
+flock locks belong to the open file description, so two FileLock objects on
+the same path exclude each other across processes and across threads alike.
+On platforms without fcntl (Windows development setups) the lock only
+excludes threads of the current process.
+"""
+import logging
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class FileLock:
+    """Exclusive lock on `path`. Not reentrant."""
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd = None
+        self._thread_lock = threading.Lock()
+        if fcntl is None:
+            logger.warning("fcntl unavailable: index writes are not coordinated across processes")
+    
+    def acquire(self, blocking: bool = True) -> bool:
+        if not self._thread_lock.acquire(blocking=blocking):
+            return False
+        if fcntl is None:
+            return True
+        fd = open(self.path, 'a+b')
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            fd.close()
+            self._thread_lock.release()
+            return False
+        self._fd = fd
+        return True
+    
+    def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._fd.close()
+            self._fd = None
+        self._thread_lock.release()
+    
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.release()
@@ -0,0 +1,223 @@
+"""
+Resume UUID <-> FAISS label mapping.
+
+Labels are stable int64 ids handed out sequentially and never reused, so a
+vector keeps its label across compaction, ANN migration and reloads. Replacing
+a resume's vector gives it a fresh label; the old label becomes a tombstone in
+the index until it is compacted away.
+
+On disk the mapping is a fixed-width binary table (.npy, 32 bytes per resume in
+three contiguous columns: label, 16-byte UUID, UUID sort order) that is
+memory-mapped rather than parsed,
+so loading is O(1) and the pages are shared by every worker on the host.
+Lookups are binary searches over the label column and, via the stored sort
+order, over the UUID column. Changes since the table was written (delta log
+replay, new writes) live in a small dict overlay until the next checkpoint.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+
+def mapping_dtype(n: int) -> np.dtype:
+    """A single record whose fields are whole columns, so each column is contiguous."""
+    return np.dtype([
+        ("label", "<i8", (n,)),
+        ("uuid", "S16", (n,)),
+        ("uuid_order", "<i8", (n,)),  # row indices sorted by uuid
+    ])
+
+
+def _build_table(labels: np.ndarray, uuids: np.ndarray) -> np.ndarray:
+    by_label = np.argsort(labels, kind="stable")
+    table = np.empty((), dtype=mapping_dtype(len(labels)))
+    table["label"] = labels[by_label]
+    table["uuid"] = uuids[by_label]
+    table["uuid_order"] = np.argsort(table["uuid"], kind="stable")
+    return table
+
+
+class IdMapping:
+    """Bidirectional mapping between live resume ids and their FAISS labels."""
+    
+    def __init__(self, labels: List[int] = None, ids: List[str] = None, next_label: int = 0):
+        labels = labels or []
+        ids = ids or []
+        if len(labels) != len(ids):
+            raise ValueError("labels and ids must have the same length")
+        table = _build_table(
+            np.asarray(labels, dtype=np.int64),
+            np.array([UUID(rid).bytes for rid in ids], dtype="S16"),
+        )
+        self._init(table, next_label)
+    
+    def _init(self, table: np.ndarray, next_label: int) -> None:
+        self._table = table
+        # Plain ndarray column views (no copy); indexing a memmap field per lookup is slow
+        self._labels = np.asarray(table["label"])
+        self._uuids = np.asarray(table["uuid"])
+        self._uuid_order = np.asarray(table["uuid_order"])
+        self._removed: set[int] = set()  # table labels no longer live
+        self._added_label_to_id: Dict[int, str] = {}
+        self._added_id_to_label: Dict[str, int] = {}
+        last = int(self._labels[-1]) + 1 if len(self._labels) else 0
+        self._next_label = max(next_label, last)
+        self._version = 0  # bumped on every change
+        self._table_lookup: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    
+    @classmethod
+    def from_positions(cls, ids: List[str]) -> "IdMapping":
+        """Legacy position-ordered id list: label == position."""
+        return cls(list(range(len(ids))), list(ids), len(ids))
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "IdMapping":
+        """JSON mapping written before the binary format."""
+        return cls(data["labels"], data["ids"], data["next_label"])
+    
+    @classmethod
+    def load(cls, path: Path, next_label: int) -> "IdMapping":
+        """Memory-map a table written by save()."""
+        mapping = cls.__new__(cls)
+        mapping._init(np.load(path, mmap_mode="r"), next_label)
+        return mapping
+    
+    def save(self, path: Path) -> None:
+        """Write the live mapping (table + overlay) as a new binary table."""
+        labels = self.labels()
+        uuids = np.empty(len(labels), dtype="S16")
+        live = self._live_rows()
+        uuids[:live.sum()] = self._uuids[live]
+        uuids[live.sum():] = [UUID(rid).bytes for rid in self._added_label_to_id.values()]
+        with open(path, "wb") as f:
+            np.save(f, _build_table(labels, uuids))
+    
+    def __len__(self) -> int:
+        return len(self._labels) - len(self._removed) + len(self._added_label_to_id)
+    
+    def __contains__(self, resume_id: str) -> bool:
+        return self.label_of(resume_id) is not None
+    
+    @property
+    def next_label(self) -> int:
+        return self._next_label
+    
+    @property
+    def version(self) -> int:
+        return self._version
+    
+    def _live_rows(self) -> np.ndarray:
+        if not self._removed:
+            return np.ones(len(self._labels), dtype=bool)
+        removed = np.fromiter(self._removed, dtype=np.int64, count=len(self._removed))
+        return ~np.isin(self._labels, removed)
+    
+    def _table_label_of(self, resume_id: str) -> Optional[int]:
+        uuids = self._uuids
+        if not len(uuids):
+            return None
+        key = UUID(resume_id).bytes
+        pos = int(np.searchsorted(uuids, key, sorter=self._uuid_order))
+        if pos == len(uuids):
+            return None
+        row = int(self._uuid_order[pos])
+        if uuids[row:row + 1].tobytes() != key:
+            return None
+        label = int(self._labels[row])
+        return None if label in self._removed else label
+    
+    def label_of(self, resume_id: str) -> Optional[int]:
+        label = self._added_id_to_label.get(resume_id)
+        if label is not None:
+            return label
+        return self._table_label_of(resume_id)
+    
+    def id_of(self, label: int) -> Optional[str]:
+        rid = self._added_label_to_id.get(label)
+        if rid is not None or label in self._removed:
+            return rid
+        labels = self._labels
+        row = int(np.searchsorted(labels, label))
+        if row == len(labels) or labels[row] != label:
+            return None
+        return str(UUID(bytes=self._uuids[row:row + 1].tobytes()))
+    
+    def labels_of(self, uuids: np.ndarray) -> np.ndarray:
+        """
+        Live label of each resume in `uuids` (S16 UUID bytes), -1 where not
+        mapped. Vectorized; the base-table part is cached for the last array.
+        """
+        cached = self._table_lookup
+        if cached is not None and cached[0] is uuids:
+            out = cached[1].copy()
+        else:
+            table = self._table_labels_of(uuids)
+            self._table_lookup = (uuids, table)
+            out = table.copy()
+        if self._removed:
+            removed = np.fromiter(self._removed, dtype=np.int64, count=len(self._removed))
+            out[np.isin(out, removed)] = -1
+        if self._added_id_to_label and len(uuids):
+            added = np.array([UUID(rid).bytes for rid in self._added_id_to_label], dtype="S16")
+            added_labels = np.fromiter(
+                self._added_id_to_label.values(), dtype=np.int64, count=len(self._added_id_to_label)
+            )
+            order = np.argsort(uuids, kind="stable")
+            pos = np.minimum(np.searchsorted(uuids, added, sorter=order), len(uuids) - 1)
+            hit = uuids[order[pos]] == added
+            out[order[pos[hit]]] = added_labels[hit]
+        return out
+    
+    def _table_labels_of(self, uuids: np.ndarray) -> np.ndarray:
+        out = np.full(len(uuids), -1, dtype=np.int64)
+        if not len(self._uuids) or not len(uuids):
+            return out
+        pos = np.searchsorted(self._uuids, uuids, sorter=self._uuid_order)
+        rows = self._uuid_order[np.minimum(pos, len(self._uuids) - 1)]
+        hit = self._uuids[rows] == uuids
+        out[hit] = self._labels[rows[hit]]
+        return out
+    
+    def sorted_uuids(self) -> np.ndarray:
+        """Live resume ids as S16 UUID bytes in sorted order (vectorized, no UUID objects)."""
+        uuids = self._uuids[self._uuid_order]
+        if self._removed:
+            uuids = uuids[self._live_rows()[self._uuid_order]]
+        if self._added_id_to_label:
+            added = np.array([UUID(rid).bytes for rid in self._added_id_to_label], dtype="S16")
+            uuids = np.sort(np.concatenate([uuids, added]), kind="stable")
+        return uuids
+    
+    def labels(self) -> np.ndarray:
+        added = np.fromiter(
+            self._added_label_to_id.keys(), dtype=np.int64, count=len(self._added_label_to_id)
+        )
+        return np.concatenate([self._labels[self._live_rows()], added])
+    
+    def assign(self, resume_id: str, label: int = None) -> Tuple[int, Optional[int]]:
+        """
+        Give resume_id a fresh label (or `label`, when replaying a log).
+        Returns (new_label, previous_label or None).
+        """
+        previous = self.remove(resume_id)
+        self._version += 1
+        if label is None:
+            label = self._next_label
+        self._next_label = max(self._next_label, label + 1)
+        self._added_label_to_id[label] = resume_id
+        self._added_id_to_label[resume_id] = label
+        return label, previous
+    
+    def remove(self, resume_id: str) -> Optional[int]:
+        """Forget resume_id. Returns its label, or None if it was not mapped."""
+        self._version += 1
+        label = self._added_id_to_label.pop(resume_id, None)
+        if label is not None:
+            del self._added_label_to_id[label]
+            return label
+        label = self._table_label_of(resume_id)
+        if label is not None:
+            self._removed.add(label)
+        return label
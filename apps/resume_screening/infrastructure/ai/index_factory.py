@@ -0,0 +1,300 @@
+"""
+FAISS index construction for the resume vector index.
+
+Supported types (all inner product over L2-normalized vectors = cosine):
+- flat: exact IndexFlatIP, brute-force scan
+- ivf:  IndexIVFFlat, trained k-means coarse quantizer, probes `nprobe` lists
+- hnsw: IndexHNSWFlat graph, explores `efSearch` candidates
+- sq8:  IndexScalarQuantizer, 8-bit per dimension (4x smaller), exhaustive scan
+- pq:   IndexPQ, FAISS_PQ_M bytes per vector (384 dims: 32x smaller), exhaustive scan
+
+The quantized types are lossy; VectorIndexService re-ranks their candidates
+exactly against full-precision vectors kept on disk (see vector_store).
+
+Every index is addressed by caller-chosen int64 labels: flat, HNSW, SQ8 and
+PQ are wrapped in IndexIDMap2, IVF stores the labels natively in its inverted lists
+(IndexIDMap's remove_ids assumes the inner index renumbers, which IVF does not).
+"""
+import logging
+import math
+from typing import Optional, Tuple
+
+import faiss
+import numpy as np
+from django.conf import settings
+
+from .mmap_index import MmapFlatIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPE_FLAT = "flat"
+INDEX_TYPE_IVF = "ivf"
+INDEX_TYPE_HNSW = "hnsw"
+INDEX_TYPE_SQ8 = "sq8"
+INDEX_TYPE_PQ = "pq"
+INDEX_TYPES = (INDEX_TYPE_FLAT, INDEX_TYPE_IVF, INDEX_TYPE_HNSW, INDEX_TYPE_SQ8, INDEX_TYPE_PQ)
+QUANTIZED_TYPES = (INDEX_TYPE_SQ8, INDEX_TYPE_PQ)
+
+DEFAULT_ANN_MIN_SIZE = 50000
+DEFAULT_IVF_NPROBE = 16
+DEFAULT_HNSW_M = 32
+DEFAULT_HNSW_EF_CONSTRUCTION = 80
+DEFAULT_HNSW_EF_SEARCH = 64
+DEFAULT_PQ_M = 48
+PQ_NBITS = 8
+# k-means wants roughly 40+ training points per list / centroid
+MIN_POINTS_PER_LIST = 39
+
+
+def configured_index_type() -> str:
+    index_type = getattr(settings, 'FAISS_INDEX_TYPE', INDEX_TYPE_FLAT).lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS_INDEX_TYPE {index_type!r}; expected one of {INDEX_TYPES}")
+    return index_type
+
+
+def ann_min_size() -> int:
+    """Corpus size at which a flat index is migrated to the configured ANN type."""
+    return int(getattr(settings, 'FAISS_ANN_MIN_SIZE', DEFAULT_ANN_MIN_SIZE))
+
+
+def min_training_size(index_type: str) -> int:
+    """Vectors needed to train an index of this type (0: no training)."""
+    if index_type == INDEX_TYPE_IVF:
+        return MIN_POINTS_PER_LIST
+    if index_type == INDEX_TYPE_PQ:
+        return MIN_POINTS_PER_LIST * (1 << PQ_NBITS)
+    if index_type == INDEX_TYPE_SQ8:
+        return 1
+    return 0
+
+
+def pq_m(dimension: int) -> int:
+    """FAISS_PQ_M, lowered to the nearest divisor of `dimension`."""
+    m = max(1, min(int(getattr(settings, 'FAISS_PQ_M', DEFAULT_PQ_M)), dimension))
+    while dimension % m:
+        m -= 1
+    return m
+
+
+def _inner(index: faiss.Index) -> faiss.Index:
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def index_type_of(index: faiss.Index) -> str:
+    inner = _inner(index)
+    if isinstance(inner, faiss.IndexHNSW):
+        return INDEX_TYPE_HNSW
+    if isinstance(inner, faiss.IndexIVF):
+        return INDEX_TYPE_IVF
+    if isinstance(inner, faiss.IndexScalarQuantizer):
+        return INDEX_TYPE_SQ8
+    if isinstance(inner, faiss.IndexPQ):
+        return INDEX_TYPE_PQ
+    return INDEX_TYPE_FLAT
+
+
+def has_labels(index: faiss.Index) -> bool:
+    """False for bare flat/HNSW indexes written before labels were introduced."""
+    return isinstance(index, (faiss.IndexIDMap, faiss.IndexIVF, MmapFlatIndex))
+
+
+def ivf_nlist(n: int) -> int:
+    """FAISS_IVF_NLIST if set, else ~4*sqrt(n), capped so every list gets enough training points."""
+    nlist = int(getattr(settings, 'FAISS_IVF_NLIST', 0)) or int(4 * math.sqrt(n))
+    return max(1, min(nlist, n // MIN_POINTS_PER_LIST))
+
+
+def build_index(
+    index_type: str,
+    dimension: int,
+    vectors: Optional[np.ndarray] = None,
+    labels: Optional[np.ndarray] = None,
+) -> faiss.Index:
+    """
+    Create a labelled index of the given type and add `vectors` under `labels`
+    (default: 0..n-1). IVF, SQ8 and PQ are trained on `vectors`, so they need
+    enough of them (min_training_size); falls back to flat otherwise.
+    """
+    n = 0 if vectors is None else len(vectors)
+    if n < min_training_size(index_type):
+        logger.warning(f"Too few vectors ({n}) to train {index_type}; using flat index")
+        index_type = INDEX_TYPE_FLAT
+    
+    if index_type == INDEX_TYPE_IVF:
+        nlist = ivf_nlist(n)
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.nprobe = int(getattr(settings, 'FAISS_IVF_NPROBE', DEFAULT_IVF_NPROBE))
+        logger.info(f"Trained IVF index: nlist={nlist} on {n} vectors")
+    elif index_type == INDEX_TYPE_HNSW:
+        m = int(getattr(settings, 'FAISS_HNSW_M', DEFAULT_HNSW_M))
+        hnsw = faiss.IndexHNSWFlat(dimension, m, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = int(
+            getattr(settings, 'FAISS_HNSW_EF_CONSTRUCTION', DEFAULT_HNSW_EF_CONSTRUCTION)
+        )
+        hnsw.hnsw.efSearch = int(getattr(settings, 'FAISS_HNSW_EF_SEARCH', DEFAULT_HNSW_EF_SEARCH))
+        index = faiss.IndexIDMap2(hnsw)
+    elif index_type == INDEX_TYPE_SQ8:
+        sq = faiss.IndexScalarQuantizer(
+            dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        sq.train(vectors)
+        index = faiss.IndexIDMap2(sq)
+    elif index_type == INDEX_TYPE_PQ:
+        m = pq_m(dimension)
+        pq = faiss.IndexPQ(dimension, m, PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+        pq.train(vectors)
+        logger.info(f"Trained PQ index: m={m} on {n} vectors")
+        index = faiss.IndexIDMap2(pq)
+    else:
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+    
+    if n:
+        if labels is None:
+            labels = np.arange(n, dtype=np.int64)
+        index.add_with_ids(vectors, np.ascontiguousarray(labels, dtype=np.int64))
+    return index
+
+
+def stored_labels(index: faiss.Index) -> np.ndarray:
+    """Labels of every stored vector (live or tombstoned), without decoding vectors."""
+    if isinstance(index, MmapFlatIndex):
+        return index.labels
+    if isinstance(index, faiss.IndexIVF):
+        invlists = index.invlists
+        labels = [
+            faiss.rev_swig_ptr(invlists.get_ids(list_no), invlists.list_size(list_no)).copy()
+            for list_no in range(index.nlist)
+            if invlists.list_size(list_no)
+        ]
+        return np.concatenate(labels) if labels else np.zeros(0, dtype=np.int64)
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.vector_to_array(index.id_map).astype(np.int64)
+    return np.arange(index.ntotal, dtype=np.int64)
+
+
+def export_vectors(index: faiss.Index) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    All (labels, vectors) stored in the index, including tombstoned ones.
+    Bare legacy indexes are reported with label == position.
+    """
+    if isinstance(index, MmapFlatIndex):
+        return index.labels, np.array(index.vectors)
+    if isinstance(index, faiss.IndexIVF):
+        invlists = index.invlists
+        labels, vectors = [], []
+        for list_no in range(index.nlist):
+            size = invlists.list_size(list_no)
+            if not size:
+                continue
+            labels.append(faiss.rev_swig_ptr(invlists.get_ids(list_no), size).copy())
+            codes = faiss.rev_swig_ptr(invlists.get_codes(list_no), size * invlists.code_size)
+            vectors.append(codes.view(np.float32).reshape(size, index.d).copy())
+        if not labels:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, index.d), dtype=np.float32)
+        return np.concatenate(labels), np.concatenate(vectors)
+    
+    inner = _inner(index)
+    if inner.ntotal:
+        vectors = inner.reconstruct_n(0, inner.ntotal)
+    else:
+        vectors = np.zeros((0, inner.d), dtype=np.float32)
+    return stored_labels(index), vectors
+
+
+def reconstruct_label(index: faiss.Index, label: int) -> Optional[np.ndarray]:
+    """Stored vector of one label (lossy for sq8/pq codes), None if the index does not hold it."""
+    if isinstance(index, MmapFlatIndex):
+        rows = np.flatnonzero(index.labels == label)
+        return np.array(index.vectors[rows[0]]) if len(rows) else None
+    if isinstance(index, faiss.IndexIVF):
+        invlists = index.invlists
+        for list_no in range(index.nlist):
+            size = invlists.list_size(list_no)
+            if not size:
+                continue
+            rows = np.flatnonzero(faiss.rev_swig_ptr(invlists.get_ids(list_no), size) == label)
+            if len(rows):
+                offset = int(rows[0]) * invlists.code_size
+                codes = faiss.rev_swig_ptr(invlists.get_codes(list_no), size * invlists.code_size)
+                return codes[offset:offset + invlists.code_size].view(np.float32).copy()
+        return None
+    rows = np.flatnonzero(stored_labels(index) == label)
+    if not len(rows):
+        return None
+    return _inner(index).reconstruct(int(rows[0]))
+
+
+def remove_labels(index: faiss.Index, labels: np.ndarray) -> faiss.Index:
+    """
+    Return a copy of `index` without `labels`. The original is left untouched so
+    searches can keep using it. HNSW cannot delete, so it is rebuilt.
+    """
+    labels = np.ascontiguousarray(labels, dtype=np.int64)
+    if index_type_of(index) == INDEX_TYPE_HNSW:
+        all_labels, vectors = export_vectors(index)
+        keep = ~np.isin(all_labels, labels)
+        return build_index(INDEX_TYPE_HNSW, index.d, vectors[keep], all_labels[keep])
+    compacted = faiss.clone_index(index)
+    compacted.remove_ids(faiss.IDSelectorBatch(labels.size, faiss.swig_ptr(labels)))
+    return compacted
+
+
+def exclude_selector(labels: np.ndarray) -> faiss.IDSelector:
+    """Selector matching every label except `labels` (used to hide tombstones)."""
+    labels = np.ascontiguousarray(labels, dtype=np.int64)
+    batch = faiss.IDSelectorBatch(labels.size, faiss.swig_ptr(labels))
+    selector = faiss.IDSelectorNot(batch)
+    selector.referenced_objects = [batch]
+    return selector
+
+
+def allow_selector(bitmap: np.ndarray) -> faiss.IDSelector:
+    """Selector matching the labels set in a packed little-endian bitmap (label = bit index)."""
+    bitmap = np.ascontiguousarray(bitmap, dtype=np.uint8)
+    selector = faiss.IDSelectorBitmap(bitmap.size, faiss.swig_ptr(bitmap))
+    selector.referenced_objects = [bitmap]  # FAISS keeps only the pointer
+    return selector
+
+
+def search_params(
+    index: faiss.Index,
+    *,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    selector: Optional[faiss.IDSelector] = None,
+    k: int = 1,
+    selectivity: float = 1.0,
+) -> Optional[faiss.SearchParameters]:
+    """
+    Per-call search parameters (thread-safe: the shared index is not mutated).
+    Unset ANN knobs come from settings. Returns None for an unfiltered flat search.
+    
+    selectivity is the share of vectors a filtering selector lets through.
+    IVF probes and the HNSW beam are widened by its inverse so that k matches
+    are still reached; the selector is checked before any distance is
+    computed, so skipping non-matching vectors is cheap.
+    """
+    index_type = index_type_of(index)
+    widen = 1.0 / max(selectivity, 1e-9)
+    if index_type == INDEX_TYPE_IVF:
+        params = faiss.SearchParametersIVF()
+        nprobe = int(nprobe or getattr(settings, 'FAISS_IVF_NPROBE', DEFAULT_IVF_NPROBE))
+        params.nprobe = min(_inner(index).nlist, math.ceil(nprobe * widen))
+    elif index_type == INDEX_TYPE_HNSW:
+        params = faiss.SearchParametersHNSW()
+        ef_search = int(ef_search or getattr(settings, 'FAISS_HNSW_EF_SEARCH', DEFAULT_HNSW_EF_SEARCH))
+        if widen > 1:
+            ef_search = max(ef_search, min(index.ntotal, math.ceil(k * widen)))
+        params.efSearch = ef_search
+    elif selector is not None:
+        params = faiss.SearchParameters()
+    else:
+        return None
+    if selector is not None:
+        params.sel = selector
+    return params
@@ -0,0 +1,415 @@
+"""
+On-disk layout of one vector index directory (see vector_index_service).
+
+A base generation (index file, id mapping, optional full-precision vectors)
+plus an append-only delta log per generation, named by a small JSON manifest
+that is replaced atomically to publish a new generation:
+
+    resume_index_manifest.json       {"generation", "index_file", "ids_file", "log_file", ...}
+    resume_index.<gen>.faiss|.npy    base index (.npy raw vectors for flat, see mmap_index)
+    resume_index_ids.<gen>.npy       id mapping (see id_mapping)
+    resume_index_vectors.<gen>.npy   exact vectors of a quantized index (see vector_store)
+    resume_index.<gen>.log           delta log (see delta_log)
+
+The previous generation is kept for readers that still have it open; older
+ones are pruned. Directories written before the manifest existed hold a single
+resume_index.faiss + resume_index_ids.json, which are still read.
+"""
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from .delta_log import (
+    HEADER_SIZE,
+    OP_UPSERT,
+    append_records,
+    create_log,
+    log_size,
+    read_records,
+    record_dtype,
+    record_ids,
+)
+from .id_mapping import IdMapping
+from .index_factory import INDEX_TYPE_FLAT, build_index, export_vectors, has_labels, index_type_of
+from .mmap_index import MmapFlatIndex, load_vectors, save_vectors
+from .vector_store import FullVectorStore
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "resume_index.faiss"
+IDS_FILENAME = "resume_index_ids.json"
+MANIFEST_FILENAME = "resume_index_manifest.json"
+GENERATION_PATTERNS = (
+    "resume_index.*.faiss",
+    "resume_index.*.npy",
+    "resume_index_ids.*.npy",
+    "resume_index_ids.*.json",
+    "resume_index_vectors.*.npy",
+    "resume_index.*.log",
+)
+
+
+class DiskState(NamedTuple):
+    """A base generation with its delta log replayed on top (into `delta` when read-only)."""
+    index: faiss.Index | MmapFlatIndex
+    delta: Optional[faiss.Index]
+    full: Optional[FullVectorStore]
+    mapping: IdMapping
+    generation: int
+    log_path: Optional[Path]
+    log_offset: int
+    log_records: int
+
+
+def replay(
+    index: faiss.Index,
+    mapping: IdMapping,
+    records: np.ndarray,
+    full: Optional[FullVectorStore] = None,
+) -> set:
+    """
+    Apply delta log records to index and mapping, in log order.
+    Returns the labels that became tombstones.
+    """
+    dead = set()
+    if not len(records):
+        return dead
+    for op, label, rid in zip(records["op"].tolist(), records["label"].tolist(), record_ids(records)):
+        if op == OP_UPSERT:
+            _, previous = mapping.assign(rid, label)
+        else:
+            previous = mapping.remove(rid)
+        if previous is not None:
+            dead.add(previous)
+    upserts = records["op"] == OP_UPSERT
+    if upserts.any():
+        vectors = np.ascontiguousarray(records["vector"][upserts])
+        labels = np.ascontiguousarray(records["label"][upserts])
+        index.add_with_ids(vectors, labels)
+        if full is not None:
+            full.put(labels, vectors)
+    return dead
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class IndexStore:
+    """
+    Generations, manifest and delta log of one index directory, plus the
+    position reached in the current generation's log. Takes no locks: the
+    owning VectorIndexService calls the writing methods as the single writer.
+    """
+    
+    def __init__(self, index_dir: Path, dimension: int, read_only: bool = False):
+        self.index_dir = Path(index_dir)
+        self.dimension = dimension
+        self.read_only = read_only
+        # Loaded generation and how far its log has been applied
+        self.generation = 0
+        self.log_path: Optional[Path] = None
+        self.log_offset = 0
+        self.log_records = 0
+        # Manifest file as last seen, to notice a new generation cheaply
+        self.manifest_stamp: Optional[Tuple[int, int, int]] = None
+    
+    @property
+    def index_path(self) -> Path:
+        """Legacy single-file index (read when no manifest exists yet)."""
+        return self.index_dir / INDEX_FILENAME
+    
+    @property
+    def ids_path(self) -> Path:
+        """Legacy single-file id mapping (read when no manifest exists yet)."""
+        return self.index_dir / IDS_FILENAME
+    
+    @property
+    def manifest_path(self) -> Path:
+        return self.index_dir / MANIFEST_FILENAME
+    
+    @staticmethod
+    def generation_filenames(generation: int) -> Tuple[str, str, str]:
+        return (
+            f"resume_index.{generation}.faiss",
+            f"resume_index_ids.{generation}.npy",
+            f"resume_index.{generation}.log",
+        )
+    
+    def manifest_file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def manifest_changed(self) -> bool:
+        return self.manifest_file_stamp() != self.manifest_stamp
+    
+    def read_manifest(self) -> Optional[dict]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def write_manifest(self, manifest: dict) -> None:
+        """Publish a generation: readers see either the old or the new manifest."""
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def next_generation(self) -> int:
+        """Number for a new generation: past ours and whatever is published."""
+        manifest = self.read_manifest()
+        return max(self.generation, int(manifest["generation"]) if manifest else 0) + 1
+    
+    # Loading
+    
+    def load(self) -> DiskState:
+        """
+        Read the generation named by the manifest (or the legacy files) and
+        replay its delta log. Does not change the store's position, so it can
+        run without holding any lock (see track).
+        """
+        for _ in range(3):
+            manifest = self.read_manifest()
+            if manifest is None:
+                break
+            try:
+                index = self._read_index(self.index_dir / manifest["index_file"])
+                mapping = self._load_ids(self.index_dir / manifest["ids_file"], manifest)
+                index = self._with_labels(index)
+                delta = self.new_delta()
+                full = None
+                if manifest.get("vectors_file"):
+                    full = FullVectorStore.load(self.index_dir / manifest["vectors_file"])
+                log_path, log_offset, log_records = None, 0, 0
+                if manifest.get("log_file"):
+                    log_path = self.index_dir / manifest["log_file"]
+                    records, log_offset = read_records(log_path, self.dimension)
+                    replay(index if delta is None else delta, mapping, records, full)
+                    log_records = len(records)
+                return DiskState(
+                    index,
+                    delta,
+                    full,
+                    mapping,
+                    int(manifest["generation"]),
+                    log_path,
+                    log_offset,
+                    log_records,
+                )
+            except (FileNotFoundError, RuntimeError):
+                # A writer replaced the manifest and pruned this generation
+                # between our reads; pick up the newer one.
+                continue
+        
+        if self.index_path.exists():
+            index = faiss.read_index(str(self.index_path))
+            mapping = IdMapping()
+            if self.ids_path.exists():
+                with open(self.ids_path) as f:
+                    mapping = self._parse_ids(json.load(f))
+            return DiskState(self._with_labels(index), self.new_delta(), None, mapping, 0, None, 0, 0)
+        return DiskState(
+            build_index(INDEX_TYPE_FLAT, self.dimension),
+            self.new_delta(),
+            None,
+            IdMapping(),
+            0,
+            None,
+            0,
+            0,
+        )
+    
+    def track(self, state: DiskState) -> None:
+        """Continue from a loaded generation and the log position it was replayed to."""
+        self.generation = state.generation
+        self.log_path = state.log_path
+        self.log_offset = state.log_offset
+        self.log_records = state.log_records
+    
+    def new_delta(self) -> Optional[faiss.Index]:
+        """Read-only instances replay log records into a small heap index (the base is mapped)."""
+        return build_index(INDEX_TYPE_FLAT, self.dimension) if self.read_only else None
+    
+    def _read_index(self, path: Path) -> faiss.Index | MmapFlatIndex:
+        """Writers get a mutable FAISS index; read-only instances map the file."""
+        if path.suffix == '.npy':
+            if self.read_only:
+                return MmapFlatIndex.load(path)
+            labels, vectors = load_vectors(path)
+            return build_index(INDEX_TYPE_FLAT, self.dimension, vectors, labels)
+        if self.read_only:
+            return faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        return faiss.read_index(str(path))
+    
+    def _load_ids(self, path: Path, manifest: dict) -> IdMapping:
+        if path.suffix == '.npy':
+            return IdMapping.load(path, int(manifest["next_label"]))
+        with open(path) as f:
+            return self._parse_ids(json.load(f))
+    
+    @staticmethod
+    def _parse_ids(data) -> IdMapping:
+        # Older generations stored a plain position-ordered list of UUIDs
+        if isinstance(data, list):
+            return IdMapping.from_positions(data)
+        return IdMapping.from_dict(data)
+    
+    def _with_labels(self, index: faiss.Index) -> faiss.Index:
+        """Wrap a bare (pre-label) index so that label == former position."""
+        if has_labels(index):
+            return index
+        labels, vectors = export_vectors(index)
+        return build_index(index_type_of(index), self.dimension, vectors, labels)
+    
+    # Delta log
+    
+    def log_grew(self) -> bool:
+        """Another process appended to the current log since we last read it."""
+        return self.log_path is not None and log_size(self.log_path) > self.log_offset
+    
+    def read_log_tail(self) -> Tuple[np.ndarray, int]:
+        """Complete records past our log position, and the offset after them (see advance)."""
+        if not self.log_grew():
+            return np.zeros(0, dtype=record_dtype(self.dimension)), self.log_offset
+        return read_records(self.log_path, self.dimension, self.log_offset)
+    
+    def advance(self, offset: int, records: int) -> None:
+        """Mark log records up to `offset` as applied."""
+        self.log_offset = offset
+        self.log_records += records
+    
+    def checkpoint_due(self, records: int, checkpoint_records: int) -> bool:
+        """Appending `records` would reach the checkpoint threshold (or there is no log yet)."""
+        return self.log_path is None or self.log_records + records >= checkpoint_records
+    
+    def append(self, records: np.ndarray) -> None:
+        """Durably append records to the current log. Caller is the writer."""
+        self.advance(append_records(self.log_path, records, self.log_offset), len(records))
+    
+    # Writing generations
+    
+    def write_generation(
+        self,
+        index: faiss.Index,
+        mapping: IdMapping,
+        full: Optional[FullVectorStore],
+    ) -> dict:
+        """
+        Write index, id mapping and exact vectors as the next generation with
+        an empty delta log. Returns its manifest; nothing is published until
+        publish(). Caller is the writer and keeps the index from changing.
+        """
+        generation = self.next_generation()
+        index_file, ids_file, log_file = self.generation_filenames(generation)
+        if index_type_of(index) == INDEX_TYPE_FLAT:
+            # Raw vectors, so read-only instances can map them (see mmap_index)
+            index_file = f"resume_index.{generation}.npy"
+            save_vectors(self.index_dir / index_file, *export_vectors(index))
+        else:
+            faiss.write_index(index, str(self.index_dir / index_file))
+        mapping.save(self.index_dir / ids_file)
+        vectors_file = None
+        if full is not None:
+            vectors_file = f"resume_index_vectors.{generation}.npy"
+            full.save(self.index_dir / vectors_file, mapping.labels())
+        create_log(self.index_dir / log_file, self.dimension)
+        return {
+            "generation": generation,
+            "index_file": index_file,
+            "ids_file": ids_file,
+            "log_file": log_file,
+            "vectors_file": vectors_file,
+            "next_label": mapping.next_label,
+            "count": len(mapping),
+        }
+    
+    def open_tables(self, manifest: dict) -> Tuple[IdMapping, Optional[FullVectorStore]]:
+        """Memory-mapped id mapping and exact vectors of a written generation."""
+        mapping = IdMapping.load(self.index_dir / manifest["ids_file"], int(manifest["next_label"]))
+        full = FullVectorStore.load(self.index_dir / manifest["vectors_file"]) if manifest.get("vectors_file") else None
+        return mapping, full
+    
+    def publish(self, manifest: dict) -> None:
+        """
+        Make a written generation (with its empty log) the current one by
+        replacing the manifest, then prune all but it and its predecessor.
+        """
+        self.write_manifest(manifest)
+        self.generation = int(manifest["generation"])
+        self.log_path = self.index_dir / manifest["log_file"]
+        self.log_offset = HEADER_SIZE
+        self.log_records = 0
+        self.manifest_stamp = self.manifest_file_stamp()
+        self.prune(keep_from=self.generation - 1)
+    
+    def adopt_files(self, src_dir: Path, manifest: dict) -> int:
+        """
+        Move the generation named by `manifest` (files in src_dir, on the same
+        filesystem) into index_dir as the next generation and publish its
+        manifest. Renames only, so no data is rewritten. Without a log file the
+        new generation starts with an empty log. Extra manifest keys are kept.
+        Returns the new generation number; load() it to continue from it.
+        Caller is the writer.
+        """
+        generation = self.next_generation()
+        _, ids_file, log_file = self.generation_filenames(generation)
+        # .faiss, or .npy for a flat index
+        index_file = f"resume_index.{generation}{Path(manifest['index_file']).suffix}"
+        vectors_file = f"resume_index_vectors.{generation}.npy" if manifest.get("vectors_file") else None
+        renames = [
+            (manifest["index_file"], index_file),
+            (manifest["ids_file"], ids_file),
+        ]
+        if vectors_file:
+            renames.append((manifest["vectors_file"], vectors_file))
+        if manifest.get("log_file"):
+            renames.append((manifest["log_file"], log_file))
+        else:
+            create_log(self.index_dir / log_file, self.dimension)
+        for src, dst in renames:
+            os.replace(src_dir / src, self.index_dir / dst)
+        
+        self.write_manifest({
+            **manifest,
+            "generation": generation,
+            "index_file": index_file,
+            "ids_file": ids_file,
+            "log_file": log_file,
+            "vectors_file": vectors_file,
+        })
+        return generation
+    
+    def link_generation(self, manifest: dict, dest_dir: Path) -> None:
+        """Place a generation's base files in dest_dir (hard links when possible)."""
+        for key in ("index_file", "ids_file", "vectors_file"):
+            if manifest.get(key):
+                _link_or_copy(self.index_dir / manifest[key], dest_dir / manifest[key])
+    
+    def prune(self, keep_from: int) -> None:
+        """Delete the files of generations older than keep_from."""
+        for pattern in GENERATION_PATTERNS:
+            for path in self.index_dir.glob(pattern):
+                try:
+                    gen = int(path.name.split('.')[1])
+                except (IndexError, ValueError):
+                    continue
+                if gen < keep_from:
+                    try:
+                        path.unlink(missing_ok=True)
+                    except OSError:
+                        # Still memory-mapped elsewhere (Windows); retried next checkpoint
+                        pass
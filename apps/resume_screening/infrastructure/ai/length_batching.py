@@ -0,0 +1,37 @@
+"""
+Length-bucketed batching for bulk encodes.
+
+A batch is padded to its longest sequence, so mixing short job titles with
+4000-character resumes spends most of the forward pass on padding. Providers
+sort inputs by token length, encode runs of similar length together and
+scatter the rows back to input order.
+"""
+from typing import List, Sequence
+
+import numpy as np
+
+
+def length_batches(lengths: Sequence[int], batch_size: int, max_tokens: int = 0) -> List[np.ndarray]:
+    """
+    Split input positions into batches of similar token length, longest first.
+    
+    Args:
+        lengths: Token count of each input
+        batch_size: Inputs per batch
+        max_tokens: If > 0, size each batch by a padded-token budget instead
+            (inputs x longest length <= max_tokens, at least one input), so
+            short texts share big batches and long ones small batches
+    
+    Returns:
+        Arrays of input positions, one per batch; together a permutation of
+        range(len(lengths))
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    order = np.argsort(-lengths, kind="stable")
+    batches, start = [], 0
+    while start < len(order):
+        # Sorted descending: the first input is the batch's longest
+        size = max(1, max_tokens // max(int(lengths[order[start]]), 1)) if max_tokens > 0 else batch_size
+        batches.append(order[start:start + size])
+        start += size
+    return batches
@@ -0,0 +1,97 @@
+"""
+Read-only exact inner-product index over a memory-mapped float32 vector file.
+
+FAISS cannot memory-map a flat index, so flat generations are persisted as a
+raw vector table (.npy: labels + float32 vectors, contiguous columns) instead
+of a .faiss file. Serving processes map it read-only, so every web worker on a
+host shares one page-cache copy; writers load it into a regular FAISS index.
+"""
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def vectors_dtype(n: int, dimension: int) -> np.dtype:
+    return np.dtype([
+        ("labels", "<i8", (n,)),
+        ("vectors", "<f4", (n, dimension)),
+    ])
+
+
+def save_vectors(path: Path, labels: np.ndarray, vectors: np.ndarray) -> None:
+    table = np.empty((), dtype=vectors_dtype(len(labels), vectors.shape[1]))
+    table["labels"] = labels
+    table["vectors"] = vectors
+    with open(path, "wb") as f:
+        np.save(f, table)
+
+
+def load_vectors(path: Path, mmap: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """(labels, vectors) from a file written by save_vectors; views into the map if mmap."""
+    table = np.load(path, mmap_mode="r" if mmap else None)
+    return np.asarray(table["labels"]), np.asarray(table["vectors"])
+
+
+class MmapFlatIndex:
+    """Brute-force search (one BLAS matrix-vector product) over mapped vectors."""
+    
+    def __init__(self, labels: np.ndarray, vectors: np.ndarray):
+        self.labels = labels
+        self.vectors = vectors
+        self.ntotal = len(labels)
+        self.d = vectors.shape[1]
+    
+    @classmethod
+    def load(cls, path: Path) -> "MmapFlatIndex":
+        return cls(*load_vectors(path, mmap=True))
+    
+    def row_mask(self, labels: np.ndarray) -> Optional[np.ndarray]:
+        """Boolean mask of the rows holding `labels` (None if there are none)."""
+        if not len(labels):
+            return None
+        mask = np.isin(self.labels, labels)
+        return mask if mask.any() else None
+    
+    def search(
+        self,
+        x: np.ndarray,
+        k: int,
+        excluded: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """FAISS-shaped (scores, labels) for each query row, padded with -1."""
+        nq = len(x)
+        out_scores = np.full((nq, k), -np.inf, dtype=np.float32)
+        out_labels = np.full((nq, k), -1, dtype=np.int64)
+        if not self.ntotal:
+            return out_scores, out_labels
+        scores = x @ self.vectors.T
+        if excluded is not None:
+            scores[:, excluded] = -np.inf
+        top = min(k, self.ntotal)
+        for i in range(nq):
+            row = scores[i]
+            idx = np.argpartition(-row, top - 1)[:top] if top < self.ntotal else np.arange(top)
+            idx = idx[np.argsort(-row[idx])]
+            idx = idx[np.isfinite(row[idx])]
+            out_scores[i, :len(idx)] = row[idx]
+            out_labels[i, :len(idx)] = self.labels[idx]
+        return out_scores, out_labels
+    
+    def range_search(
+        self,
+        x: np.ndarray,
+        min_score: float,
+        excluded: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """FAISS-shaped (lims, scores, labels) of every row scoring >= min_score."""
+        if not self.ntotal:
+            return np.zeros(len(x) + 1, dtype=np.int64), np.zeros(0, np.float32), np.zeros(0, np.int64)
+        scores = x @ self.vectors.T
+        hits = scores >= min_score
+        if excluded is not None:
+            hits[:, excluded] = False
+        rows, cols = np.nonzero(hits)
+        lims = np.zeros(len(x) + 1, dtype=np.int64)
+        lims[1:] = np.cumsum(np.bincount(rows, minlength=len(x)))
+        return lims, scores[rows, cols], self.labels[cols]
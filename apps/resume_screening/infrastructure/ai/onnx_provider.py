@@ -0,0 +1,223 @@
+"""
+ONNX Runtime embedding provider - CPU inference without PyTorch.
+
+Runs the same model as SentenceTransformerProvider (all-MiniLM-L6-v2), exported
+to ONNX and optionally dynamically quantized to int8 weights, with the
+sentence-transformers pipeline reproduced in numpy: tokenize, transformer,
+mean pooling over the attention mask, L2 normalization. Import and load take a
+fraction of the torch provider's, and batches run 2-3x faster on CPU.
+
+Export once with `python manage.py onnx_embedding_model export` (needs torch
+and transformers on that machine only); serving needs onnxruntime and
+tokenizers. Selected by EMBEDDING_PROVIDER=onnx.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+from django.conf import settings
+
+from .embedding_protocol import EmbeddingProvider
+from .length_batching import length_batches
+from .sentence_transformer_provider import DEFAULT_MAX_SEQ_LENGTH, MINILM_DIMENSION
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILENAME = "model.onnx"
+QUANTIZED_MODEL_FILENAME = "model_int8.onnx"
+TOKENIZER_FILENAME = "tokenizer.json"
+EXPORT_MANIFEST = "export.json"
+ONNX_OPSET = 14
+INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+
+
+def export_onnx_model(
+    model_name: str,
+    output_dir: Path,
+    *,
+    quantize: bool = True,
+    cache_dir: str = None,
+    max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH,
+) -> Path:
+    """
+    Export a HuggingFace sentence-transformers model to `output_dir`: the
+    fp32 ONNX graph, an int8 dynamically quantized copy (if `quantize`), the
+    fast tokenizer and a manifest. Requires torch, transformers and onnx.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=cache_dir)
+    model = AutoModel.from_pretrained(model_name, cache_dir=cache_dir).eval()
+    tokenizer.save_pretrained(str(output_dir))
+    
+    sample = tokenizer(["an example resume sentence"], return_tensors="pt")
+    input_names = [name for name in INPUT_NAMES if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(output_dir / MODEL_FILENAME),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+        )
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(
+            str(output_dir / MODEL_FILENAME),
+            str(output_dir / QUANTIZED_MODEL_FILENAME),
+            weight_type=QuantType.QInt8,
+        )
+    
+    with open(output_dir / EXPORT_MANIFEST, "w") as f:
+        json.dump({
+            "model_name": model_name,
+            "dimension": int(model.config.hidden_size),
+            "max_seq_length": max_seq_length,
+            "opset": ONNX_OPSET,
+            "quantized": quantize,
+        }, f, indent=2)
+    logger.info(f"Exported {model_name} to ONNX in {output_dir}")
+    return output_dir
+
+
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    """ONNX Runtime embedding provider (fp32 or int8) for an exported model."""
+    
+    def __init__(
+        self,
+        model_dir: str = None,
+        quantized: bool = None,
+        threads: int = None,
+        max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH,
+        length_bucketing: bool = None,
+        max_batch_tokens: int = None,
+    ):
+        self._model_dir = Path(model_dir or getattr(
+            settings, 'EMBEDDING_ONNX_DIR', Path(getattr(settings, 'HF_MODEL_CACHE_DIR', 'models_cache')) / 'onnx'
+        ))
+        self._quantized = getattr(settings, 'EMBEDDING_ONNX_QUANTIZED', True) if quantized is None else quantized
+        self._threads = int(getattr(settings, 'EMBEDDING_ONNX_THREADS', 0) if threads is None else threads)
+        self._max_seq_length = max_seq_length
+        self._length_bucketing = (
+            getattr(settings, 'EMBEDDING_LENGTH_BUCKETING', True) if length_bucketing is None else length_bucketing
+        )
+        self._max_batch_tokens = int(
+            getattr(settings, 'EMBEDDING_MAX_BATCH_TOKENS', 0) if max_batch_tokens is None else max_batch_tokens
+        )
+        self._session = None
+        self._tokenizer = None
+        self._pad_id = 0
+        self._input_names: List[str] = []
+        self._manifest = None
+    
+    @property
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            path = self._model_dir / EXPORT_MANIFEST
+            if not path.exists():
+                raise RuntimeError(
+                    f"No exported ONNX model in {self._model_dir}; "
+                    "run `python manage.py onnx_embedding_model export`"
+                )
+            with open(path) as f:
+                self._manifest = json.load(f)
+        return self._manifest
+    
+    @property
+    def session(self):
+        """Lazy-load the ONNX session and tokenizer."""
+        if self._session is None:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+            
+            filename = QUANTIZED_MODEL_FILENAME if self._quantized else MODEL_FILENAME
+            model_path = self._model_dir / filename
+            if self._quantized and not model_path.exists():
+                raise RuntimeError(f"{model_path} not found; export with quantization or set EMBEDDING_ONNX_QUANTIZED=False")
+            max_length = min(self._max_seq_length, int(self.manifest.get("max_seq_length", self._max_seq_length)))
+            tokenizer = Tokenizer.from_file(str(self._model_dir / TOKENIZER_FILENAME))
+            tokenizer.enable_truncation(max_length=max_length)
+            tokenizer.no_padding()  # padded per batch, see _encode_batch
+            
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self._threads:
+                options.intra_op_num_threads = self._threads
+            session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+            self._input_names = [i.name for i in session.get_inputs()]
+            self._tokenizer = tokenizer
+            self._pad_id = tokenizer.token_to_id("[PAD]") or 0
+            self._session = session
+            logger.info(f"Loaded ONNX embedding model: {model_path}")
+        return self._session
+    
+    @property
+    def dimension(self) -> int:
+        return int(self.manifest.get("dimension", MINILM_DIMENSION))
+    
+    @property
+    def model_name(self) -> str:
+        # fp32 and int8 vectors differ slightly, so they are cached apart
+        return f"{self.manifest['model_name']}+onnx{'-int8' if self._quantized else ''}"
+    
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        *,
+        batch_size: int = 32,
+        show_progress: bool = False,
+        normalize: bool = True,
+    ) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        session = self.session
+        encodings = self._tokenizer.encode_batch(list(texts))
+        if self._length_bucketing:
+            batches = length_batches([len(e.ids) for e in encodings], batch_size, self._max_batch_tokens)
+        else:
+            batches = [np.arange(start, min(start + batch_size, len(texts))) for start in range(0, len(texts), batch_size)]
+        output = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for batch in batches:
+            output[batch] = self._encode_batch(session, [encodings[i] for i in batch])
+        if normalize:
+            output /= np.maximum(np.linalg.norm(output, axis=1, keepdims=True), 1e-12)
+        return output
+    
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        """Tokens per text after truncation (special tokens included)."""
+        self.session  # loads the tokenizer
+        return [len(e.ids) for e in self._tokenizer.encode_batch(list(texts))]
+    
+    def encode_single(self, text: str, *, normalize: bool = True) -> List[float]:
+        arr = self.encode([text], normalize=normalize)
+        return arr[0].tolist()
+    
+    def _encode_batch(self, session, encodings: list) -> np.ndarray:
+        # Pad to the longest sequence of this batch only
+        width = max(len(e.ids) for e in encodings)
+        ids = np.full((len(encodings), width), self._pad_id, dtype=np.int64)
+        mask = np.zeros((len(encodings), width), dtype=np.int64)
+        type_ids = np.zeros((len(encodings), width), dtype=np.int64)
+        for row, e in enumerate(encodings):
+            ids[row, :len(e.ids)] = e.ids
+            mask[row, :len(e.ids)] = 1
+            type_ids[row, :len(e.ids)] = e.type_ids
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = type_ids
+        hidden = session.run(["last_hidden_state"], feeds)[0]
+        # Mean pooling over real (unpadded) tokens, as sentence-transformers does
+        weights = mask[:, :, None].astype(np.float32)
+        return (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
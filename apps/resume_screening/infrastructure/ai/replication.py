@@ -0,0 +1,304 @@
+"""
+Multi-node index replication through a shared snapshot directory.
+
+Each host serves its own local index dir, so without replication the hosts'
+indexes drift apart. With FAISS_REPLICATION_DIR set, one designated writer
+node (FAISS_REPLICATION_ROLE=publisher) publishes versioned snapshots of its
+index, and reader nodes (FAISS_REPLICATION_ROLE=replica) install them:
+
+    <FAISS_REPLICATION_DIR>/LATEST.json                   {"version", "snapshot", "manifest_sha256"}
+    <FAISS_REPLICATION_DIR>/snapshots/<version>/           index files + snapshot.json
+    <FAISS_REPLICATION_DIR>/shards/<key>/...               same layout per shard
+
+A snapshot is a complete generation (see VectorIndexService.export_generation)
+with the SHA-256 and size of every file in snapshot.json; LATEST.json carries
+the checksum of snapshot.json and is replaced atomically, after the snapshot
+directory is complete. Replicas poll LATEST.json every
+FAISS_REPLICATION_POLL_INTERVAL seconds (in the background, from the search
+path), copy a newer snapshot into their index dir while verifying every file,
+and install it as their next local generation. Every worker on the host then
+hot-swaps it like any new generation. A snapshot that fails verification is
+discarded and the current index keeps serving.
+
+Replica indexes reject writes: index on the publisher and let it replicate.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    from .vector_index_service import VectorIndexService
+
+logger = logging.getLogger(__name__)
+
+ROLE_PUBLISHER = "publisher"
+ROLE_REPLICA = "replica"
+ROLES = (ROLE_PUBLISHER, ROLE_REPLICA)
+LATEST_FILENAME = "LATEST.json"
+SNAPSHOT_MANIFEST = "snapshot.json"
+SNAPSHOTS_DIRNAME = "snapshots"
+DEFAULT_POLL_INTERVAL = 10.0  # seconds between LATEST.json polls on replicas
+DEFAULT_KEEP_SNAPSHOTS = 3
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def replication_role() -> Optional[str]:
+    """Configured role (FAISS_REPLICATION_ROLE), or None when replication is off."""
+    if not getattr(settings, 'FAISS_REPLICATION_DIR', ''):
+        return None
+    role = (getattr(settings, 'FAISS_REPLICATION_ROLE', '') or '').strip().lower()
+    if role in ('', 'none'):
+        return None
+    if role not in ROLES:
+        raise ValueError(f"FAISS_REPLICATION_ROLE must be one of none, {', '.join(ROLES)}; got {role!r}")
+    return role
+
+
+def shared_dir_for(index_dir: Path) -> Path:
+    """The shared directory mirroring a local index dir (shards map to shards/<key>)."""
+    base = Path(settings.FAISS_REPLICATION_DIR)
+    try:
+        return base / Path(index_dir).resolve().relative_to(Path(settings.FAISS_INDEX_PATH).resolve())
+    except ValueError:
+        return base
+
+
+def replica_source_dir(index_dir: Path) -> Optional[Path]:
+    """Where a replica pulls index_dir from; None unless this node is a replica."""
+    if replication_role() != ROLE_REPLICA:
+        return None
+    return shared_dir_for(index_dir)
+
+
+def _copy_with_digest(src: Path, dst: Path) -> Tuple[str, int]:
+    """Copy src to dst, returning the SHA-256 and size of the bytes copied."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        while True:
+            block = fin.read(COPY_BUFFER_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            fout.write(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def _read_latest(shared_dir: Path) -> Optional[dict]:
+    try:
+        with open(shared_dir / LATEST_FILENAME) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_json_atomic(path: Path, data: dict) -> bytes:
+    payload = json.dumps(data, indent=1).encode()
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return payload
+
+
+class SnapshotPublisher:
+    """Publishes a writer's index generations as versioned, checksummed snapshots."""
+    
+    def __init__(self, shared_dir: Path, keep: int = None):
+        self.shared_dir = Path(shared_dir)
+        self.keep = max(1, keep or int(getattr(settings, 'FAISS_REPLICATION_KEEP', DEFAULT_KEEP_SNAPSHOTS)))
+    
+    def publish(self, index: "VectorIndexService") -> Optional[int]:
+        """
+        Publish the index's current state. Returns the new snapshot version,
+        or None when the latest snapshot already holds this generation.
+        """
+        started = time.perf_counter()
+        snapshots_dir = self.shared_dir / SNAPSHOTS_DIRNAME
+        snapshots_dir.mkdir(parents=True, exist_ok=True)
+        staging_dir = index.index_dir / f"publish.{os.getpid()}"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        try:
+            manifest = index.export_generation(staging_dir)
+            latest = _read_latest(self.shared_dir)
+            if latest and latest.get("source_generation") == manifest["generation"]:
+                return None
+            version = (latest["version"] if latest else 0) + 1
+            name = f"{version:012d}"
+            tmp_dir = snapshots_dir / f".{name}.{os.getpid()}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            tmp_dir.mkdir()
+            files = {}
+            for key in ("index_file", "ids_file", "vectors_file"):
+                if manifest.get(key):
+                    sha256, size = _copy_with_digest(staging_dir / manifest[key], tmp_dir / manifest[key])
+                    files[manifest[key]] = {"sha256": sha256, "size": size}
+            payload = _write_json_atomic(tmp_dir / SNAPSHOT_MANIFEST, {
+                "version": version,
+                "dimension": index.dimension,
+                "manifest": manifest,
+                "files": files,
+                "published_at": datetime.now(timezone.utc).isoformat(),
+            })
+            os.replace(tmp_dir, snapshots_dir / name)
+            _write_json_atomic(self.shared_dir / LATEST_FILENAME, {
+                "version": version,
+                "snapshot": f"{SNAPSHOTS_DIRNAME}/{name}",
+                "manifest_sha256": hashlib.sha256(payload).hexdigest(),
+                "source_generation": manifest["generation"],
+            })
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        self._prune(snapshots_dir, version)
+        logger.info(
+            f"Index snapshot {version} published to {self.shared_dir}: {manifest.get('count')} resumes, "
+            f"{sum(f['size'] for f in files.values()) / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s"
+        )
+        return version
+    
+    def _prune(self, snapshots_dir: Path, latest: int) -> None:
+        """Keep the newest `keep` snapshots (replicas may still be copying the previous one)."""
+        for path in snapshots_dir.iterdir():
+            if path.name.isdigit() and int(path.name) <= latest - self.keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+class SnapshotReplica:
+    """Pulls newer snapshots from the shared directory into a replica's index."""
+    
+    def __init__(self, shared_dir: Path, poll_interval: float = None):
+        self.shared_dir = Path(shared_dir)
+        if poll_interval is None:
+            poll_interval = getattr(settings, 'FAISS_REPLICATION_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)
+        self.poll_interval = poll_interval
+        self._next_poll = 0.0
+        self._sync_lock = threading.Lock()
+    
+    def maybe_sync(self, index: "VectorIndexService", background: bool = True) -> None:
+        """Poll for a newer snapshot at most every poll_interval; never raises."""
+        now = time.monotonic()
+        if now < self._next_poll or not self._sync_lock.acquire(blocking=False):
+            return
+        self._next_poll = now + self.poll_interval
+        if background:
+            threading.Thread(target=self._sync_and_release, args=(index,), daemon=True).start()
+        else:
+            self._sync_and_release(index)
+    
+    def _sync_and_release(self, index: "VectorIndexService") -> None:
+        try:
+            self.sync(index)
+        except Exception:
+            logger.exception(f"Index replication from {self.shared_dir} failed; keeping the current index")
+        finally:
+            self._sync_lock.release()
+    
+    def sync(self, index: "VectorIndexService") -> Optional[int]:
+        """
+        Install the latest snapshot if it is newer than the local one.
+        Returns the installed version, or None if already up to date.
+        
+        Raises:
+            ValueError: If the snapshot fails verification (nothing is installed)
+        """
+        latest = _read_latest(self.shared_dir)
+        if latest is None:
+            return None
+        installed = []
+        
+        def fetch(staging_dir: Path, current: Optional[dict]) -> Optional[dict]:
+            # Re-checked under the index dir lock: another worker may have installed it
+            if current and current.get("replica_version", 0) >= latest["version"]:
+                return None
+            manifest = self._fetch(latest, staging_dir, index.dimension)
+            installed.append(latest["version"])
+            return {**manifest, "replica_version": latest["version"]}
+        
+        started = time.perf_counter()
+        if not index.replace_generation(fetch):
+            return None
+        logger.info(
+            f"Index snapshot {latest['version']} installed from {self.shared_dir} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return installed[0]
+    
+    def _fetch(self, latest: dict, staging_dir: Path, dimension: int) -> dict:
+        """Copy the snapshot's files into staging_dir, verifying each. Returns its index manifest."""
+        snapshot_dir = self.shared_dir / latest["snapshot"]
+        with open(snapshot_dir / SNAPSHOT_MANIFEST, "rb") as f:
+            payload = f.read()
+        if hashlib.sha256(payload).hexdigest() != latest["manifest_sha256"]:
+            raise ValueError(f"Snapshot {latest['version']}: {SNAPSHOT_MANIFEST} checksum mismatch")
+        snapshot = json.loads(payload)
+        if snapshot["dimension"] != dimension:
+            raise ValueError(f"Snapshot {latest['version']}: dimension {snapshot['dimension']} != {dimension}")
+        for name, expected in snapshot["files"].items():
+            sha256, size = _copy_with_digest(snapshot_dir / name, staging_dir / name)
+            if size != expected["size"] or sha256 != expected["sha256"]:
+                raise ValueError(f"Snapshot {latest['version']}: {name} checksum mismatch")
+        return snapshot["manifest"]
+
+
+def _services(index) -> List[Tuple[str, "VectorIndexService"]]:
+    """(shared dir, service) for an index or for each shard of a sharded index."""
+    if hasattr(index, "shard_keys"):
+        services = [index.shard(key) for key in index.shard_keys()]
+    else:
+        services = [index]
+    return [(str(shared_dir_for(service.index_dir)), service) for service in services]
+
+
+def publish_snapshots(index) -> Dict[str, Optional[int]]:
+    """
+    Publish the index (every shard of a sharded one) to FAISS_REPLICATION_DIR.
+    Returns the new snapshot version per shared dir, None where unchanged.
+    """
+    if not getattr(settings, 'FAISS_REPLICATION_DIR', ''):
+        raise RuntimeError("FAISS_REPLICATION_DIR is not set")
+    return {
+        shared_dir: SnapshotPublisher(Path(shared_dir)).publish(service)
+        for shared_dir, service in _services(index)
+    }
+
+
+def sync_snapshots(index) -> Dict[str, Optional[int]]:
+    """
+    Install the latest snapshot of the index (every shard of a sharded one)
+    now. Returns the installed version per shared dir, None where current.
+    """
+    if not getattr(settings, 'FAISS_REPLICATION_DIR', ''):
+        raise RuntimeError("FAISS_REPLICATION_DIR is not set")
+    return {
+        shared_dir: SnapshotReplica(Path(shared_dir)).sync(service)
+        for shared_dir, service in _services(index)
+    }
+
+
+def snapshot_status(index) -> List[Dict[str, Optional[int]]]:
+    """Latest published version and local state per shared dir."""
+    status = []
+    for shared_dir, service in _services(index):
+        latest = _read_latest(Path(shared_dir)) or {}
+        local = service.manifest() or {}
+        status.append({
+            "shared_dir": shared_dir,
+            "published_version": latest.get("version"),
+            "published_generation": latest.get("source_generation"),
+            "local_generation": local.get("generation"),
+            "replica_version": local.get("replica_version"),
+            "count": local.get("count"),
+        })
+    return status
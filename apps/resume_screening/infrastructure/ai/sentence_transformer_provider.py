@@ -9,13 +9,19 @@ import numpy as np
 from django.conf import settings
 
 from .embedding_protocol import EmbeddingProvider
+from .length_batching import length_batches
 
 logger = logging.getLogger(__name__)
 
 # Model config - all-MiniLM-L6-v2 outputs 384-dim vectors
 MINILM_DIMENSION = 384
 DEFAULT_MAX_SEQ_LENGTH = 256
-DEFAULT_TRUNCATE = True
+CHARS_PER_TOKEN = 4  # WordPiece on English resume text, for budget sizing
+
+
+def estimate_token_lengths(texts: List[str], max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH) -> List[int]:
+    """Token count of each text estimated from its length, capped at max_seq_length."""
+    return [min(max_seq_length, len(text) // CHARS_PER_TOKEN + 2) for text in texts]
 
 
 class SentenceTransformerProvider(EmbeddingProvider):
@@ -26,7 +32,8 @@ class SentenceTransformerProvider(EmbeddingProvider):
         model_name: str = None,
         cache_dir: str = None,
         max_seq_length: int = DEFAULT_MAX_SEQ_LENGTH,
-        truncate: bool = DEFAULT_TRUNCATE,
+        length_bucketing: bool = None,
+        max_batch_tokens: int = None,
     ):
         self._model = None
         self._model_name = model_name or getattr(
@@ -34,7 +41,12 @@ class SentenceTransformerProvider(EmbeddingProvider):
         )
         self._cache_dir = str(cache_dir or getattr(settings, 'HF_MODEL_CACHE_DIR', 'models_cache'))
         self._max_seq_length = max_seq_length
-        self._truncate = truncate
+        self._length_bucketing = (
+            getattr(settings, 'EMBEDDING_LENGTH_BUCKETING', True) if length_bucketing is None else length_bucketing
+        )
+        self._max_batch_tokens = int(
+            getattr(settings, 'EMBEDDING_MAX_BATCH_TOKENS', 0) if max_batch_tokens is None else max_batch_tokens
+        )
     
     @property
     def model(self):
@@ -55,6 +67,10 @@ class SentenceTransformerProvider(EmbeddingProvider):
     def dimension(self) -> int:
         return MINILM_DIMENSION
     
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+    
     def encode(
         self,
         texts: Union[str, List[str]],
@@ -68,15 +84,36 @@ class SentenceTransformerProvider(EmbeddingProvider):
         if not texts:
             return np.zeros((0, self.dimension), dtype=np.float32)
         
-        embeddings = self.model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=show_progress,
-            convert_to_numpy=True,
-            normalize_embeddings=normalize,
-            truncate=self._truncate,
-        )
-        return embeddings.astype(np.float32)
+        # SentenceTransformer.encode already sorts by length and batches runs
+        # of similar length; only a token budget needs batches of our own
+        if not self._length_bucketing or self._max_batch_tokens <= 0 or len(texts) <= 1:
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=show_progress,
+                convert_to_numpy=True,
+                normalize_embeddings=normalize,
+            )
+            return embeddings.astype(np.float32)
+        
+        # Size batches from character length: tokenizing here would tokenize
+        # every text twice, since encode tokenizes its batch again
+        lengths = estimate_token_lengths(texts, self._max_seq_length)
+        output = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for batch in length_batches(lengths, batch_size, self._max_batch_tokens):
+            output[batch] = self.model.encode(
+                [texts[i] for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=normalize,
+            )
+        return output
+    
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        """Tokens per text after truncation (special tokens included)."""
+        encoded = self.model.tokenizer(list(texts), truncation=True, max_length=self._max_seq_length)
+        return [len(ids) for ids in encoded["input_ids"]]
     
     def encode_single(self, text: str, *, normalize: bool = True) -> List[float]:
         arr = self.encode([text], normalize=normalize)
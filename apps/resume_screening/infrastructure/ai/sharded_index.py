@@ -0,0 +1,431 @@
+"""
+Sharded vector index: one VectorIndexService per shard, searched in parallel.
+
+FAISS_SHARD_BY selects the partitioning:
+    hash   FAISS_SHARD_COUNT shards keyed by a stable hash of the resume id
+    month  one shard per created_at month (UTC), e.g. "2024-05"
+
+Every shard is a complete index dir (FAISS_INDEX_PATH/shards/<key>) with its
+own generations, delta log and writer lock, so writes to different shards
+never contend and one shard can be rebuilt while the others keep serving and
+indexing. Searches fan out over a thread pool (FAISS releases the GIL while
+searching) and the per-shard top-k lists are merged.
+
+With month shards, a time-bounded search (since/until) only visits the shards
+of the overlapping months. The bound is month-granular: callers that need an
+exact cut-off filter on created_at when they hydrate the results.
+
+Changing FAISS_SHARD_BY or FAISS_SHARD_COUNT requires a rebuild.
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from django.conf import settings
+
+from .replication import replica_source_dir
+from .skill_index import SkillFilter
+from .vector_index_service import (
+    DEFAULT_RELOAD_CHECK_INTERVAL,
+    DEFAULT_REBUILD_CHUNK_SIZE,
+    DEFAULT_RANGE_MAX_RESULTS,
+    VectorIndexService,
+    iter_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+SHARD_BY_HASH = "hash"
+SHARD_BY_MONTH = "month"
+SHARD_BY_CHOICES = (SHARD_BY_HASH, SHARD_BY_MONTH)
+SHARDS_DIRNAME = "shards"
+DEFAULT_SHARD_COUNT = 8
+DEFAULT_SHARD_SEARCH_THREADS = 8
+MONTH_KEY_RE = re.compile(r"^\d{4}-\d{2}$")
+
+
+def shard_by() -> Optional[str]:
+    """Configured partitioning (FAISS_SHARD_BY), or None for a single index."""
+    value = (getattr(settings, 'FAISS_SHARD_BY', '') or '').strip().lower()
+    if value in ('', 'none'):
+        return None
+    if value not in SHARD_BY_CHOICES:
+        raise ValueError(f"FAISS_SHARD_BY must be one of none, {', '.join(SHARD_BY_CHOICES)}; got {value!r}")
+    return value
+
+
+def shard_count() -> int:
+    return max(1, int(getattr(settings, 'FAISS_SHARD_COUNT', DEFAULT_SHARD_COUNT)))
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive datetimes are taken to be UTC (USE_TZ stores UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def month_key(value: datetime) -> str:
+    return _as_utc(value).strftime("%Y-%m")
+
+
+def _month_start(key: str) -> datetime:
+    return datetime.strptime(key, "%Y-%m").replace(tzinfo=timezone.utc)
+
+
+def _next_month_start(key: str) -> datetime:
+    start = _month_start(key)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+_search_executor: Optional[ThreadPoolExecutor] = None
+_search_executor_lock = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Process-wide pool for shard fan-out."""
+    global _search_executor
+    if _search_executor is None:
+        with _search_executor_lock:
+            if _search_executor is None:
+                _search_executor = ThreadPoolExecutor(
+                    max_workers=int(getattr(
+                        settings, 'FAISS_SHARD_SEARCH_THREADS', DEFAULT_SHARD_SEARCH_THREADS
+                    )),
+                    thread_name_prefix="faiss-shard",
+                )
+    return _search_executor
+
+
+class ShardedVectorIndex:
+    """
+    Vector index partitioned into independent VectorIndexService shards.
+    Same interface as VectorIndexService; writes take the resume's created_at
+    to route month shards.
+    """
+    
+    def __init__(
+        self,
+        dimension: int = 384,
+        index_dir: Path = None,
+        partition: str = None,
+        num_shards: int = None,
+        read_only: bool = False,
+        reload_check_interval: float = None,
+    ):
+        self.dimension = dimension
+        self.read_only = read_only
+        self.partition = partition or shard_by() or SHARD_BY_HASH
+        if self.partition not in SHARD_BY_CHOICES:
+            raise ValueError(f"Unknown shard partitioning: {self.partition}")
+        self.num_shards = num_shards or shard_count()
+        self.shards_dir = Path(index_dir or settings.FAISS_INDEX_PATH) / SHARDS_DIRNAME
+        self.shards_dir.mkdir(parents=True, exist_ok=True)
+        if reload_check_interval is None:
+            reload_check_interval = getattr(
+                settings, 'FAISS_RELOAD_CHECK_INTERVAL', DEFAULT_RELOAD_CHECK_INTERVAL
+            )
+        self.reload_check_interval = reload_check_interval
+        self._shards: Dict[str, VectorIndexService] = {}
+        self._shards_lock = threading.Lock()
+        self._month_keys: List[str] = []
+        self._next_discovery = 0.0
+        # Replicas also discover month shards the publisher has created
+        self._replica_shards_dir = replica_source_dir(self.shards_dir)
+    
+    def shard_key(self, resume_id: UUID, created_at: Optional[datetime] = None) -> str:
+        """Shard holding resume_id; month shards default to the current month."""
+        if self.partition == SHARD_BY_MONTH:
+            return month_key(created_at or datetime.now(timezone.utc))
+        return self._hash_key(zlib.crc32(UUID(str(resume_id)).bytes) % self.num_shards)
+    
+    def _hash_key(self, bucket: int) -> str:
+        # Includes the shard count, so a changed FAISS_SHARD_COUNT never mixes layouts
+        return f"h{bucket:03d}of{self.num_shards:03d}"
+    
+    def shard(self, key: str) -> VectorIndexService:
+        """The shard's index service (opened on first use)."""
+        service = self._shards.get(key)
+        if service is None:
+            with self._shards_lock:
+                service = self._shards.get(key)
+                if service is None:
+                    service = VectorIndexService(
+                        dimension=self.dimension,
+                        index_dir=self.shards_dir / key,
+                        reload_check_interval=self.reload_check_interval,
+                        read_only=self.read_only,
+                    )
+                    self._shards[key] = service
+        return service
+    
+    def shard_time_range(self, key: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """[start, end) of created_at held by a month shard; (None, None) for hash shards."""
+        if self.partition != SHARD_BY_MONTH:
+            return None, None
+        return _month_start(key), _next_month_start(key)
+    
+    def shard_keys(self) -> List[str]:
+        """All shards. Month shards are discovered on disk, as other processes create them."""
+        if self.partition == SHARD_BY_HASH:
+            return [self._hash_key(i) for i in range(self.num_shards)]
+        now = time.monotonic()
+        if now >= self._next_discovery:
+            self._next_discovery = now + self.reload_check_interval
+            dirs = [self.shards_dir]
+            if self._replica_shards_dir is not None and self._replica_shards_dir.is_dir():
+                dirs.append(self._replica_shards_dir)
+            self._month_keys = [
+                p.name for d in dirs for p in d.iterdir() if p.is_dir() and MONTH_KEY_RE.match(p.name)
+            ]
+        return sorted(set(self._month_keys) | set(self._shards))
+    
+    def shard_keys_between(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[str]:
+        """Shards that can hold resumes created in [since, until]; all of them for hash shards."""
+        keys = self.shard_keys()
+        if self.partition != SHARD_BY_MONTH or (since is None and until is None):
+            return keys
+        if since is not None:
+            since = _as_utc(since)
+            keys = [key for key in keys if _next_month_start(key) > since]
+        if until is not None:
+            until = _as_utc(until)
+            keys = [key for key in keys if _month_start(key) <= until]
+        return keys
+    
+    def add(self, resume_id: UUID, embedding: List[float], created_at: Optional[datetime] = None) -> None:
+        self.shard(self.shard_key(resume_id, created_at)).add(resume_id, embedding)
+    
+    def add_batch(self, items: List[Tuple]) -> None:
+        """Items are (resume_id, embedding) or (resume_id, embedding, created_at); one batch per shard."""
+        for key, shard_items in self._group(items).items():
+            self.shard(key).add_batch(shard_items)
+    
+    def enqueue(self, resume_id: UUID, embedding: List[float], created_at: Optional[datetime] = None) -> None:
+        """Group-commit upsert into the resume's shard (see VectorIndexService.enqueue)."""
+        self.shard(self.shard_key(resume_id, created_at)).enqueue(resume_id, embedding)
+    
+    def _group(self, items: List[Tuple]) -> Dict[str, List[Tuple[UUID, List[float]]]]:
+        groups: Dict[str, List[Tuple[UUID, List[float]]]] = {}
+        for rid, emb, *rest in items:
+            key = self.shard_key(rid, rest[0] if rest else None)
+            groups.setdefault(key, []).append((rid, emb))
+        return groups
+    
+    def delete(self, resume_id: UUID, created_at: Optional[datetime] = None) -> bool:
+        """
+        Tombstone resume_id in whichever shard holds it. Returns False if it
+        was not indexed. With created_at, a month shard is found without probing.
+        """
+        if self.partition == SHARD_BY_HASH or created_at is not None:
+            return self.shard(self.shard_key(resume_id, created_at)).delete(resume_id)
+        deleted = False
+        for key in self.shard_keys():
+            shard = self.shard(key)
+            if shard.contains(resume_id):
+                deleted = shard.delete(resume_id) or deleted
+        return deleted
+    
+    def delete_batch(self, resume_ids: Iterable[UUID]) -> int:
+        """Tombstone many resumes, one write per shard. Returns how many were indexed."""
+        resume_ids = list(resume_ids)
+        if self.partition == SHARD_BY_HASH:
+            groups: Dict[str, List[UUID]] = {}
+            for rid in resume_ids:
+                groups.setdefault(self.shard_key(rid), []).append(rid)
+            return sum(self.shard(key).delete_batch(rids) for key, rids in groups.items())
+        return sum(self.shard(key).delete_batch(resume_ids) for key in self.shard_keys())
+    
+    def indexed_ids(self) -> np.ndarray:
+        """Ids of every indexed resume, across shards, as sorted S16 UUID bytes."""
+        parts = [self.shard(key).indexed_ids() for key in self.shard_keys()]
+        if not parts:
+            return np.zeros(0, dtype="S16")
+        return np.sort(np.concatenate(parts), kind="stable")
+    
+    def search(
+        self,
+        query_embedding: List[float],
+        k: int = 5,
+        *,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        skill_filter: Optional[SkillFilter] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Top-k over the shards that overlap [since, until], searched in
+        parallel. Same result format as VectorIndexService.search.
+        """
+        if len(query_embedding) != self.dimension:
+            raise ValueError(f"Query dimension {len(query_embedding)} != {self.dimension}")
+        shards = [self.shard(key) for key in self.shard_keys_between(since, until)]
+        if not shards:
+            return []
+        options = dict(
+            nprobe=nprobe, ef_search=ef_search, rerank_factor=rerank_factor, skill_filter=skill_filter
+        )
+        if len(shards) == 1:
+            return shards[0].search(query_embedding, k, **options)
+        futures = [_executor().submit(shard.search, query_embedding, k, **options) for shard in shards]
+        results = [hit for future in futures for hit in future.result()]
+        return heapq.nlargest(k, results, key=itemgetter(1))
+    
+    def search_batch(
+        self,
+        query_embeddings,
+        k: int = 5,
+        *,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        skill_filter: Optional[SkillFilter] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k for many queries: each shard searches the whole batch in one
+        call (shards in parallel), then the per-shard lists of every query
+        are merged. Same result format as VectorIndexService.search_batch.
+        """
+        vecs = np.asarray(query_embeddings, dtype=np.float32)
+        if vecs.ndim != 2 or vecs.shape[1] != self.dimension:
+            raise ValueError(f"Query batch shape {vecs.shape} does not match dimension {self.dimension}")
+        shards = [self.shard(key) for key in self.shard_keys_between(since, until)]
+        if not shards or not len(vecs):
+            return [[] for _ in range(len(vecs))]
+        options = dict(
+            nprobe=nprobe, ef_search=ef_search, rerank_factor=rerank_factor, skill_filter=skill_filter
+        )
+        if len(shards) == 1:
+            return shards[0].search_batch(vecs, k, **options)
+        futures = [_executor().submit(shard.search_batch, vecs, k, **options) for shard in shards]
+        per_shard = [future.result() for future in futures]
+        return [
+            heapq.nlargest(k, [hit for shard_results in per_shard for hit in shard_results[i]], key=itemgetter(1))
+            for i in range(len(vecs))
+        ]
+    
+    def range_search(
+        self,
+        query_embedding: List[float],
+        min_score: float,
+        max_results: int = DEFAULT_RANGE_MAX_RESULTS,
+        *,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        skill_filter: Optional[SkillFilter] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Every resume scoring >= min_score over the shards that overlap
+        [since, until], searched in parallel. Same result format as
+        VectorIndexService.range_search.
+        """
+        if len(query_embedding) != self.dimension:
+            raise ValueError(f"Query dimension {len(query_embedding)} != {self.dimension}")
+        shards = [self.shard(key) for key in self.shard_keys_between(since, until)]
+        if not shards:
+            return []
+        options = dict(
+            nprobe=nprobe, ef_search=ef_search, rerank_factor=rerank_factor, skill_filter=skill_filter
+        )
+        if len(shards) == 1:
+            return shards[0].range_search(query_embedding, min_score, max_results, **options)
+        futures = [
+            _executor().submit(shard.range_search, query_embedding, min_score, max_results, **options)
+            for shard in shards
+        ]
+        results = [hit for future in futures for hit in future.result()]
+        return heapq.nlargest(max_results, results, key=itemgetter(1))
+    
+    def contains(self, resume_id: UUID) -> bool:
+        if self.partition == SHARD_BY_HASH:
+            return self.shard(self.shard_key(resume_id)).contains(resume_id)
+        return any(self.shard(key).contains(resume_id) for key in self.shard_keys())
+    
+    def get_vector(self, resume_id: UUID, created_at: Optional[datetime] = None) -> Optional[np.ndarray]:
+        """The resume's indexed vector; month shards are all tried unless created_at is given."""
+        if self.partition == SHARD_BY_HASH or created_at is not None:
+            return self.shard(self.shard_key(resume_id, created_at)).get_vector(resume_id)
+        for key in self.shard_keys():
+            vector = self.shard(key).get_vector(resume_id)
+            if vector is not None:
+                return vector
+        return None
+    
+    def count(self) -> int:
+        """Number of live (searchable) resumes across all shards."""
+        return sum(self.shard(key).count() for key in self.shard_keys())
+    
+    def counts(self) -> Dict[str, int]:
+        """Live resumes per shard."""
+        return {key: self.shard(key).count() for key in self.shard_keys()}
+    
+    def tombstone_fraction(self) -> float:
+        """Largest tombstone share of any shard."""
+        return max((self.shard(key).tombstone_fraction() for key in self.shard_keys()), default=0.0)
+    
+    def needs_compaction(self) -> bool:
+        return any(self.shard(key).needs_compaction() for key in self.shard_keys())
+    
+    def compact(self, only_if_due: bool = False) -> int:
+        """Compact every shard (with only_if_due, just the shards that need it)."""
+        return sum(self.shard(key).compact(only_if_due) for key in self.shard_keys())
+    
+    def checkpoint(self) -> None:
+        for key in self.shard_keys():
+            self.shard(key).checkpoint()
+    
+    def rebuild_shard(self, key: str, items: Iterable[Tuple]) -> int:
+        """
+        Replace one shard's contents with `items` (see VectorIndexService.rebuild).
+        Only that shard's writers wait; the other shards keep indexing and all
+        shards keep serving searches.
+        """
+        return self.shard(key).rebuild(items)
+    
+    def rebuild(self, items: Iterable[Tuple], chunk_size: int = DEFAULT_REBUILD_CHUNK_SIZE) -> Dict[str, int]:
+        """
+        Rebuild every shard from `items` (as for add_batch), consumed lazily in
+        chunks. Each shard is built in its own side directory and swapped in
+        once all items are consumed; existing shards that receive no items are
+        emptied. Returns the number of resumes indexed per shard.
+        """
+        with ExitStack() as stack:
+            sides: Dict[str, VectorIndexService] = {}
+            
+            def side_for(key: str) -> VectorIndexService:
+                if key not in sides:
+                    sides[key] = stack.enter_context(self.shard(key).rebuilding())
+                return sides[key]
+            
+            for key in self.shard_keys():
+                side_for(key)
+            for chunk in iter_chunks(items, chunk_size):
+                for key, shard_items in self._group(chunk).items():
+                    side_for(key).add_batch(shard_items)
+            indexed = {key: side.count() for key, side in sides.items()}
+        logger.info(f"Sharded vector index rebuilt: {sum(indexed.values())} resumes in {len(indexed)} shards")
+        return indexed
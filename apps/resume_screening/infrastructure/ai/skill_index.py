@@ -0,0 +1,176 @@
+"""
+Inverted index from skill keyword to a bitmap of resumes, for filtered search.
+
+Built from Resume.extracted_skills: resume UUIDs are sorted into a table and
+every skill gets a packed bitmap over its rows, so combining skills
+(skills_all = AND, skills_any = OR) is a handful of byte-wise operations
+regardless of how many resumes match. The selected rows are handed to
+VectorIndexService.search, which maps them to its own labels and applies them
+as a FAISS ID selector, so a filtered query still returns k results.
+
+The index is an in-memory snapshot, rebuilt in the background every
+FAISS_SKILL_INDEX_REFRESH seconds; skills extracted since the last refresh
+are not filterable yet.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKILL_INDEX_REFRESH = 60.0  # seconds
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(str(skill).lower().split())
+
+
+def _skill_list(skills) -> List[str]:
+    """Normalized skills from a list or a comma-separated string."""
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    return [s for s in (normalize_skill(skill) for skill in skills or []) if s]
+
+
+class SkillSnapshot(NamedTuple):
+    version: int
+    uuids: np.ndarray  # sorted S16 resume ids (the bitmap rows)
+    bitmaps: Dict[str, np.ndarray]  # skill -> packed little-endian bitmap over rows
+
+
+class SkillFilter(NamedTuple):
+    """Resumes selected by a skill query: rows of `snapshot`, in UUID order."""
+    snapshot: SkillSnapshot
+    rows: np.ndarray
+    
+    @property
+    def uuids(self) -> np.ndarray:
+        return self.snapshot.uuids[self.rows]
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+def build_snapshot(items: Iterable[Tuple[UUID, Optional[List[str]]]], version: int = 0) -> SkillSnapshot:
+    """Snapshot from (resume_id, skills) pairs."""
+    ids, skill_lists = [], []
+    for rid, skills in items:
+        if skills:
+            ids.append(UUID(str(rid)).bytes)
+            skill_lists.append(skills)
+    uuids = np.array(ids, dtype="S16")
+    order = np.argsort(uuids, kind="stable")
+    uuids = uuids[order]
+    
+    postings: Dict[str, List[int]] = {}
+    for row, i in enumerate(order.tolist()):
+        for skill in {normalize_skill(s) for s in skill_lists[i] if s}:
+            postings.setdefault(skill, []).append(row)
+    bitmaps = {}
+    for skill, rows in postings.items():
+        bits = np.zeros(len(uuids), dtype=bool)
+        bits[rows] = True
+        bitmaps[skill] = np.packbits(bits, bitorder="little")
+    return SkillSnapshot(version, uuids, bitmaps)
+
+
+class SkillIndex:
+    """Periodically refreshed skill -> resume bitmap index."""
+    
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[Tuple[UUID, Optional[List[str]]]]],
+        refresh_interval: float = None,
+    ):
+        self._loader = loader
+        if refresh_interval is None:
+            refresh_interval = getattr(settings, 'FAISS_SKILL_INDEX_REFRESH', DEFAULT_SKILL_INDEX_REFRESH)
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[SkillSnapshot] = None
+        self._next_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+    
+    def snapshot(self) -> SkillSnapshot:
+        """Current snapshot. Built on first use; later refreshes run in the background."""
+        if self._snapshot is None:
+            with self._refresh_lock:
+                if self._snapshot is None:
+                    self.refresh()
+        elif time.monotonic() >= self._next_refresh and self._refresh_lock.acquire(blocking=False):
+            self._next_refresh = time.monotonic() + self.refresh_interval
+            threading.Thread(target=self._background_refresh, daemon=True).start()
+        return self._snapshot
+    
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Skill index refresh failed")
+        finally:
+            self._refresh_lock.release()
+            connections.close_all()  # this thread's DB connection
+    
+    def refresh(self) -> None:
+        started = time.perf_counter()
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        snapshot = build_snapshot(self._loader(), version)
+        self._snapshot = snapshot
+        self._next_refresh = time.monotonic() + self.refresh_interval
+        logger.info(
+            f"Skill index built: {len(snapshot.uuids)} resumes, {len(snapshot.bitmaps)} skills "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+    
+    def select(
+        self,
+        skills_all: Optional[List[str]] = None,
+        skills_any: Optional[List[str]] = None,
+    ) -> Optional[SkillFilter]:
+        """
+        Resumes having every skill in skills_all and at least one in skills_any.
+        Returns None when no skills are given (no filtering).
+        """
+        skills_all = _skill_list(skills_all)
+        skills_any = _skill_list(skills_any)
+        if not skills_all and not skills_any:
+            return None
+        snapshot = self.snapshot()
+        empty = np.zeros((len(snapshot.uuids) + 7) // 8, dtype=np.uint8)
+        
+        mask = None
+        for skill in skills_all:
+            bitmap = snapshot.bitmaps.get(skill, empty)
+            mask = bitmap.copy() if mask is None else np.bitwise_and(mask, bitmap, out=mask)
+        if skills_any:
+            any_mask = empty.copy()
+            for skill in skills_any:
+                bitmap = snapshot.bitmaps.get(skill)
+                if bitmap is not None:
+                    np.bitwise_or(any_mask, bitmap, out=any_mask)
+            mask = any_mask if mask is None else np.bitwise_and(mask, any_mask, out=mask)
+        bits = np.unpackbits(mask, count=len(snapshot.uuids), bitorder="little")
+        return SkillFilter(snapshot, np.flatnonzero(bits))
+
+
+_skill_index: Optional[SkillIndex] = None
+_skill_index_lock = threading.Lock()
+
+
+def get_skill_index() -> SkillIndex:
+    """Process-wide skill index over the resumes table (lazy)."""
+    global _skill_index
+    if _skill_index is None:
+        with _skill_index_lock:
+            if _skill_index is None:
+                # Imported here: the models need the app registry
+                from apps.resume_screening.infrastructure.repositories.resume_repository import (
+                    ResumeRepository,
+                )
+                _skill_index = SkillIndex(ResumeRepository.iter_skills)
+    return _skill_index
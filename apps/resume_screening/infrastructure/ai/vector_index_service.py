@@ -1,180 +1,1117 @@
 """
 FAISS vector index service with persistence and id mapping.
-Uses IndexFlatIP for cosine similarity (vectors must be L2-normalized).
+Uses inner product for cosine similarity (vectors must be L2-normalized).
+Starts as an exact IndexFlatIP and migrates to the configured ANN type
+(FAISS_INDEX_TYPE: ivf or hnsw) once the corpus reaches FAISS_ANN_MIN_SIZE.
+
+Compressed mode (FAISS_INDEX_TYPE sq8 or pq) stores lossy codes in the index;
+searches fetch FAISS_RERANK_FACTOR x k candidates and re-rank them exactly
+against full-precision vectors kept on disk (see vector_store).
+
+Vectors are keyed by stable int64 labels (see id_mapping). Replacing or
+deleting a resume only tombstones its old label, which searches exclude via an
+IDSelector; tombstones are physically removed in bulk by compact(), which runs
+in the background once they exceed FAISS_TOMBSTONE_COMPACT_FRACTION of the
+stored vectors (see needs_compaction), never on the write path.
+
+Persistence (see index_store): a base generation (index + id mapping) plus an
+append-only delta log (see delta_log). Each write appends its records to the
+log, so the cost per resume is constant; every FAISS_LOG_CHECKPOINT_RECORDS
+records the log is folded into a new base generation, published by atomically
+replacing a small manifest. Long-lived instances (one per worker process, see
+get_vector_index) poll the manifest and log, replaying new log records and
+hot-swapping newer generations written by other processes.
+
+Read-only serving (FAISS_MMAP_SEARCH, see get_search_index): web workers map
+the persisted generation instead of copying it into the heap, so all workers
+on a host share one page-cache copy. Flat generations are stored as a raw
+float32 vector table (see mmap_index), IVF is opened with IO_FLAG_MMAP; HNSW
+cannot be mapped and is read normally. Log records since the checkpoint go to
+a small in-memory delta index that is searched alongside.
+
+Concurrency: searches share a reader lock, so many threads can run FAISS's
+GIL-releasing search at once. Writers are serialized by a mutex plus an
+inter-process file lock (single writer per index dir); each catches up with
+the log before mutating, takes the exclusive lock only for the in-memory
+mutation, and checkpoints under the shared lock so a slow faiss.write_index
+never stalls searches.
+
+Group commit (see write_queue): enqueue() spools an upsert to a shared queue
+file and returns; the process holding the writer lock waits up to
+FAISS_GROUP_COMMIT_WAIT_MS or FAISS_GROUP_COMMIT_MAX_ITEMS and commits every
+queued upsert in one batch. Every writer re-checks the queue after releasing
+the lock, so nothing queued while the lock was held is left behind.
+
+Multi-node (see replication): a publisher node exports generations as
+checksummed snapshots to FAISS_REPLICATION_DIR; replica nodes install them
+as local generations via replace_generation and reject writes.
 """
-import json
 import logging
+import os
+import shutil
 import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 from uuid import UUID
 
 import faiss
 import numpy as np
 from django.conf import settings
 
+from .delta_log import OP_DELETE, OP_UPSERT, make_records
+from .file_lock import FileLock
+from .id_mapping import IdMapping
+from .index_factory import (
+    INDEX_TYPE_FLAT,
+    INDEX_TYPE_PQ,
+    QUANTIZED_TYPES,
+    allow_selector,
+    ann_min_size,
+    build_index,
+    configured_index_type,
+    exclude_selector,
+    export_vectors,
+    index_type_of,
+    min_training_size,
+    reconstruct_label,
+    remove_labels,
+    search_params,
+    stored_labels,
+)
+from .index_store import DiskState, IndexStore, replay
+from .mmap_index import MmapFlatIndex
+from .replication import SnapshotReplica, replica_source_dir
+from .skill_index import SkillFilter, SkillSnapshot
+from .vector_store import FullVectorStore
+from .write_queue import GroupCommit, PendingWriteQueue
+
+if TYPE_CHECKING:
+    from .sharded_index import ShardedVectorIndex
+
 logger = logging.getLogger(__name__)
 
-INDEX_FILENAME = "resume_index.faiss"
-IDS_FILENAME = "resume_index_ids.json"
-INDEX_LOCK = threading.RLock()
+LOCK_FILENAME = "resume_index.lock"
+PENDING_FILENAME = "resume_index.pending"
+REBUILD_DIRNAME = "rebuild"
+JOB_INDEX_DIRNAME = "jobs"
+STAGING_DIRNAME = "staging"
+DEFAULT_REBUILD_CHUNK_SIZE = 2000
+DEFAULT_RELOAD_CHECK_INTERVAL = 1.0  # seconds between manifest polls
+DEFAULT_LOG_CHECKPOINT_RECORDS = 10000
+DEFAULT_GROUP_COMMIT_MAX_ITEMS = 256
+DEFAULT_GROUP_COMMIT_WAIT_MS = 50
+DEFAULT_RERANK_FACTOR = 4
+DEFAULT_RANGE_MAX_RESULTS = 1000
+# Quantized range searches collect candidates this far below min_score, then re-check them exactly
+RANGE_RERANK_MARGIN = 0.05
+# Compact once tombstones exceed this share of the stored vectors (and the minimum count)
+DEFAULT_TOMBSTONE_COMPACT_FRACTION = 0.2
+TOMBSTONE_COMPACT_MIN = 1000
+
+
+def _first_kept(scores: np.ndarray, labels: np.ndarray, keep: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """First k kept entries of each result row, FAISS-shaped (padded with -1)."""
+    out_scores = np.full((len(scores), k), -np.inf, dtype=np.float32)
+    out_labels = np.full((len(labels), k), -1, dtype=np.int64)
+    for i in range(len(scores)):
+        row_scores, row_labels = scores[i][keep[i]][:k], labels[i][keep[i]][:k]
+        out_scores[i, :len(row_scores)] = row_scores
+        out_labels[i, :len(row_labels)] = row_labels
+    return out_scores, out_labels
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[list]:
+    """Consecutive lists of up to `size` items."""
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or a single writer.
+    Writer-preferring: once a writer is waiting, new readers queue behind it.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class _LabelFilter(NamedTuple):
+    """Labels a filtered search may return, as a membership array and a FAISS selector."""
+    member: np.ndarray  # bool, indexed by label
+    selector: faiss.IDSelector
+    count: int
+    
+    def contains(self, labels: np.ndarray) -> np.ndarray:
+        inside = (labels >= 0) & (labels < len(self.member))
+        out = np.zeros(labels.shape, dtype=bool)
+        out[inside] = self.member[labels[inside]]
+        return out
 
 
 class VectorIndexService:
     """
     FAISS-backed vector index for resume embeddings.
-    Maps index positions to resume UUIDs. Persists index and mapping to disk.
+    Maps index labels to resume UUIDs. Persists index and mapping to disk.
+    With read_only=True the persisted index is memory-mapped and writes are rejected.
     """
     
     def __init__(
         self,
         dimension: int = 384,
         index_dir: Path = None,
+        reload_check_interval: float = None,
+        checkpoint_records: int = None,
+        read_only: bool = False,
     ):
         self.dimension = dimension
+        self.read_only = read_only
         self.index_dir = Path(index_dir or settings.FAISS_INDEX_PATH)
         self.index_dir.mkdir(parents=True, exist_ok=True)
-        self._index: faiss.IndexFlatIP | None = None
-        self._id_list: List[str] = []
-        self._id_to_position: dict[str, int] = {}
+        if reload_check_interval is None:
+            reload_check_interval = getattr(
+                settings, 'FAISS_RELOAD_CHECK_INTERVAL', DEFAULT_RELOAD_CHECK_INTERVAL
+            )
+        self.reload_check_interval = reload_check_interval
+        self.checkpoint_records = checkpoint_records or getattr(
+            settings, 'FAISS_LOG_CHECKPOINT_RECORDS', DEFAULT_LOG_CHECKPOINT_RECORDS
+        )
+        self._index: faiss.Index | MmapFlatIndex | None = None
+        self._delta: faiss.Index | None = None
+        # Exact vectors for re-ranking a quantized index
+        self._full: FullVectorStore | None = None
+        self._mapping = IdMapping()
+        self._tombstones: set[int] = set()
+        self._exclude_selector: faiss.IDSelector | None = None
+        self._tombstone_labels = np.zeros(0, dtype=np.int64)
+        self._excluded_rows: np.ndarray | None = None
+        # (skill snapshot, mapping, mapping version) -> label of each snapshot row
+        self._row_labels: Optional[Tuple[SkillSnapshot, IdMapping, int, np.ndarray]] = None
+        # Generations, manifest and delta log on disk
+        self._store = IndexStore(self.index_dir, dimension, read_only)
+        self._next_reload_check = 0.0
+        self.group_commit_max_items = int(getattr(
+            settings, 'FAISS_GROUP_COMMIT_MAX_ITEMS', DEFAULT_GROUP_COMMIT_MAX_ITEMS
+        ))
+        self.group_commit_wait = getattr(
+            settings, 'FAISS_GROUP_COMMIT_WAIT_MS', DEFAULT_GROUP_COMMIT_WAIT_MS
+        ) / 1000.0
+        self.rerank_factor = int(getattr(settings, 'FAISS_RERANK_FACTOR', DEFAULT_RERANK_FACTOR))
+        self.compact_fraction = float(getattr(
+            settings, 'FAISS_TOMBSTONE_COMPACT_FRACTION', DEFAULT_TOMBSTONE_COMPACT_FRACTION
+        ))
+        self._lock = ReadWriteLock()
+        # Serializes writers (mutation + log append / checkpoint) and hot reloads
+        self._write_mutex = threading.Lock()
+        # Single writer across processes sharing index_dir; always taken after _write_mutex
+        self._file_lock = FileLock(self.index_dir / LOCK_FILENAME)
+        self._pending = PendingWriteQueue(self.index_dir / PENDING_FILENAME, dimension)
+        self._group_commit = GroupCommit(
+            self._pending,
+            self._upsert,
+            self._try_writer,
+            self.group_commit_max_items,
+            self.group_commit_wait,
+        )
+        # Replica nodes pull generations published by the writer node
+        source = replica_source_dir(self.index_dir)
+        self._replica = SnapshotReplica(source) if source is not None else None
     
     @property
     def index_path(self) -> Path:
-        return self.index_dir / INDEX_FILENAME
+        """Legacy single-file index (read when no manifest exists yet)."""
+        return self._store.index_path
     
     @property
     def ids_path(self) -> Path:
-        return self.index_dir / IDS_FILENAME
+        """Legacy single-file id mapping (read when no manifest exists yet)."""
+        return self._store.ids_path
+    
+    @property
+    def manifest_path(self) -> Path:
+        return self._store.manifest_path
+    
+    @property
+    def generation(self) -> int:
+        return self._store.generation
+    
+    def manifest(self) -> Optional[dict]:
+        """The published manifest of index_dir (None before the first checkpoint)."""
+        return self._store.read_manifest()
+    
+    @property
+    def index_type(self) -> str:
+        self._ensure_loaded()
+        return index_type_of(self._index)
+    
+    def _install(self, state: DiskState) -> None:
+        """Swap in a loaded index. Caller holds the exclusive lock."""
+        self._index = state.index
+        self._delta = state.delta
+        self._full = state.full
+        self._mapping = state.mapping
+        stored = stored_labels(state.index)
+        if state.delta is not None:
+            stored = np.concatenate([stored, stored_labels(state.delta)])
+        self._set_tombstones(set(np.setdiff1d(stored, state.mapping.labels()).tolist()))
+        self._store.track(state)
+    
+    def _set_tombstones(self, tombstones: set) -> None:
+        """Caller holds the exclusive lock."""
+        self._tombstones = tombstones
+        dead = np.fromiter(tombstones, dtype=np.int64, count=len(tombstones))
+        self._tombstone_labels = dead
+        self._exclude_selector = exclude_selector(dead) if tombstones else None
+        if isinstance(self._index, MmapFlatIndex):
+            self._excluded_rows = self._index.row_mask(dead)
     
     def _ensure_loaded(self) -> None:
-        with INDEX_LOCK:
-            if self._index is not None:
+        """Load on first use, afterwards poll for changes. Call without locks held."""
+        if self._index is None:
+            with self._write_mutex:
+                if self._index is None:
+                    stamp = self._store.manifest_file_stamp()
+                    state = self._store.load()
+                    with self._lock.write():
+                        self._install(state)
+                        self._store.manifest_stamp = stamp
+                    logger.info(
+                        f"Vector index loaded: {len(self._mapping)} resumes "
+                        f"(generation {self._store.generation}, {self._store.log_records} log records)"
+                    )
+            if self._replica is not None and self._store.generation == 0:
+                # A fresh replica has nothing to serve: fetch the first snapshot now
+                self._replica.maybe_sync(self, background=False)
+            return
+        self._maybe_reload()
+    
+    def _maybe_reload(self) -> None:
+        """
+        Pick up changes persisted by another process: new log records are
+        replayed, a new generation is loaded while searches keep running on the
+        old one and then swapped in. Skipped while a local writer is active.
+        """
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return
+        self._next_reload_check = now + self.reload_check_interval
+        if self._replica is not None:
+            self._replica.maybe_sync(self)
+        
+        if not self._store.manifest_changed() and not self._store.log_grew():
+            return
+        if not self._write_mutex.acquire(blocking=False):
+            return
+        try:
+            self._catch_up()
+        finally:
+            self._write_mutex.release()
+    
+    def _catch_up(self) -> None:
+        """Apply generations and log records written by others. Caller holds _write_mutex."""
+        stamp = self._store.manifest_file_stamp()
+        if stamp != self._store.manifest_stamp:
+            self._reload_if_newer(stamp)
+        self._replay_log_tail()
+    
+    def _reload_if_newer(self, stamp: Optional[Tuple[int, int, int]]) -> None:
+        """Caller holds _write_mutex."""
+        manifest = self._store.read_manifest()
+        if manifest is None or int(manifest["generation"]) <= self._store.generation:
+            self._store.manifest_stamp = stamp
+            return
+        
+        state = self._store.load()
+        with self._lock.write():
+            if state.generation > self._store.generation:
+                self._install(state)
+                logger.info(
+                    f"Vector index reloaded: {len(state.mapping)} resumes "
+                    f"(generation {state.generation})"
+                )
+            self._store.manifest_stamp = stamp
+    
+    def _replay_log_tail(self) -> None:
+        """Caller holds _write_mutex."""
+        records, offset = self._store.read_log_tail()
+        if not len(records):
+            return
+        target = self._index if self._delta is None else self._delta
+        with self._lock.write():
+            dead = replay(target, self._mapping, records, self._full)
+            if dead:
+                self._set_tombstones(self._tombstones | dead)
+            self._store.advance(offset, len(records))
+    
+    @contextmanager
+    def _writer(self):
+        """
+        Become the single writer for index_dir: take the in-process mutex and
+        the file lock, then apply whatever other processes committed or queued.
+        Upserts queued while we held the lock are committed before releasing
+        it, and again after (see GroupCommit.flush).
+        """
+        self._check_writable()
+        try:
+            with self._write_mutex, self._file_lock:
+                self._catch_up()
+                self._group_commit.drain()
+                yield
+                self._group_commit.drain()
+        finally:
+            # Also after a failed write: producers that found the lock taken left their items to us
+            self._group_commit.flush()
+    
+    @contextmanager
+    def _try_writer(self):
+        """Like _writer, but yields False at once if another process holds the file lock."""
+        with self._write_mutex:
+            if not self._file_lock.acquire(blocking=False):
+                yield False
                 return
-            if self.index_path.exists():
-                self._index = faiss.read_index(str(self.index_path))
-                if self.ids_path.exists():
-                    with open(self.ids_path) as f:
-                        self._id_list = json.load(f)
-                    self._id_to_position = {rid: i for i, rid in enumerate(self._id_list)}
-                else:
-                    self._id_list = []
-                    self._id_to_position = {}
-            else:
-                self._index = faiss.IndexFlatIP(self.dimension)
-                self._id_list = []
-                self._id_to_position = {}
-            logger.info(f"Vector index loaded: {len(self._id_list)} resumes")
+            try:
+                self._catch_up()
+                yield True
+            finally:
+                self._file_lock.release()
     
-    def add(self, resume_id: UUID, embedding: List[float]) -> None:
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError("Vector index is opened read-only; write through get_vector_index()")
+        if self._replica is not None:
+            raise RuntimeError("Vector index is a replica; index on the publishing node")
+    
+    def add(self, resume_id: UUID, embedding: List[float], created_at: Optional[datetime] = None) -> None:
         """
-        Add resume embedding. If resume_id already exists, replaces it via rebuild.
+        Add resume embedding. If resume_id already exists, its previous vector
+        is tombstoned and the new one added under a fresh label (no rebuild).
+        created_at is the partition key of a sharded index (ignored here).
         """
         if len(embedding) != self.dimension:
             raise ValueError(f"Embedding dimension {len(embedding)} != {self.dimension}")
-        
-        vec = np.array([embedding], dtype=np.float32)
-        rid = str(resume_id)
-        
-        with INDEX_LOCK:
-            self._ensure_loaded()
-            if rid in self._id_to_position:
-                self._rebuild_without_and_add(rid, vec)
-            else:
-                self._index.add(vec)
-                self._id_list.append(rid)
-                self._id_to_position[rid] = len(self._id_list) - 1
-            self._persist()
+        self.add_batch([(resume_id, embedding)])
     
     def add_batch(self, items: List[Tuple[UUID, List[float]]]) -> None:
         """
-        Add multiple resume embeddings in one operation. More efficient than repeated add().
-        Skips ids already in index (use add() for replace). Single persist at end.
+        Upsert multiple resume embeddings in one operation. More efficient than repeated add().
+        Existing ids are replaced; items with the wrong dimension are skipped.
+        One delta log append at the end. Items may carry a third created_at
+        element (see add).
         """
+        items = [(str(rid), emb) for rid, emb, *_ in items if len(emb) == self.dimension]
         if not items:
             return
-        with INDEX_LOCK:
-            self._ensure_loaded()
-            ids_to_add = []
-            vecs = []
-            for rid, emb in items:
-                if len(emb) != self.dimension or str(rid) in self._id_to_position:
-                    continue
-                ids_to_add.append(str(rid))
-                vecs.append(emb)
-            if vecs:
-                arr = np.array(vecs, dtype=np.float32)
-                self._index.add(arr)
-                for rid in ids_to_add:
-                    self._id_list.append(rid)
-                    self._id_to_position[rid] = len(self._id_list) - 1
-                self._persist()
-    
-    def _rebuild_without_and_add(self, exclude_rid: str, new_vec: np.ndarray) -> None:
-        """Rebuild index without exclude_rid, then add new_vec."""
-        if exclude_rid not in self._id_to_position:
+        rids = [rid for rid, _ in items]
+        vectors = np.array([emb for _, emb in items], dtype=np.float32)
+        
+        self._ensure_loaded()
+        with self._writer():
+            self._upsert(rids, vectors)
+    
+    def enqueue(self, resume_id: UUID, embedding: List[float], created_at: Optional[datetime] = None) -> None:
+        """
+        Group-commit upsert for concurrent ingest (Celery workers). The item is
+        durably queued; if no other process is committing, this one becomes the
+        writer, waits briefly for more items and commits the whole queue as one
+        batch. Otherwise it returns at once and the active writer picks it up.
+        created_at is the partition key of a sharded index (ignored here).
+        """
+        if len(embedding) != self.dimension:
+            raise ValueError(f"Embedding dimension {len(embedding)} != {self.dimension}")
+        self._check_writable()
+        self._ensure_loaded()
+        self._group_commit.submit(resume_id, embedding)
+        self._group_commit.flush()
+    
+    def _upsert(self, rids: List[str], vectors: np.ndarray) -> None:
+        """Assign fresh labels, add the vectors and commit. Caller is the writer."""
+        with self._lock.write():
+            labels = np.empty(len(rids), dtype=np.int64)
+            replaced = set()
+            for i, rid in enumerate(rids):
+                labels[i], previous = self._mapping.assign(rid)
+                if previous is not None:
+                    replaced.add(previous)
+            self._index.add_with_ids(vectors, labels)
+            if self._full is not None:
+                self._full.put(labels, vectors)
+            if replaced:
+                self._set_tombstones(self._tombstones | replaced)
+        self._commit(make_records(self.dimension, OP_UPSERT, labels, rids, vectors))
+    
+    def delete(self, resume_id: UUID, created_at: Optional[datetime] = None) -> bool:
+        """
+        Remove a resume from search results (tombstone). Returns False if it
+        was not indexed. created_at only routes month shards (see add).
+        """
+        return self.delete_batch([resume_id]) > 0
+    
+    def delete_batch(self, resume_ids: Iterable[UUID]) -> int:
+        """Tombstone many resumes as one write. Returns how many were indexed."""
+        rids = [str(rid) for rid in resume_ids]
+        self._ensure_loaded()
+        with self._writer():
+            with self._lock.write():
+                removed = [(rid, self._mapping.remove(rid)) for rid in rids]
+                removed = [(rid, label) for rid, label in removed if label is not None]
+                if not removed:
+                    return 0
+                labels = np.array([label for _, label in removed], dtype=np.int64)
+                self._set_tombstones(self._tombstones | set(labels.tolist()))
+            self._commit(make_records(self.dimension, OP_DELETE, labels, [rid for rid, _ in removed]))
+        return len(removed)
+    
+    def indexed_ids(self) -> np.ndarray:
+        """Ids of every indexed resume as sorted S16 UUID bytes (see reconciliation)."""
+        self._ensure_loaded()
+        self._maybe_reload()
+        with self._lock.read():
+            return self._mapping.sorted_uuids()
+    
+    @contextmanager
+    def rebuilding(self):
+        """
+        Build a replacement index and swap it in atomically:
+        
+            with index.rebuilding() as side:
+                for chunk in chunks:
+                    side.add_batch(chunk)
+        
+        `side` is a writable index in a side directory (index_dir/rebuild.<pid>),
+        persisted and checkpointed as it grows like any index, so memory stays
+        bounded by the index itself. On a clean exit its final generation is
+        moved into index_dir as the next generation and published by
+        replacing the manifest; on an exception it is discarded and the live
+        index is untouched. Searches keep using the current index throughout.
+        Writers wait (enqueue() keeps queueing) and are applied to the new
+        index right after the swap, before the writer lock is released.
+        """
+        self._ensure_loaded()
+        with self._writer():
+            side_dir = self.index_dir / f"{REBUILD_DIRNAME}.{os.getpid()}"
+            shutil.rmtree(side_dir, ignore_errors=True)
+            try:
+                side = VectorIndexService(
+                    dimension=self.dimension,
+                    index_dir=side_dir,
+                    checkpoint_records=self.checkpoint_records,
+                )
+                side._ensure_loaded()
+                # Labels stay monotonic across the swap
+                side._mapping = IdMapping(next_label=self._mapping.next_label)
+                yield side
+                side.checkpoint()
+                self._adopt(side)
+            finally:
+                shutil.rmtree(side_dir, ignore_errors=True)
+    
+    def rebuild(self, items: Iterable[Tuple], chunk_size: int = DEFAULT_REBUILD_CHUNK_SIZE) -> int:
+        """
+        Replace the whole index with `items` ((resume_id, embedding[, ...])
+        tuples, consumed lazily in chunks; see rebuilding()).
+        Returns the number of resumes indexed.
+        """
+        started = time.perf_counter()
+        with self.rebuilding() as side:
+            for chunk in iter_chunks(items, chunk_size):
+                side.add_batch(chunk)
+            count = side.count()
+        logger.info(
+            f"Vector index rebuilt: {count} resumes ({self.index_type}) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return count
+    
+    def _adopt(self, side: "VectorIndexService") -> None:
+        """Move the side index's current generation in as our next generation. Caller is the writer."""
+        self._adopt_files(side.index_dir, side.manifest())
+    
+    def _adopt_files(self, src_dir: Path, manifest: dict) -> None:
+        """
+        Move the generation named by `manifest` (files in src_dir, on the same
+        filesystem) into index_dir as our next generation and publish it.
+        Renames only, so no data is rewritten. Without a log file the new
+        generation starts with an empty log. Extra manifest keys are kept.
+        Caller holds _write_mutex and the file lock.
+        """
+        generation = self._store.adopt_files(src_dir, manifest)
+        stamp = self._store.manifest_file_stamp()
+        state = self._store.load()
+        with self._lock.write():
+            self._install(state)
+            self._store.manifest_stamp = stamp
+        self._store.prune(keep_from=generation - 1)
+    
+    def export_generation(self, dest_dir: Path) -> dict:
+        """
+        Fold pending log records into a new generation and place its files in
+        dest_dir (hard links when possible, so nothing is copied and a later
+        prune cannot remove them). Returns the generation's manifest, without
+        a log file. Used to publish replication snapshots.
+        """
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_loaded()
+        with self._writer():
+            if self._store.log_records or self._store.read_manifest() is None:
+                self._checkpoint()
+            manifest = self._store.read_manifest()
+            self._store.link_generation(manifest, dest_dir)
+        return {key: value for key, value in manifest.items() if key != "log_file"}
+    
+    def replace_generation(self, fetch: Callable[[Path, Optional[dict]], Optional[dict]]) -> bool:
+        """
+        Install a complete generation produced elsewhere (a replication
+        snapshot) as the next generation. Under the index dir's writer lock,
+        fetch(staging_dir, current_manifest) writes the generation's files into
+        staging_dir and returns their manifest, or None to keep the current
+        one. Also works on read-only instances: this is how replicas receive
+        data. Other processes swap the new generation in when they next poll.
+        """
+        self._ensure_loaded()
+        with self._write_mutex, self._file_lock:
+            staging_dir = self.index_dir / f"{STAGING_DIRNAME}.{os.getpid()}"
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            staging_dir.mkdir()
+            try:
+                manifest = fetch(staging_dir, self._store.read_manifest())
+                if manifest is None:
+                    return False
+                self._adopt_files(staging_dir, manifest)
+                return True
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+    
+    def _commit(self, records: np.ndarray) -> None:
+        """
+        Make an in-memory mutation durable: append it to the delta log, or
+        checkpoint when the log is due for folding or the index was restructured.
+        Caller is the writer.
+        """
+        restructured = self._maybe_migrate()
+        if restructured or self._store.checkpoint_due(len(records), self.checkpoint_records):
+            self._checkpoint()
             return
-        exclude_pos = self._id_to_position[exclude_rid]
-        n = self._index.ntotal
-        vectors = np.zeros((n - 1, self.dimension), dtype=np.float32)
-        new_id_list = []
-        j = 0
-        for i in range(n):
-            if i == exclude_pos:
-                continue
-            vectors[j] = self._index.reconstruct(i)
-            new_id_list.append(self._id_list[i])
-            j += 1
-        self._index.reset()
-        self._index.add(vectors)
-        self._index.add(new_vec)
-        new_id_list.append(exclude_rid)
-        self._id_list = new_id_list
-        self._id_to_position = {r: i for i, r in enumerate(self._id_list)}
+        self._store.append(records)
+    
+    def _maybe_migrate(self) -> bool:
+        """
+        Replace the flat index with the configured ANN or quantized index once
+        the corpus is large enough. Labels are carried over (tombstones are
+        dropped on the way); quantized types keep the exact vectors for re-ranking.
+        Training runs while searches continue on the flat index. Caller is the writer.
+        """
+        target = configured_index_type()
+        if target == INDEX_TYPE_FLAT or index_type_of(self._index) != INDEX_TYPE_FLAT:
+            return False
+        n = len(self._mapping)
+        if n < max(ann_min_size(), min_training_size(target)):
+            return False
+        
+        started = time.perf_counter()
+        labels, vectors = export_vectors(self._index)
+        live = np.isin(labels, self._mapping.labels())
+        migrated = build_index(target, self.dimension, vectors[live], labels[live])
+        full = None
+        if index_type_of(migrated) in QUANTIZED_TYPES:
+            full = FullVectorStore(self.dimension, labels[live], vectors[live])
+        with self._lock.write():
+            self._index = migrated
+            self._full = full
+            self._set_tombstones(set())
+        logger.info(
+            f"Vector index migrated to {target} at {n} resumes "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return True
+    
+    def tombstone_fraction(self) -> float:
+        """Share of the stored vectors that are tombstones (dead slots)."""
+        self._ensure_loaded()
+        with self._lock.read():
+            return self._tombstone_fraction()
+    
+    def _tombstone_fraction(self) -> float:
+        stored = self._index.ntotal if self._index is not None else 0
+        if self._delta is not None:
+            stored += self._delta.ntotal
+        return len(self._tombstones) / stored if stored else 0.0
+    
+    def needs_compaction(self) -> bool:
+        """
+        True once tombstones exceed FAISS_TOMBSTONE_COMPACT_FRACTION of the
+        stored vectors (and TOMBSTONE_COMPACT_MIN), i.e. compact() is due.
+        """
+        self._ensure_loaded()
+        self._maybe_reload()
+        with self._lock.read():
+            return self._compaction_due()
+    
+    def _compaction_due(self) -> bool:
+        return (
+            len(self._tombstones) >= TOMBSTONE_COMPACT_MIN
+            and self._tombstone_fraction() > self.compact_fraction
+        )
+    
+    def compact(self, only_if_due: bool = False) -> int:
+        """
+        Physically remove tombstoned vectors and write a new base generation.
+        Returns the number of vectors reclaimed. With only_if_due, does nothing
+        unless needs_compaction() (re-checked under the writer lock, so
+        concurrent requests compact once).
+        """
+        self._ensure_loaded()
+        with self._writer():
+            if only_if_due and not self._compaction_due():
+                return 0
+            reclaimed = self._compact()
+            if reclaimed:
+                self._checkpoint()
+        return reclaimed
+    
+    def _compact(self) -> int:
+        """
+        The compacted copy is built while searches keep using the current
+        index, then swapped in. Caller is the writer.
+        """
+        tombstones = self._tombstones
+        if not tombstones:
+            return 0
+        started = time.perf_counter()
+        dead = np.fromiter(tombstones, dtype=np.int64, count=len(tombstones))
+        compacted = remove_labels(self._index, dead)
+        with self._lock.write():
+            self._index = compacted
+            self._set_tombstones(set())
+        logger.info(
+            f"Vector index compacted: {len(dead)} tombstones removed "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return len(dead)
     
     def search(
         self,
         query_embedding: List[float],
         k: int = 5,
+        *,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        skill_filter: Optional[SkillFilter] = None,
     ) -> List[Tuple[str, float]]:
         """
         Search for top-k similar resumes by cosine similarity.
         Returns List[(resume_id_str, score)] ordered by score descending.
+        
+        nprobe (IVF) and ef_search (HNSW) override the configured recall/speed
+        trade-off for this call; they are ignored by the flat index.
+        rerank_factor overrides FAISS_RERANK_FACTOR for a quantized index
+        (<= 1 returns the approximate scores as is).
+        since/until let a month-sharded index skip whole shards; a single
+        index has no time partitions and ignores them.
+        skill_filter (see skill_index) restricts results to the selected
+        resumes inside FAISS, so up to k matches are returned however few qualify.
         """
         if len(query_embedding) != self.dimension:
             raise ValueError(f"Query dimension {len(query_embedding)} != {self.dimension}")
+        return self.search_batch(
+            [query_embedding],
+            k,
+            nprobe=nprobe,
+            ef_search=ef_search,
+            rerank_factor=rerank_factor,
+            skill_filter=skill_filter,
+        )[0]
+    
+    def search_batch(
+        self,
+        query_embeddings,
+        k: int = 5,
+        *,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        skill_filter: Optional[SkillFilter] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k for many queries (a list of embeddings or an (n, dimension)
+        matrix) in one FAISS call, so the index is scanned once per batch
+        instead of once per query. Options as for search; the result list of
+        each query is in input order.
+        """
+        vecs = np.asarray(query_embeddings, dtype=np.float32)
+        if vecs.ndim != 2 or vecs.shape[1] != self.dimension:
+            raise ValueError(f"Query batch shape {vecs.shape} does not match dimension {self.dimension}")
+        if not len(vecs):
+            return []
         
-        with INDEX_LOCK:
-            self._ensure_loaded()
-            n = self._index.ntotal
+        self._ensure_loaded()
+        with self._lock.read():
+            n = len(self._mapping)
+            allowed = None
+            if skill_filter is not None and n:
+                allowed = self._label_filter(skill_filter)
+                n = allowed.count
             if n == 0:
-                return []
+                return [[] for _ in range(len(vecs))]
             
             k = min(k, n)
-            vec = np.array([query_embedding], dtype=np.float32)
-            scores, indices = self._index.search(vec, k)
+            factor = self.rerank_factor if rerank_factor is None else rerank_factor
+            rerank = self._full is not None and factor > 1
+            fetch = min(k * factor, n) if rerank else k
+            scores, labels = self._search_in(self._index, vecs, fetch, nprobe, ef_search, allowed)
+            if self._delta is not None and self._delta.ntotal:
+                delta_scores, delta_labels = self._search_in(
+                    self._delta, vecs, fetch, nprobe, ef_search, allowed
+                )
+                scores = np.concatenate([scores, delta_scores], axis=1)
+                labels = np.concatenate([labels, delta_labels], axis=1)
+                top = np.argsort(-scores, axis=1, kind='stable')[:, :fetch]
+                scores = np.take_along_axis(scores, top, axis=1)
+                labels = np.take_along_axis(labels, top, axis=1)
             
-            return [
-                (self._id_list[int(idx)], float(scores[0][i]))
-                for i, idx in enumerate(indices[0])
-                if 0 <= idx < len(self._id_list)
-            ]
+            batch = []
+            for i in range(len(vecs)):
+                row_scores, row_labels = scores[i:i + 1], labels[i:i + 1]
+                if rerank:
+                    row_scores, row_labels = self._rerank(vecs[i:i + 1], row_scores, row_labels, k)
+                results = []
+                for score, label in zip(row_scores[0], row_labels[0]):
+                    rid = self._mapping.id_of(int(label))
+                    if rid is not None:
+                        results.append((rid, float(score)))
+                batch.append(results)
+            return batch
+    
+    def range_search(
+        self,
+        query_embedding: List[float],
+        min_score: float,
+        max_results: int = DEFAULT_RANGE_MAX_RESULTS,
+        *,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank_factor: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        skill_filter: Optional[SkillFilter] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Every resume with cosine similarity >= min_score, best first, capped at
+        max_results. Same result format and options as search().
+        
+        Runs as one FAISS range search (one vectorized pass for a mapped flat
+        index) instead of growing k. For a quantized index candidates within
+        RANGE_RERANK_MARGIN of the threshold are re-scored exactly, unless
+        rerank_factor <= 1.
+        """
+        if len(query_embedding) != self.dimension:
+            raise ValueError(f"Query dimension {len(query_embedding)} != {self.dimension}")
+        
+        vec = np.array([query_embedding], dtype=np.float32)
+        self._ensure_loaded()
+        with self._lock.read():
+            n = len(self._mapping)
+            allowed = None
+            if skill_filter is not None and n:
+                allowed = self._label_filter(skill_filter)
+                n = allowed.count
+            if n == 0 or max_results <= 0:
+                return []
+            
+            factor = self.rerank_factor if rerank_factor is None else rerank_factor
+            rerank = self._full is not None and factor > 1
+            threshold = min_score - RANGE_RERANK_MARGIN if rerank else min_score
+            limit = min(max_results, n)
+            scores, labels = self._range_in(self._index, vec, threshold, limit, nprobe, ef_search, allowed)
+            if self._delta is not None and self._delta.ntotal:
+                delta_scores, delta_labels = self._range_in(
+                    self._delta, vec, threshold, limit, nprobe, ef_search, allowed
+                )
+                scores = np.concatenate([scores, delta_scores])
+                labels = np.concatenate([labels, delta_labels])
+            if rerank and len(labels):
+                exact = np.empty((len(labels), self.dimension), dtype=np.float32)
+                found = self._full.get(labels, out=exact)
+                scores = np.where(found, exact @ vec[0], scores)
+                keep = scores >= min_score
+                scores, labels = scores[keep], labels[keep]
+            if len(scores) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                scores, labels = scores[top], labels[top]
+            order = np.argsort(-scores, kind='stable')
+            
+            results = []
+            for score, label in zip(scores[order], labels[order]):
+                rid = self._mapping.id_of(int(label))
+                if rid is not None:
+                    results.append((rid, float(score)))
+            return results
+    
+    def _range_in(self, index, vec: np.ndarray, min_score: float, limit: int, nprobe, ef_search, allowed=None):
+        """
+        (scores, labels) of one index scoring >= min_score, hiding tombstones
+        and, with `allowed`, everything outside the filter. Caller holds the
+        shared lock.
+        """
+        if isinstance(index, MmapFlatIndex):
+            excluded = self._excluded_rows if allowed is None else ~allowed.contains(index.labels)
+            _, scores, labels = index.range_search(vec, min_score, excluded=excluded)
+            return scores, labels
+        if index_type_of(index) == INDEX_TYPE_PQ:
+            # No IDSelector support: range results are complete, so filtering afterwards is exact
+            params = None
+        elif allowed is None:
+            params = search_params(
+                index, nprobe=nprobe, ef_search=ef_search, selector=self._exclude_selector
+            )
+        else:
+            params = search_params(
+                index,
+                nprobe=nprobe,
+                ef_search=ef_search,
+                selector=allowed.selector,
+                k=limit,
+                selectivity=allowed.count / max(index.ntotal, 1),
+            )
+        try:
+            _, scores, labels = index.range_search(vec, min_score, params=params)
+        except RuntimeError:
+            # Index types without range search (older FAISS): the top `limit` are
+            # a superset of the capped answer
+            scores, labels = self._search_in(index, vec, min(limit, index.ntotal), nprobe, ef_search, allowed)
+            scores, labels = scores[0], labels[0]
+            keep = (labels >= 0) & (scores >= min_score)
+            return scores[keep], labels[keep]
+        if params is None:
+            if allowed is not None:
+                keep = allowed.contains(labels)
+            else:
+                keep = ~np.isin(labels, self._tombstone_labels)
+            scores, labels = scores[keep], labels[keep]
+        return scores, labels
+    
+    def _rerank(self, vec: np.ndarray, scores: np.ndarray, labels: np.ndarray, k: int):
+        """Exact scores for the candidates from the full-precision vectors. Caller holds the shared lock."""
+        valid = labels[0] >= 0
+        candidates = labels[0][valid]
+        exact = np.empty((len(candidates), self.dimension), dtype=np.float32)
+        found = self._full.get(candidates, out=exact)
+        exact_scores = np.where(found, exact @ vec[0], scores[0][valid])
+        top = np.argsort(-exact_scores, kind='stable')[:k]
+        return exact_scores[top][None], candidates[top][None]
+    
+    def _label_filter(self, skill_filter: SkillFilter) -> _LabelFilter:
+        """
+        Live labels of the filtered resumes, as a bitmap selector. The label of
+        every snapshot row is cached until the mapping or the snapshot changes,
+        so a query only gathers its rows. Caller holds the shared lock.
+        """
+        snapshot, mapping = skill_filter.snapshot, self._mapping
+        cached = self._row_labels
+        if cached is not None and cached[0] is snapshot and cached[1] is mapping and cached[2] == mapping.version:
+            row_labels = cached[3]
+        else:
+            row_labels = mapping.labels_of(snapshot.uuids)
+            self._row_labels = (snapshot, mapping, mapping.version, row_labels)
+        labels = row_labels[skill_filter.rows]
+        labels = labels[labels >= 0]
+        member = np.zeros(mapping.next_label, dtype=bool)
+        member[labels] = True
+        selector = allow_selector(np.packbits(member, bitorder='little'))
+        return _LabelFilter(member, selector, len(labels))
+    
+    def _search_in(self, index, vec: np.ndarray, k: int, nprobe, ef_search, allowed=None):
+        """
+        Search one index, hiding tombstones; with `allowed` (a _LabelFilter),
+        only those labels are eligible (they are all live). Caller holds the
+        shared lock.
+        """
+        if isinstance(index, MmapFlatIndex):
+            if allowed is not None:
+                return index.search(vec, k, excluded=~allowed.contains(index.labels))
+            return index.search(vec, k, excluded=self._excluded_rows)
+        if index_type_of(index) == INDEX_TYPE_PQ:
+            # IndexPQ does not support IDSelectors: over-fetch and drop tombstones
+            # or, when filtering, everything outside the filter
+            if allowed is not None:
+                fetch = min(index.ntotal, 2 * k * -(-index.ntotal // max(allowed.count, 1)))
+                scores, labels = index.search(vec, fetch)
+                return _first_kept(scores, labels, allowed.contains(labels), k)
+            if len(self._tombstone_labels):
+                scores, labels = index.search(vec, k + len(self._tombstone_labels))
+                return _first_kept(scores, labels, ~np.isin(labels, self._tombstone_labels), k)
+        if allowed is None:
+            params = search_params(
+                index, nprobe=nprobe, ef_search=ef_search, selector=self._exclude_selector
+            )
+        else:
+            params = search_params(
+                index,
+                nprobe=nprobe,
+                ef_search=ef_search,
+                selector=allowed.selector,
+                k=k,
+                selectivity=allowed.count / max(index.ntotal, 1),
+            )
+        return index.search(vec, k, params=params)
     
     def contains(self, resume_id: UUID) -> bool:
-        with INDEX_LOCK:
-            self._ensure_loaded()
-            return str(resume_id) in self._id_to_position
+        self._ensure_loaded()
+        with self._lock.read():
+            return str(resume_id) in self._mapping
+    
+    def get_vector(self, resume_id: UUID, created_at: Optional[datetime] = None) -> Optional[np.ndarray]:
+        """
+        The indexed vector of a resume (exact for quantized types, from the
+        full-precision store), or None if it is not indexed. created_at is
+        the partition key of a sharded index (ignored here).
+        """
+        self._ensure_loaded()
+        with self._lock.read():
+            label = self._mapping.label_of(str(resume_id))
+            if label is None:
+                return None
+            if self._full is not None:
+                vector = np.empty((1, self.dimension), dtype=np.float32)
+                if self._full.get(np.array([label], dtype=np.int64), out=vector)[0]:
+                    return vector[0]
+            # Read-only instances hold records logged since the checkpoint in the delta index
+            for index in (self._delta, self._index):
+                if index is not None and index.ntotal:
+                    vector = reconstruct_label(index, label)
+                    if vector is not None:
+                        return vector
+            return None
     
     def count(self) -> int:
-        with INDEX_LOCK:
-            self._ensure_loaded()
-            return self._index.ntotal
+        """Number of live (searchable) resumes."""
+        self._ensure_loaded()
+        with self._lock.read():
+            return len(self._mapping)
     
-    def _persist(self) -> None:
-        faiss.write_index(self._index, str(self.index_path))
-        with open(self.ids_path, 'w') as f:
-            json.dump(self._id_list, f)
+    def checkpoint(self) -> None:
+        """Fold the delta log into a new base generation now."""
+        self._ensure_loaded()
+        with self._writer():
+            self._checkpoint()
+    
+    def _checkpoint(self) -> None:
+        """
+        Write the current state as a new base generation with an empty delta
+        log, then publish it by atomically replacing the manifest. The previous
+        generation is kept so readers that already opened it can finish; older
+        ones are pruned. Caller is the writer; searches continue under the
+        shared lock.
+        """
+        with self._lock.read():
+            manifest = self._store.write_generation(self._index, self._mapping, self._full)
+        # Continue on the memory-mapped tables so the in-memory overlays stay small
+        mapping, full = self._store.open_tables(manifest)
+        with self._lock.write():
+            self._mapping = mapping
+            self._full = full
+        self._store.publish(manifest)
+
+
+# One shared index per worker process, keyed by (dimension, index_dir, read_only, sharding)
+_shared_indices: dict[tuple, "VectorIndexService | ShardedVectorIndex"] = {}
+_shared_indices_lock = threading.Lock()
+
+
+def get_vector_index(dimension: int = 384, read_only: bool = False) -> "VectorIndexService | ShardedVectorIndex":
+    """
+    Process-wide vector index service (lazy, loaded on first use).
+    Instances pick up log records and generations persisted by other processes.
+    A ShardedVectorIndex with the same interface when FAISS_SHARD_BY is set.
+    """
+    # Imported here: sharded_index builds on this module
+    from .sharded_index import ShardedVectorIndex, shard_by, shard_count
+    
+    key = (dimension, str(settings.FAISS_INDEX_PATH), read_only, shard_by(), shard_count())
+    service = _shared_indices.get(key)
+    if service is None:
+        with _shared_indices_lock:
+            service = _shared_indices.get(key)
+            if service is None:
+                if shard_by():
+                    service = ShardedVectorIndex(dimension=dimension, read_only=read_only)
+                else:
+                    service = VectorIndexService(dimension=dimension, read_only=read_only)
+                _shared_indices[key] = service
+    return service
+
+
+def get_search_index(dimension: int = 384) -> "VectorIndexService | ShardedVectorIndex":
+    """
+    Index for search-only callers (web views). Memory-mapped and read-only when
+    FAISS_MMAP_SEARCH is enabled, otherwise the regular shared instance.
+    """
+    return get_vector_index(dimension, read_only=getattr(settings, 'FAISS_MMAP_SEARCH', False))
+
+
+def get_job_index(dimension: int = 384, read_only: bool = False) -> VectorIndexService:
+    """
+    Process-wide index of job posting embeddings (FAISS_INDEX_PATH/jobs), for
+    resume -> jobs matching. Never sharded; labels map to job ids.
+    """
+    index_dir = Path(settings.FAISS_INDEX_PATH) / JOB_INDEX_DIRNAME
+    key = (JOB_INDEX_DIRNAME, dimension, str(index_dir), read_only)
+    service = _shared_indices.get(key)
+    if service is None:
+        with _shared_indices_lock:
+            service = _shared_indices.get(key)
+            if service is None:
+                service = VectorIndexService(dimension=dimension, index_dir=index_dir, read_only=read_only)
+                _shared_indices[key] = service
+    return service
 
 
-def get_vector_index(dimension: int = 384) -> VectorIndexService:
-    """Factory for vector index service."""
-    return VectorIndexService(dimension=dimension)
+def reset_vector_index_cache() -> None:
+    """Drop shared instances (for testing or after the index dir changes)."""
+    with _shared_indices_lock:
+        _shared_indices.clear()
@@ -0,0 +1,73 @@
+"""
+Full-precision vectors by label, for exact re-ranking of quantized search.
+
+The quantized index (sq8/pq) only holds lossy codes. Checkpoints also write
+the exact float32 vectors, sorted by label, as resume_index_vectors.<gen>.npy
+(same table format as mmap_index). The file is memory-mapped, so only the
+pages of re-ranked candidates are ever read. Vectors added since the
+checkpoint are kept in a small in-memory overlay.
+"""
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from .mmap_index import load_vectors, save_vectors
+
+
+class FullVectorStore:
+    """Exact vectors for a set of labels: sorted (mapped) base + overlay."""
+    
+    def __init__(self, dimension: int, labels: np.ndarray = None, vectors: np.ndarray = None):
+        self.dimension = dimension
+        if labels is None:
+            labels = np.zeros(0, dtype=np.int64)
+            vectors = np.zeros((0, dimension), dtype=np.float32)
+        order = np.argsort(labels, kind="stable")
+        self._init(labels[order], vectors[order])
+    
+    def _init(self, labels: np.ndarray, vectors: np.ndarray) -> None:
+        self._labels = labels
+        self._vectors = vectors
+        self._overlay: Dict[int, np.ndarray] = {}
+    
+    @classmethod
+    def load(cls, path: Path) -> "FullVectorStore":
+        """Memory-map a file written by save() (already sorted by label)."""
+        labels, vectors = load_vectors(path, mmap=True)
+        store = cls.__new__(cls)
+        store.dimension = vectors.shape[1]
+        store._init(labels, vectors)
+        return store
+    
+    def save(self, path: Path, live_labels: np.ndarray) -> None:
+        """Write the vectors of `live_labels` (dropping tombstones) sorted by label."""
+        live_labels = np.sort(live_labels)
+        vectors = np.empty((len(live_labels), self.dimension), dtype=np.float32)
+        found = self.get(live_labels, out=vectors)
+        save_vectors(path, live_labels[found], vectors[found])
+    
+    def put(self, labels: np.ndarray, vectors: np.ndarray) -> None:
+        for label, vector in zip(labels.tolist(), vectors):
+            self._overlay[label] = np.array(vector, dtype=np.float32)
+    
+    def get(self, labels: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Fill `out` (len(labels) x dimension) with the stored vectors.
+        Returns a boolean mask of the labels that were found.
+        """
+        if out is None:
+            out = np.empty((len(labels), self.dimension), dtype=np.float32)
+        found = np.zeros(len(labels), dtype=bool)
+        if len(self._labels):
+            pos = np.minimum(np.searchsorted(self._labels, labels), len(self._labels) - 1)
+            hit = self._labels[pos] == labels
+            out[hit] = self._vectors[pos[hit]]
+            found |= hit
+        if self._overlay:
+            for i, label in enumerate(labels.tolist()):
+                vector = self._overlay.get(label)
+                if vector is not None:
+                    out[i] = vector
+                    found[i] = True
+        return found
@@ -0,0 +1,160 @@
+"""
+Shared spool of index upserts waiting for the next group commit.
+
+Celery workers append their (resume id, vector) records here under a short
+lock instead of each committing to the index themselves; whichever process
+holds the index writer lock drains the spool and commits everything in one
+batch (see GroupCommit). Uses the delta log record format with label -1
+(labels are assigned by the writer).
+"""
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, ContextManager, List, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from .delta_log import (
+    HEADER_SIZE,
+    OP_UPSERT,
+    append_records,
+    create_log,
+    log_size,
+    make_records,
+    read_records,
+    record_dtype,
+    record_ids,
+)
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class PendingWriteQueue:
+    """Append-only spool file shared by every process using the same index dir."""
+    
+    def __init__(self, path: Path, dimension: int):
+        self.path = Path(path)
+        self.dimension = dimension
+        self._record_size = record_dtype(dimension).itemsize
+        self._lock = FileLock(self.path.with_name(self.path.name + '.lock'))
+    
+    def append(self, records: np.ndarray) -> None:
+        """
+        Durably queue records (fsync'd before returning). A torn record left
+        by a crashed append is overwritten.
+        """
+        with self._lock:
+            if log_size(self.path) < HEADER_SIZE:
+                create_log(self.path, self.dimension)
+            append_records(self.path, records, HEADER_SIZE + len(self) * self._record_size)
+    
+    def __len__(self) -> int:
+        return max(0, log_size(self.path) - HEADER_SIZE) // self._record_size
+    
+    def wait(self, max_items: int, max_wait: float, poll: float = 0.005) -> None:
+        """
+        Block until `max_items` records are queued, `max_wait` seconds pass, or
+        the queue stops growing between two polls (no other producers active).
+        """
+        deadline = time.monotonic() + max_wait
+        queued = len(self)
+        while queued < max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, poll))
+            grown = len(self)
+            if grown == queued:
+                return
+            queued = grown
+    
+    def read(self) -> Tuple[np.ndarray, int]:
+        """All complete queued records and the offset just past them."""
+        if len(self) == 0:
+            return np.zeros(0, dtype=record_dtype(self.dimension)), HEADER_SIZE
+        return read_records(self.path, self.dimension)
+    
+    def consume(self, offset: int) -> None:
+        """
+        Drop records before `offset` once they are committed. Records appended
+        since read() are carried over to the fresh spool file.
+        """
+        with self._lock:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                rest = f.read()
+            # Whole records only: a torn tail would misalign later appends
+            rest = rest[:len(rest) - len(rest) % self._record_size]
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            create_log(tmp_path, self.dimension)
+            if rest:
+                with open(tmp_path, 'ab') as f:
+                    f.write(rest)
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+
+class GroupCommit:
+    """
+    Group commit of one index's queued upserts (see VectorIndexService.enqueue).
+    
+    `commit(resume_ids, vectors)` upserts a batch into the index and is only
+    called by the writer. `try_writer()` is a context manager that makes the
+    caller the writer and yields True, or yields False at once when another
+    writer holds the lock.
+    """
+    
+    def __init__(
+        self,
+        queue: PendingWriteQueue,
+        commit: Callable[[List[str], np.ndarray], None],
+        try_writer: Callable[[], ContextManager[bool]],
+        max_items: int,
+        max_wait: float,
+    ):
+        self.queue = queue
+        self._commit = commit
+        self._try_writer = try_writer
+        self.max_items = max_items
+        self.max_wait = max_wait
+    
+    def submit(self, resume_id: UUID, embedding: List[float]) -> None:
+        """Durably queue one upsert."""
+        self.queue.append(make_records(
+            self.queue.dimension,
+            OP_UPSERT,
+            np.array([-1]),
+            [str(resume_id)],
+            np.array([embedding], dtype=np.float32),
+        ))
+    
+    def drain(self) -> None:
+        """
+        Commit the queued upserts, one batch per round, until the queue is
+        empty (items queued during a round go in the next). Caller is the writer.
+        """
+        while True:
+            records, offset = self.queue.read()
+            if not len(records):
+                return
+            self._commit(record_ids(records), np.ascontiguousarray(records["vector"]))
+            self.queue.consume(offset)
+            logger.debug(f"Group commit: {len(records)} queued resumes indexed")
+    
+    def flush(self) -> None:
+        """
+        Commit the queue unless another writer holds the lock, after waiting
+        briefly for more items. Every writer runs this after releasing the
+        lock, so an item queued while the lock was taken is committed by the
+        holder's re-check or by a later holder, never left in the queue.
+        """
+        while len(self.queue):
+            with self._try_writer() as writer:
+                if not writer:
+                    return
+                self.queue.wait(self.max_items, self.max_wait)
+                self.drain()
@@ -1,7 +1,7 @@
 """
 Job posting repository - handles all database operations for JobPosting.
 """
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from uuid import UUID
 
 from apps.resume_screening.models import JobPosting
@@ -40,6 +40,21 @@ class JobPostingRepository:
             job.save(update_fields=['embedding'])
         return job
     
+    @staticmethod
+    def get_by_ids(job_ids: list) -> List[JobPosting]:
+        """Get job postings by list of UUIDs, preserving order (missing ones are skipped)."""
+        if not job_ids:
+            return []
+        found = {str(j.id): j for j in JobPosting.objects.filter(id__in=job_ids)}
+        return [found[str(jid)] for jid in job_ids if str(jid) in found]
+    
+    @staticmethod
+    def iter_embeddings(chunk_size: int = 2000) -> Iterator[Tuple[UUID, list]]:
+        """(id, embedding) for job postings with a stored embedding (streamed)."""
+        return JobPosting.objects.exclude(embedding__isnull=True).values_list(
+            'id', 'embedding'
+        ).iterator(chunk_size=chunk_size)
+    
     @staticmethod
     def list_all(skip: int = 0, limit: int = 100) -> List[JobPosting]:
         return list(JobPosting.objects.all()[skip:skip + limit])
@@ -1,9 +1,13 @@
 """
 Resume repository - handles all database operations for Resume.
 """
-from typing import Optional, List
+from datetime import datetime
+from typing import Iterator, Optional, List, Tuple
 from uuid import UUID
 
+from django.db import connection
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
 from apps.resume_screening.models import Resume
 
 
@@ -61,11 +65,19 @@ class ResumeRepository:
         return resume
     
     @staticmethod
-    def get_by_ids(resume_ids: list) -> List[Resume]:
-        """Get resumes by list of UUIDs, preserving order."""
+    def update_top_jobs(resume_id: UUID, top_jobs: list) -> bool:
+        """Store the best-matching jobs recorded for a resume."""
+        return Resume.objects.filter(pk=resume_id).update(top_jobs=top_jobs) > 0
+    
+    @staticmethod
+    def get_by_ids(resume_ids: list, created_since: Optional[datetime] = None) -> List[Resume]:
+        """Get resumes by list of UUIDs, preserving order (optionally only those created since)."""
         if not resume_ids:
             return []
-        found = {str(r.id): r for r in Resume.objects.filter(id__in=resume_ids)}
+        queryset = Resume.objects.filter(id__in=resume_ids)
+        if created_since is not None:
+            queryset = queryset.filter(created_at__gte=created_since)
+        found = {str(r.id): r for r in queryset}
         return [found[str(rid)] for rid in resume_ids if str(rid) in found]
     
     @staticmethod
@@ -73,6 +85,109 @@ class ResumeRepository:
         """List resumes with pagination."""
         return list(Resume.objects.all()[skip:skip + limit])
     
+    @staticmethod
+    def update_embeddings(embeddings: List[Tuple[UUID, list]]) -> None:
+        """Store many embeddings in one bulk UPDATE."""
+        Resume.objects.bulk_update(
+            [Resume(id=resume_id, embedding=embedding) for resume_id, embedding in embeddings],
+            ['embedding'],
+        )
+    
+    @staticmethod
+    def iter_embeddings(
+        created_since: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        chunk_size: int = 2000,
+    ) -> Iterator[Tuple[UUID, list, datetime]]:
+        """
+        (id, embedding, created_at) for resumes with a stored embedding, optionally by creation time.
+        Streamed with a server-side cursor, chunk_size rows per fetch.
+        """
+        queryset = Resume.objects.exclude(embedding__isnull=True)
+        if created_since is not None:
+            queryset = queryset.filter(created_at__gte=created_since)
+        if created_before is not None:
+            queryset = queryset.filter(created_at__lt=created_before)
+        return queryset.values_list('id', 'embedding', 'created_at').iterator(chunk_size=chunk_size)
+    
+    @staticmethod
+    def iter_missing_embeddings(chunk_size: int = 2000) -> Iterator[Tuple[UUID, str, datetime]]:
+        """(id, raw_text, created_at) for resumes with text but no stored embedding (streamed)."""
+        queryset = Resume.objects.filter(embedding__isnull=True).exclude(raw_text="")
+        return queryset.values_list('id', 'raw_text', 'created_at').iterator(chunk_size=chunk_size)
+    
+    @staticmethod
+    def iter_ids(chunk_size: int = 20000) -> Iterator[Tuple[UUID, bool]]:
+        """(id, has_embedding) for every resume, without loading the rows (streamed)."""
+        return Resume.objects.annotate(
+            has_embedding=ExpressionWrapper(Q(embedding__isnull=False), output_field=BooleanField()),
+        ).values_list('id', 'has_embedding').iterator(chunk_size=chunk_size)
+    
+    @staticmethod
+    def get_embeddings(resume_ids: list) -> List[Tuple[UUID, list, datetime]]:
+        """(id, embedding, created_at) of the given resumes that have a stored embedding."""
+        if not resume_ids:
+            return []
+        return list(
+            Resume.objects.filter(id__in=resume_ids)
+            .exclude(embedding__isnull=True)
+            .values_list('id', 'embedding', 'created_at')
+        )
+    
+    @staticmethod
+    def iter_corpus(chunk_size: int = 2000) -> Iterator[Tuple[UUID, str, str, str, list, list, datetime]]:
+        """
+        (id, filename, file_path, raw_text, extracted_skills, embedding, created_at)
+        for every resume, unordered, streamed with a server-side cursor.
+        """
+        return Resume.objects.order_by().values_list(
+            'id', 'filename', 'file_path', 'raw_text', 'extracted_skills', 'embedding', 'created_at'
+        ).iterator(chunk_size=chunk_size)
+    
+    @staticmethod
+    def count() -> int:
+        return Resume.objects.count()
+    
+    @staticmethod
+    def bulk_insert(resumes: List[Resume], batch_size: int = 2000) -> int:
+        """
+        Insert many resumes in one statement per batch, keeping their
+        created_at (which auto_now_add would overwrite in save/bulk_create).
+        Rows whose id already exists are left as they are.
+        
+        Returns:
+            Number of rows inserted
+        """
+        fields = list(Resume._meta.concrete_fields)
+        table = connection.ops.quote_name(Resume._meta.db_table)
+        columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+        pk = connection.ops.quote_name(Resume._meta.pk.column)
+        row = "(" + ", ".join(["%s"] * len(fields)) + ")"
+        batch_size = max(1, min(batch_size, connection.ops.bulk_batch_size(fields, resumes)))
+        inserted = 0
+        with connection.cursor() as cursor:
+            for start in range(0, len(resumes), batch_size):
+                batch = resumes[start:start + batch_size]
+                params = [
+                    f.get_db_prep_save(getattr(resume, f.attname), connection)
+                    for resume in batch
+                    for f in fields
+                ]
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) VALUES {', '.join([row] * len(batch))} "
+                    f"ON CONFLICT ({pk}) DO NOTHING",
+                    params,
+                )
+                inserted += max(cursor.rowcount, 0)
+        return inserted
+    
+    @staticmethod
+    def iter_skills() -> Iterator[Tuple[UUID, list]]:
+        """(id, extracted_skills) for resumes with extracted skills."""
+        return Resume.objects.exclude(extracted_skills__isnull=True).values_list(
+            'id', 'extracted_skills'
+        ).iterator()
+    
     @staticmethod
     def delete(resume_id: UUID) -> bool:
         """Delete a Resume by UUID."""
@@ -0,0 +1,94 @@
+"""
+Benchmark query embedding under concurrent load, with and without
+micro-batching (BatchingEmbeddingProvider): throughput, p50/p99 latency and
+the mean forward-pass batch size.
+
+Calls the model provider directly (not EmbeddingService), so the embedding
+cache does not hide the model cost.
+
+Usage:
+    python manage.py benchmark_embedding_batching --threads 1,8,32 --duration 10
+    python manage.py benchmark_embedding_batching --max-items 64 --wait-ms 2
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.resume_screening.infrastructure.ai.batching_provider import BatchingEmbeddingProvider
+from apps.resume_screening.infrastructure.ai.sentence_transformer_provider import SentenceTransformerProvider
+
+QUERY_WORDS = (
+    "senior python developer django postgres aws kubernetes machine learning "
+    "data engineer spark airflow react typescript product manager agile "
+    "devops terraform java spring microservices nlp computer vision"
+).split()
+
+
+def sample_queries(n: int, seed: int = 0) -> list:
+    """Distinct short search-style queries."""
+    rng = np.random.default_rng(seed)
+    return [
+        " ".join(rng.choice(QUERY_WORDS, size=int(rng.integers(3, 12)))) + f" #{i}"
+        for i in range(n)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Measure concurrent single-query encode throughput and latency with and without micro-batching."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", default="1,8,32", help="Comma-separated concurrent callers")
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per run")
+        parser.add_argument("--max-items", type=int, default=32, help="Batching: texts per forward pass")
+        parser.add_argument("--wait-ms", type=float, default=5.0, help="Batching: max wait for a batch to fill")
+    
+    def handle(self, *args, **options):
+        provider = SentenceTransformerProvider()
+        queries = sample_queries(10000)
+        provider.encode(queries[:32])  # load the model and warm up
+        
+        for threads in [int(t) for t in options["threads"].split(",") if t.strip()]:
+            plain = self._run(provider, queries, threads, options["duration"])
+            batching = BatchingEmbeddingProvider(
+                provider, max_items=options["max_items"], max_wait=options["wait_ms"] / 1000
+            )
+            batched = self._run(batching, queries, threads, options["duration"])
+            for name, result in (("plain", plain), ("batched", batched)):
+                self.stdout.write(
+                    f"threads={threads:<3d} {name:<8} qps={result['qps']:8.1f}  "
+                    f"p50={result['p50']:7.2f}ms  p99={result['p99']:7.2f}ms"
+                )
+            self.stdout.write(
+                f"threads={threads:<3d} speedup={batched['qps'] / plain['qps']:.2f}x  "
+                f"mean batch={batching.stats()['mean_batch_size']}"
+            )
+    
+    @staticmethod
+    def _run(provider, queries, threads, duration) -> dict:
+        latencies = []
+        lock = threading.Lock()
+        stop = time.perf_counter() + duration
+        
+        def worker(offset):
+            mine = []
+            i = offset
+            while time.perf_counter() < stop:
+                started = time.perf_counter()
+                provider.encode_single(queries[i % len(queries)])
+                mine.append((time.perf_counter() - started) * 1000)
+                i += threads
+            with lock:
+                latencies.extend(mine)
+        
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(worker, range(threads)))
+        elapsed = time.perf_counter() - started
+        return {
+            "qps": len(latencies) / elapsed,
+            "p50": float(np.percentile(latencies, 50)),
+            "p99": float(np.percentile(latencies, 99)),
+        }
@@ -0,0 +1,110 @@
+"""
+Measure bulk encode throughput on a mixed-length corpus (job titles, job
+descriptions, resumes) with fixed input-order batches, length-bucketed
+batches, and length-bucketed batches sized by a token budget. Also reports
+padding efficiency: real tokens / tokens actually computed.
+
+SentenceTransformer.encode sorts its inputs by character length before
+batching, so for that provider the "input order" baseline is already
+length-sorted: plain bucketing hands the texts straight to it and only the
+token-budget mode batches differently. The baseline's padding efficiency is
+reported for the batches the model actually runs.
+
+Usage:
+    python manage.py benchmark_length_bucketing --texts 2000
+    python manage.py benchmark_length_bucketing --provider onnx --max-tokens 4096
+"""
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.resume_screening.infrastructure.ai.embedding_service import PROVIDER_ONNX, PROVIDER_SENTENCE_TRANSFORMERS
+from apps.resume_screening.infrastructure.ai.length_batching import length_batches
+from apps.resume_screening.infrastructure.ai.onnx_provider import OnnxEmbeddingProvider
+from apps.resume_screening.infrastructure.ai.sentence_transformer_provider import (
+    SentenceTransformerProvider,
+    estimate_token_lengths,
+)
+from apps.resume_screening.management.commands.benchmark_embedding_batching import QUERY_WORDS
+from apps.resume_screening.management.commands.onnx_embedding_model import sample_texts
+from apps.resume_screening.models import JobPosting
+
+
+def mixed_corpus(n: int, seed: int = 0) -> list:
+    """About one third short job titles, the rest resume/job texts of mixed length, shuffled."""
+    rng = np.random.default_rng(seed)
+    titles = list(JobPosting.objects.values_list("title", flat=True)[: n // 3])
+    while len(titles) < n // 3:
+        titles.append(" ".join(rng.choice(QUERY_WORDS, size=int(rng.integers(2, 6)))))
+    texts = titles + sample_texts(n - len(titles), seed=seed)
+    return [texts[i] for i in rng.permutation(len(texts))]
+
+
+def padding_efficiency(lengths, batches) -> float:
+    real = sum(lengths)
+    padded = sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+    return real / padded if padded else 1.0
+
+
+class Command(BaseCommand):
+    help = "Compare bulk encode throughput with and without length-bucketed batching on a mixed corpus."
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--provider",
+            choices=[PROVIDER_SENTENCE_TRANSFORMERS, PROVIDER_ONNX],
+            default=None,
+            help="Default: EMBEDDING_PROVIDER",
+        )
+        parser.add_argument("--texts", type=int, default=1000)
+        parser.add_argument("--batch-size", type=int, default=32)
+        parser.add_argument("--max-tokens", type=int, default=32 * 256, help="Token budget per batch")
+        parser.add_argument("--repeat", type=int, default=2, help="Timed runs per mode (best is reported)")
+    
+    def handle(self, *args, **options):
+        name = options["provider"] or getattr(settings, 'EMBEDDING_PROVIDER', PROVIDER_SENTENCE_TRANSFORMERS)
+        provider_class = OnnxEmbeddingProvider if name == PROVIDER_ONNX else SentenceTransformerProvider
+        batch_size = options["batch_size"]
+        texts = mixed_corpus(options["texts"])
+        modes = [
+            ("input order", dict(length_bucketing=False)),
+            ("bucketed", dict(length_bucketing=True, max_batch_tokens=0)),
+            (f"tokens<={options['max_tokens']}", dict(length_bucketing=True, max_batch_tokens=options["max_tokens"])),
+        ]
+        
+        lengths = None
+        baseline = None
+        for label, kwargs in modes:
+            provider = provider_class(**kwargs)
+            provider.encode(texts[:batch_size], batch_size=batch_size)  # load + warm up
+            if lengths is None:
+                lengths = provider.token_lengths(texts)
+                self.stdout.write(
+                    f"{name}: {len(texts)} texts, tokens min={min(lengths)} "
+                    f"median={int(np.median(lengths))} max={max(lengths)}"
+                )
+            if name != PROVIDER_ONNX:
+                # encode sorts by characters itself; a budget sizes by estimated tokens
+                if kwargs["length_bucketing"] and kwargs["max_batch_tokens"] > 0:
+                    batches = length_batches(estimate_token_lengths(texts), batch_size, kwargs["max_batch_tokens"])
+                else:
+                    batches = length_batches([len(t) for t in texts], batch_size)
+            elif kwargs["length_bucketing"]:
+                batches = length_batches(lengths, batch_size, kwargs["max_batch_tokens"])
+            else:
+                batches = [range(s, min(s + batch_size, len(texts))) for s in range(0, len(texts), batch_size)]
+            elapsed = min(self._time(provider, texts, batch_size) for _ in range(max(1, options["repeat"])))
+            rate = len(texts) / elapsed
+            baseline = baseline or rate
+            self.stdout.write(
+                f"{label:<16} batches={len(batches):<5d} padding efficiency={padding_efficiency(lengths, batches):5.1%}  "
+                f"{rate:8.1f} texts/s  ({rate / baseline:.2f}x)"
+            )
+    
+    @staticmethod
+    def _time(provider, texts, batch_size) -> float:
+        started = time.perf_counter()
+        provider.encode(texts, batch_size=batch_size)
+        return time.perf_counter() - started
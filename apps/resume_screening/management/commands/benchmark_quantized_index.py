@@ -0,0 +1,107 @@
+"""
+Compare quantized index modes (sq8, pq) against the exact flat index:
+in-memory index size, search latency and recall@k, with and without exact
+re-ranking.
+
+Usage:
+    python manage.py benchmark_quantized_index --size 100000 --types sq8,pq --rerank-factors 1,4
+    python manage.py benchmark_quantized_index --from-db
+"""
+import tempfile
+import time
+import uuid
+
+import faiss
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from apps.resume_screening.infrastructure.ai.vector_index_service import VectorIndexService
+from apps.resume_screening.management.commands.benchmark_vector_index import random_unit_vectors
+from apps.resume_screening.models import Resume
+
+
+class Command(BaseCommand):
+    help = "Measure memory, latency and recall@k of sq8/pq indexes against the flat index."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=100000, help="Synthetic corpus size")
+        parser.add_argument("--dimension", type=int, default=384)
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--k", type=int, default=10)
+        parser.add_argument("--types", default="sq8,pq", help="Comma-separated quantized types")
+        parser.add_argument("--rerank-factors", default="1,4", help="1 = no re-ranking")
+        parser.add_argument("--pq-m", type=int, default=48, help="PQ sub-quantizers (bytes per vector)")
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Use stored resume embeddings instead of synthetic vectors",
+        )
+    
+    def handle(self, *args, **options):
+        k = options["k"]
+        vectors = self._corpus(options)
+        dimension = vectors.shape[1]
+        rng = np.random.default_rng(1)
+        sample = rng.choice(len(vectors), size=min(options["queries"], len(vectors)), replace=False)
+        # Perturbed corpus vectors: realistic near-duplicate queries
+        queries = vectors[sample] + 0.05 * rng.standard_normal((len(sample), dimension)).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        items = [(uuid.uuid4(), vec) for vec in vectors]
+        self.stdout.write(f"Corpus: {len(vectors)} x {dimension}, {len(queries)} queries, k={k}")
+        
+        self._tmp = tempfile.TemporaryDirectory()
+        try:
+            self._compare(items, queries, k, dimension, options)
+        finally:
+            self._tmp.cleanup()
+    
+    def _compare(self, items, queries, k, dimension, options):
+        flat, flat_bytes = self._build("flat", items, dimension, options)
+        exact, flat_ms = self._run(flat, queries, k, rerank_factor=1)
+        self.stdout.write(
+            f"{'flat':<6} rerank=-  index={flat_bytes / 1e6:8.1f}MB  "
+            f"latency={flat_ms:7.2f}ms  recall@{k}=1.000"
+        )
+        
+        for index_type in [t.strip() for t in options["types"].split(",") if t.strip()]:
+            index, index_bytes = self._build(index_type, items, dimension, options)
+            for factor in [int(f) for f in options["rerank_factors"].split(",")]:
+                found, ms = self._run(index, queries, k, rerank_factor=factor)
+                recall = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, exact) if b])
+                self.stdout.write(
+                    f"{index_type:<6} rerank={factor:<2d} index={index_bytes / 1e6:8.1f}MB "
+                    f"({flat_bytes / index_bytes:4.1f}x smaller)  latency={ms:7.2f}ms "
+                    f"({ms / flat_ms:4.2f}x)  recall@{k}={recall:.3f}"
+                )
+    
+    def _corpus(self, options) -> np.ndarray:
+        if not options["from_db"]:
+            return random_unit_vectors(options["size"], options["dimension"])
+        embeddings = Resume.objects.exclude(embedding__isnull=True).values_list("embedding", flat=True)
+        vectors = np.array([e for e in embeddings.iterator() if e], dtype=np.float32)
+        if not len(vectors):
+            raise CommandError("No stored embeddings found")
+        return vectors
+    
+    def _build(self, index_type, items, dimension, options):
+        tmp = tempfile.mkdtemp(dir=self._tmp.name)
+        with override_settings(
+            FAISS_INDEX_TYPE=index_type,
+            FAISS_ANN_MIN_SIZE=0,
+            FAISS_PQ_M=options["pq_m"],
+            FAISS_LOG_CHECKPOINT_RECORDS=10 ** 9,
+        ):
+            index = VectorIndexService(dimension=dimension, index_dir=tmp)
+            started = time.perf_counter()
+            index.add_batch(items)
+            self.stdout.write(f"Built {index.index_type} in {time.perf_counter() - started:.1f}s")
+        return index, len(faiss.serialize_index(index._index))
+    
+    def _run(self, index, queries, k, rerank_factor):
+        found = []
+        started = time.perf_counter()
+        for q in queries:
+            found.append([rid for rid, _ in index.search(q.tolist(), k=k, rerank_factor=rerank_factor)])
+        elapsed_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        return found, elapsed_ms
@@ -0,0 +1,96 @@
+"""
+Benchmark vector index search throughput against thread count.
+
+Usage:
+    python manage.py benchmark_vector_index --size 100000 --threads 1,2,4,8
+"""
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.resume_screening.infrastructure.ai.vector_index_service import VectorIndexService
+
+
+def random_unit_vectors(n: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """Synthetic L2-normalized float32 vectors."""
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dimension)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs
+
+
+class Command(BaseCommand):
+    help = "Measure VectorIndexService.search QPS for increasing thread counts (synthetic corpus)."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=50000, help="Number of indexed vectors")
+        parser.add_argument("--dimension", type=int, default=384)
+        parser.add_argument("--threads", default="1,2,4,8", help="Comma-separated thread counts")
+        parser.add_argument("--duration", type=float, default=3.0, help="Seconds per thread count")
+        parser.add_argument("--k", type=int, default=10)
+        parser.add_argument(
+            "--write-interval",
+            type=float,
+            default=0.0,
+            help="If > 0, a writer thread adds one vector every N seconds during the run",
+        )
+    
+    def handle(self, *args, **options):
+        size = options["size"]
+        dimension = options["dimension"]
+        thread_counts = [int(t) for t in options["threads"].split(",") if t.strip()]
+        duration = options["duration"]
+        k = options["k"]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            index = VectorIndexService(dimension=dimension, index_dir=tmp)
+            vectors = random_unit_vectors(size, dimension)
+            started = time.perf_counter()
+            index.add_batch([(uuid.uuid4(), vec) for vec in vectors])
+            self.stdout.write(
+                f"Indexed {size} x {dimension} vectors in {time.perf_counter() - started:.2f}s"
+            )
+            queries = [q.tolist() for q in random_unit_vectors(1000, dimension, seed=1)]
+            
+            baseline = None
+            for n_threads in thread_counts:
+                qps = self._run(index, queries, k, n_threads, duration, options["write_interval"])
+                baseline = baseline or qps
+                self.stdout.write(
+                    f"threads={n_threads:<3d} qps={qps:10.1f} speedup={qps / baseline:5.2f}x"
+                )
+    
+    def _run(self, index, queries, k, n_threads, duration, write_interval) -> float:
+        stop = threading.Event()
+        counts = [0] * n_threads
+        
+        def reader(slot: int) -> None:
+            i = slot
+            while not stop.is_set():
+                index.search(queries[i % len(queries)], k=k)
+                counts[slot] += 1
+                i += n_threads
+        
+        def writer() -> None:
+            extra = random_unit_vectors(1000, index.dimension, seed=2)
+            i = 0
+            while not stop.wait(write_interval):
+                index.add(uuid.uuid4(), extra[i % len(extra)].tolist())
+                i += 1
+        
+        with ThreadPoolExecutor(max_workers=n_threads + 1) as pool:
+            futures = [pool.submit(reader, slot) for slot in range(n_threads)]
+            if write_interval > 0:
+                futures.append(pool.submit(writer))
+            started = time.perf_counter()
+            time.sleep(duration)
+            stop.set()
+            for f in futures:
+                f.result()
+            elapsed = time.perf_counter() - started
+        return sum(counts) / elapsed
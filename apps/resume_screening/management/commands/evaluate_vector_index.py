@@ -0,0 +1,204 @@
+"""
+Evaluate candidate vector index configurations against exact search:
+recall@k, p50/p99 query latency, build time and index memory, written as
+JSON so runs can be compared between releases.
+
+Ground truth is the exact top-k of a flat inner-product index over the same
+corpus. Queries are the stored job posting embeddings (the real workload)
+or, when there are none, perturbed corpus vectors.
+
+Configurations are "<type>[:param=value...]", with params
+    ivf    nlist, nprobe
+    hnsw   m, ef_construction, ef_search
+    sq8    rerank
+    pq     m, rerank
+
+Usage:
+    python manage.py evaluate_vector_index --from-db --output eval.json
+    python manage.py evaluate_vector_index --size 200000 \\
+        --configs flat,ivf:nprobe=8,ivf:nprobe=32,hnsw:ef_search=64,sq8:rerank=4,pq:m=48:rerank=4
+"""
+import json
+import platform
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+import faiss
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from apps.resume_screening.infrastructure.ai.vector_index_service import VectorIndexService
+from apps.resume_screening.management.commands.benchmark_vector_index import random_unit_vectors
+from apps.resume_screening.models import JobPosting, Resume
+
+DEFAULT_CONFIGS = "flat,ivf:nprobe=8,ivf:nprobe=32,hnsw:ef_search=32,hnsw:ef_search=128,sq8:rerank=4,pq:rerank=4"
+WARMUP_QUERIES = 10
+# Build-time settings per config param; the other params are search options
+BUILD_SETTINGS = {
+    ("ivf", "nlist"): "FAISS_IVF_NLIST",
+    ("hnsw", "m"): "FAISS_HNSW_M",
+    ("hnsw", "ef_construction"): "FAISS_HNSW_EF_CONSTRUCTION",
+    ("pq", "m"): "FAISS_PQ_M",
+}
+SEARCH_OPTIONS = {"nprobe": "nprobe", "ef_search": "ef_search", "rerank": "rerank_factor"}
+
+
+def parse_config(spec: str) -> Tuple[str, Dict[str, int], Dict[str, int]]:
+    """"hnsw:m=32:ef_search=64" -> ("hnsw", build settings, search options)."""
+    index_type, *params = spec.strip().split(":")
+    build, search = {}, {}
+    for param in params:
+        name, _, value = param.partition("=")
+        try:
+            value = int(value)
+        except ValueError:
+            raise CommandError(f"{spec}: {param!r} is not name=integer")
+        if (index_type, name) in BUILD_SETTINGS:
+            build[BUILD_SETTINGS[(index_type, name)]] = value
+        elif name in SEARCH_OPTIONS:
+            search[SEARCH_OPTIONS[name]] = value
+        else:
+            raise CommandError(f"{spec}: unknown parameter {name!r} for {index_type}")
+    return index_type, build, search
+
+
+class Command(BaseCommand):
+    help = "Measure recall@k, latency, build time and memory of index configurations (JSON report)."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--from-db", action="store_true", help="Use stored resume embeddings as the corpus")
+        parser.add_argument("--size", type=int, default=100000, help="Synthetic corpus size")
+        parser.add_argument("--dimension", type=int, default=384, help="Synthetic corpus dimension")
+        parser.add_argument("--queries", type=int, default=500, help="Most queries to run")
+        parser.add_argument(
+            "--query-source",
+            choices=["auto", "jobs", "corpus"],
+            default="auto",
+            help="jobs: stored job embeddings; corpus: perturbed corpus vectors; auto: jobs if any",
+        )
+        parser.add_argument("--k", type=int, default=10)
+        parser.add_argument("--configs", default=DEFAULT_CONFIGS, help="Comma-separated configurations")
+        parser.add_argument("--output", help="Write the JSON report to this file (default: stdout)")
+    
+    def handle(self, *args, **options):
+        k = options["k"]
+        specs = [spec.strip() for spec in options["configs"].split(",") if spec.strip()]
+        configs = [parse_config(spec) for spec in specs]
+        vectors = self._corpus(options)
+        queries, query_source = self._queries(vectors, options)
+        ids = [uuid.uuid4() for _ in range(len(vectors))]
+        truth = self._ground_truth(vectors, queries, k, ids)
+        self.stderr.write(f"Corpus: {len(vectors)} x {vectors.shape[1]}, {len(queries)} {query_source} queries, k={k}")
+        
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for spec, (index_type, build, search) in zip(specs, configs):
+                result = self._evaluate(spec, index_type, build, search, ids, vectors, queries, truth, k, tmp)
+                self.stderr.write(
+                    f"{result['config']:<24} {result['built_type']:<5} recall@{k}={result['recall']:.4f}  "
+                    f"p50={result['latency_ms']['p50']:.2f}ms  p99={result['latency_ms']['p99']:.2f}ms  "
+                    f"build={result['build_seconds']:.1f}s  memory={result['memory_bytes'] / 1e6:.1f}MB"
+                )
+                results.append(result)
+        
+        report = json.dumps({
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "faiss": faiss.__version__,
+                "numpy": np.__version__,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "faiss_threads": faiss.omp_get_max_threads(),
+            },
+            "corpus": {
+                "source": "db" if options["from_db"] else "synthetic",
+                "size": len(vectors),
+                "dimension": int(vectors.shape[1]),
+            },
+            "queries": {"source": query_source, "count": len(queries)},
+            "k": k,
+            "results": results,
+        }, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(report + "\n")
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(report)
+    
+    def _corpus(self, options) -> np.ndarray:
+        if not options["from_db"]:
+            return random_unit_vectors(options["size"], options["dimension"])
+        embeddings = Resume.objects.exclude(embedding__isnull=True).values_list("embedding", flat=True)
+        vectors = np.array([e for e in embeddings.iterator() if e], dtype=np.float32)
+        if not len(vectors):
+            raise CommandError("No stored embeddings found")
+        return vectors
+    
+    def _queries(self, vectors: np.ndarray, options) -> Tuple[np.ndarray, str]:
+        limit = options["queries"]
+        if options["query_source"] in ("auto", "jobs"):
+            embeddings = JobPosting.objects.exclude(embedding__isnull=True).values_list("embedding", flat=True)
+            jobs = [e for e in embeddings[:limit] if e and len(e) == vectors.shape[1]]
+            if jobs:
+                return np.array(jobs, dtype=np.float32), "jobs"
+            if options["query_source"] == "jobs":
+                raise CommandError("No stored job embeddings with the corpus dimension")
+        # Perturbed corpus vectors: near-duplicate queries
+        rng = np.random.default_rng(1)
+        sample = rng.choice(len(vectors), size=min(limit, len(vectors)), replace=False)
+        queries = vectors[sample] + 0.05 * rng.standard_normal((len(sample), vectors.shape[1])).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        return queries, "corpus"
+    
+    @staticmethod
+    def _ground_truth(vectors: np.ndarray, queries: np.ndarray, k: int, ids: List[uuid.UUID]) -> List[set]:
+        exact = faiss.IndexFlatIP(vectors.shape[1])
+        exact.add(vectors)
+        _, rows = exact.search(queries, k)
+        return [{str(ids[row]) for row in query_rows if row >= 0} for query_rows in rows]
+    
+    def _evaluate(self, spec, index_type, build, search, ids, vectors, queries, truth, k, tmp) -> dict:
+        with override_settings(
+            FAISS_INDEX_TYPE=index_type,
+            FAISS_ANN_MIN_SIZE=0,
+            FAISS_LOG_CHECKPOINT_RECORDS=10 ** 9,
+            **build,
+        ):
+            index = VectorIndexService(dimension=vectors.shape[1], index_dir=tempfile.mkdtemp(dir=tmp))
+            started = time.perf_counter()
+            index.add_batch(list(zip(ids, vectors)))
+            build_seconds = time.perf_counter() - started
+        
+        for q in queries[:WARMUP_QUERIES]:
+            index.search(q, k=k, **search)
+        latencies, recalls = [], []
+        for q, expected in zip(queries, truth):
+            started = time.perf_counter()
+            found = index.search(q, k=k, **search)
+            latencies.append((time.perf_counter() - started) * 1000)
+            recalls.append(len(expected.intersection(rid for rid, _ in found)) / max(len(expected), 1))
+        
+        index_bytes = len(faiss.serialize_index(index._index))
+        rerank_bytes = len(ids) * vectors.shape[1] * 4 if index._full is not None else 0
+        return {
+            "config": spec,
+            "index_type": index_type,
+            "built_type": index.index_type,
+            "build_settings": build,
+            "search_options": search,
+            "recall": round(float(np.mean(recalls)), 4),
+            "latency_ms": {
+                "mean": round(float(np.mean(latencies)), 3),
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3),
+            },
+            "qps": round(1000 / float(np.mean(latencies)), 1),
+            "build_seconds": round(build_seconds, 2),
+            "memory_bytes": index_bytes,
+            "rerank_store_bytes": rerank_bytes,
+        }
@@ -0,0 +1,30 @@
+"""
+Export the resume corpus (ids, embeddings, skills, metadata) to an .npz snapshot.
+
+Usage:
+    python manage.py export_corpus corpus.npz
+    python manage.py export_corpus corpus.npz --no-text --compress
+"""
+from django.core.management.base import BaseCommand
+
+from apps.resume_screening.application.services.corpus_snapshot_service import CorpusSnapshotService
+
+
+class Command(BaseCommand):
+    help = "Write every resume with its embedding to a columnar .npz snapshot (see import_corpus)."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Output file (.npz)")
+        parser.add_argument("--no-text", action="store_true", help="Leave out raw_text (much smaller)")
+        parser.add_argument("--compress", action="store_true", help="zlib-compress the archive")
+    
+    def handle(self, *args, **options):
+        report = CorpusSnapshotService.export_corpus(
+            options["path"],
+            include_text=not options["no_text"],
+            compress=options["compress"],
+        )
+        self.stdout.write(
+            f"Exported {report['resumes']} resumes ({report['embeddings']} with embeddings) "
+            f"to {options['path']}: {report['bytes'] / 1e6:.1f} MB"
+        )
@@ -0,0 +1,43 @@
+"""
+Bootstrap a node from an .npz corpus snapshot written by export_corpus:
+bulk-load the resume rows and build the vector index from the stored
+embeddings (no model calls).
+
+Usage:
+    python manage.py import_corpus corpus.npz
+    python manage.py import_corpus corpus.npz --skip-db   # shared database, index only
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.resume_screening.application.services.corpus_snapshot_service import (
+    IMPORT_BATCH_SIZE,
+    CorpusSnapshotService,
+)
+
+
+class Command(BaseCommand):
+    help = "Load resumes and build the vector index from a corpus snapshot (see export_corpus)."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file (.npz)")
+        parser.add_argument("--skip-db", action="store_true", help="Only build the vector index")
+        parser.add_argument("--skip-index", action="store_true", help="Only load the database rows")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            report = CorpusSnapshotService.import_corpus(
+                options["path"],
+                load_database=not options["skip_db"],
+                build_index=not options["skip_index"],
+                batch_size=options["batch_size"],
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            f"Imported {report['resumes']} resumes, indexed {report['indexed']} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
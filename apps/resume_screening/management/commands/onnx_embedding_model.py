@@ -0,0 +1,114 @@
+"""
+Export the embedding model to ONNX, check it against the PyTorch provider and
+benchmark both.
+
+    export     write model.onnx (+ int8 model_int8.onnx) and the tokenizer to
+               EMBEDDING_ONNX_DIR
+    parity     cosine similarity of ONNX vs SentenceTransformer embeddings on the
+               same texts; fails below --min-cosine (default 0.99)
+    benchmark  model load time and encode throughput (texts/s) of each provider
+
+Texts are stored resumes and job descriptions (truncated as in production),
+or synthetic ones when the database has none.
+
+Usage:
+    python manage.py onnx_embedding_model export
+    python manage.py onnx_embedding_model parity --texts 500
+    python manage.py onnx_embedding_model benchmark --texts 1000 --batch-size 32
+"""
+import time
+from typing import List
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.resume_screening.infrastructure.ai.onnx_provider import OnnxEmbeddingProvider, export_onnx_model
+from apps.resume_screening.infrastructure.ai.sentence_transformer_provider import SentenceTransformerProvider
+from apps.resume_screening.management.commands.benchmark_embedding_batching import QUERY_WORDS
+from apps.resume_screening.models import JobPosting, Resume
+
+MIN_COSINE = 0.99
+
+
+def sample_texts(n: int, seed: int = 0) -> List[str]:
+    """Up to `n` stored resume/job texts, topped up with synthetic ones of mixed length."""
+    texts = [t[:4000] for t in Resume.objects.exclude(raw_text="").values_list("raw_text", flat=True)[:n]]
+    texts += [t[:2000] for t in JobPosting.objects.values_list("description", flat=True)[: max(0, n - len(texts))]]
+    rng = np.random.default_rng(seed)
+    while len(texts) < n:
+        texts.append(" ".join(rng.choice(QUERY_WORDS, size=int(rng.integers(3, 600)))))
+    return texts
+
+
+class Command(BaseCommand):
+    help = "Export the embedding model to ONNX (int8), check parity with PyTorch, benchmark throughput."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["export", "parity", "benchmark"])
+        parser.add_argument("--output", help="Export directory (default: EMBEDDING_ONNX_DIR)")
+        parser.add_argument("--no-quantize", action="store_true", help="Export only the fp32 model")
+        parser.add_argument("--fp32", action="store_true", help="parity/benchmark: use the fp32 model, not int8")
+        parser.add_argument("--texts", type=int, default=500)
+        parser.add_argument("--batch-size", type=int, default=32)
+        parser.add_argument("--min-cosine", type=float, default=MIN_COSINE)
+    
+    def handle(self, *args, **options):
+        if options["action"] == "export":
+            output = export_onnx_model(
+                settings.HF_MODEL_NAME,
+                options["output"] or settings.EMBEDDING_ONNX_DIR,
+                quantize=not options["no_quantize"],
+                cache_dir=str(settings.HF_MODEL_CACHE_DIR),
+            )
+            self.stdout.write(self.style.SUCCESS(f"Exported {settings.HF_MODEL_NAME} to {output}"))
+            return
+        
+        texts = sample_texts(options["texts"])
+        onnx = OnnxEmbeddingProvider(model_dir=options["output"], quantized=not options["fp32"])
+        torch_provider = SentenceTransformerProvider()
+        if options["action"] == "parity":
+            self._parity(torch_provider, onnx, texts, options)
+        else:
+            self._benchmark(torch_provider, onnx, texts, options)
+    
+    def _parity(self, torch_provider, onnx, texts, options):
+        expected = torch_provider.encode(texts, batch_size=options["batch_size"])
+        actual = onnx.encode(texts, batch_size=options["batch_size"])
+        cosines = np.sum(expected * actual, axis=1)  # both L2-normalized
+        worst = int(np.argmin(cosines))
+        self.stdout.write(
+            f"{onnx.model_name} vs torch on {len(texts)} texts: cosine min={cosines.min():.4f} "
+            f"mean={cosines.mean():.4f} p1={np.percentile(cosines, 1):.4f}"
+        )
+        # Rankings are what matter downstream: top-10 neighbours within the sample
+        k = min(10, len(texts) - 1)
+        if k > 0:
+            expected_top = np.argsort(-(expected @ expected.T), axis=1)[:, 1:k + 1]
+            actual_top = np.argsort(-(actual @ actual.T), axis=1)[:, 1:k + 1]
+            overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(expected_top, actual_top)])
+            self.stdout.write(f"top-{k} neighbour overlap: {overlap:.3f}")
+        if cosines.min() < options["min_cosine"]:
+            raise CommandError(
+                f"Parity check failed: cosine {cosines.min():.4f} < {options['min_cosine']} "
+                f"for text {worst} ({texts[worst][:80]!r})"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Parity OK (all cosines >= {options['min_cosine']})"))
+    
+    def _benchmark(self, torch_provider, onnx, texts, options):
+        batch_size = options["batch_size"]
+        onnx_name = "onnx-fp32" if options["fp32"] else "onnx-int8"
+        rates = {}
+        for name, provider in (("torch", torch_provider), (onnx_name, onnx)):
+            started = time.perf_counter()
+            provider.encode(texts[:batch_size], batch_size=batch_size)  # load + warm up
+            load_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            provider.encode(texts, batch_size=batch_size)
+            elapsed = time.perf_counter() - started
+            rates[name] = len(texts) / elapsed
+            self.stdout.write(
+                f"{name:<10} load+first batch={load_seconds:6.2f}s  "
+                f"{rates[name]:8.1f} texts/s  ({elapsed * 1000 / len(texts):.2f} ms/text)"
+            )
+        self.stdout.write(f"speedup: {rates[onnx_name] / rates['torch']:.2f}x")
@@ -0,0 +1,30 @@
+"""
+Detect and repair drift between the vector index and the resumes table.
+
+Usage:
+    python manage.py reconcile_vector_index --dry-run
+    python manage.py reconcile_vector_index
+"""
+from django.core.management.base import BaseCommand
+
+from apps.resume_screening.application.services.index_reconciliation_service import (
+    IndexReconciliationService,
+)
+
+
+class Command(BaseCommand):
+    help = "Index stored embeddings missing from the vector index and drop entries of deleted resumes."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report the drift")
+    
+    def handle(self, *args, **options):
+        report = IndexReconciliationService().reconcile(dry_run=options["dry_run"])
+        self.stdout.write(
+            f"Index: {report['indexed']} resumes, database: {report['resumes']} resumes "
+            f"({report['seconds']}s)"
+        )
+        self.stdout.write(f"  missing from index: {report['missing']} (indexed {report['added']})")
+        self.stdout.write(f"  orphaned in index:  {report['orphans']} (removed {report['removed']})")
+        if options["dry_run"]:
+            self.stdout.write("Dry run: nothing changed")
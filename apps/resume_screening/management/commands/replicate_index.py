@@ -0,0 +1,61 @@
+"""
+Publish the vector index to, or install it from, FAISS_REPLICATION_DIR.
+
+Usage:
+    python manage.py replicate_index publish               # on the publisher node
+    python manage.py replicate_index publish --loop --interval 30
+    python manage.py replicate_index sync                  # on a replica, without waiting for the poll
+    python manage.py replicate_index status
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
+from apps.resume_screening.infrastructure.ai.replication import (
+    publish_snapshots,
+    snapshot_status,
+    sync_snapshots,
+)
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_job_index, get_vector_index
+
+
+class Command(BaseCommand):
+    help = "Publish index snapshots for replica nodes, install the latest one, or show replication status."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["publish", "sync", "status"])
+        parser.add_argument("--loop", action="store_true", help="Repeat every --interval seconds")
+        parser.add_argument("--interval", type=float, default=30.0, help="Seconds between runs with --loop")
+    
+    def handle(self, *args, **options):
+        dimension = EmbeddingService().dimension
+        indexes = [get_vector_index(dimension=dimension), get_job_index(dimension=dimension)]
+        action = options["action"]
+        while True:
+            try:
+                for index in indexes:
+                    self._run(action, index)
+            except (OSError, RuntimeError, ValueError) as e:
+                if not options["loop"]:
+                    raise CommandError(str(e))
+                self.stderr.write(f"Replication {action} failed: {e}")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+    
+    def _run(self, action: str, index) -> None:
+        if action == "status":
+            for row in snapshot_status(index):
+                self.stdout.write(
+                    f"{row['shared_dir']}: published v{row['published_version']} "
+                    f"(generation {row['published_generation']}), local generation "
+                    f"{row['local_generation']}, replica v{row['replica_version']}, {row['count']} entries"
+                )
+            return
+        run = publish_snapshots if action == "publish" else sync_snapshots
+        verb = "published" if action == "publish" else "installed"
+        for shared_dir, version in run(index).items():
+            self.stdout.write(
+                f"{shared_dir}: {verb} v{version}" if version is not None else f"{shared_dir}: up to date"
+            )
@@ -0,0 +1,18 @@
+# Generated migration for recorded best-fit jobs
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_screening', '0003_resume_skills_indexes'),
+    ]
+    
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='top_jobs',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -18,6 +18,7 @@ class Resume(models.Model):
     raw_text = models.TextField(blank=True)
     embedding = models.JSONField(null=True, blank=True)
     extracted_skills = models.JSONField(null=True, blank=True)  # List of skill keywords
+    top_jobs = models.JSONField(null=True, blank=True)  # Best-fit jobs recorded after indexing
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
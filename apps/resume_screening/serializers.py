@@ -22,6 +22,7 @@ class ResumeDetailSerializer(serializers.Serializer):
     file_path = serializers.CharField(read_only=True)
     raw_text = serializers.CharField(read_only=True)
     extracted_skills = serializers.ListField(child=serializers.CharField(), read_only=True, required=False)
+    top_jobs = serializers.ListField(child=serializers.DictField(), read_only=True, required=False)
     created_at = serializers.DateTimeField(read_only=True)
 
 
@@ -38,9 +39,20 @@ class JobPostingUpdateSerializer(serializers.Serializer):
 
 
 class SemanticSearchSerializer(serializers.Serializer):
-    """Serializer for semantic search request."""
-    query = serializers.CharField()
+    """Serializer for semantic search request (one "query" or a list of "queries")."""
+    query = serializers.CharField(required=False)
+    queries = serializers.ListField(
+        child=serializers.CharField(allow_blank=True), min_length=1, max_length=100, required=False
+    )
     k = serializers.IntegerField(default=10, min_value=1, max_value=50, required=False)
+    skills_all = serializers.ListField(child=serializers.CharField(), required=False)
+    skills_any = serializers.ListField(child=serializers.CharField(), required=False)
+    uploaded_within_days = serializers.IntegerField(min_value=1, required=False)
+    
+    def validate(self, attrs):
+        if ("query" in attrs) == ("queries" in attrs):
+            raise serializers.ValidationError('Provide either "query" or "queries"')
+        return attrs
 
 
 class MatchResultSerializer(serializers.Serializer):
@@ -1,7 +1,32 @@
 """
 Celery tasks.
 """
-from .resume_tasks import extract_resume_text_task, generate_resume_embedding_task
-from .index_tasks import rebuild_vector_index_task
+from .resume_tasks import (
+    extract_resume_text_task,
+    generate_resume_embedding_task,
+    record_resume_top_jobs_task,
+)
+from .index_tasks import (
+    compact_vector_index_task,
+    publish_vector_index_snapshot_task,
+    rebuild_job_index_task,
+    rebuild_vector_index_shard_task,
+    rebuild_vector_index_task,
+    reconcile_vector_index_task,
+    remove_resume_from_index_task,
+    sync_job_index_task,
+)
 
-__all__ = ['extract_resume_text_task', 'generate_resume_embedding_task', 'rebuild_vector_index_task']
+__all__ = [
+    'extract_resume_text_task',
+    'generate_resume_embedding_task',
+    'record_resume_top_jobs_task',
+    'rebuild_vector_index_task',
+    'rebuild_vector_index_shard_task',
+    'compact_vector_index_task',
+    'reconcile_vector_index_task',
+    'publish_vector_index_snapshot_task',
+    'rebuild_job_index_task',
+    'sync_job_index_task',
+    'remove_resume_from_index_task',
+]
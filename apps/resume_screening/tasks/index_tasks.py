@@ -2,33 +2,197 @@
 Celery tasks for index maintenance.
 """
 import logging
-from uuid import UUID
+from datetime import datetime
+from itertools import chain
+from typing import Iterator, Optional
 
+from apps.resume_screening.application.services.index_reconciliation_service import IndexReconciliationService
+from apps.resume_screening.application.services.job_matching_service import JobMatchingService
 from apps.resume_screening.celery_app import app
-from apps.resume_screening.application.services.embedding_generation_service import EmbeddingGenerationService
+from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
+from apps.resume_screening.infrastructure.ai.replication import publish_snapshots
+from apps.resume_screening.infrastructure.ai.sharded_index import ShardedVectorIndex
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_job_index, get_vector_index, iter_chunks
+from apps.resume_screening.infrastructure.repositories.job_repository import JobPostingRepository
 from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
 
 logger = logging.getLogger(__name__)
 
+REBUILD_CHUNK_SIZE = 2000  # rows per DB fetch and per index batch
+ENCODE_BATCH_SIZE = 64  # resumes encoded per model call when an embedding is missing
+
 
 @app.task(name='resume_screening.rebuild_vector_index')
 def rebuild_vector_index_task() -> dict:
     """
-    Rebuild FAISS vector index from all resumes with embeddings.
+    Rebuild FAISS vector index from the stored resume embeddings.
     Use after bulk imports or index corruption.
+    
+    Embeddings are streamed from the DB with a server-side cursor in chunks
+    of REBUILD_CHUNK_SIZE, with no cap on the corpus size. Only resumes that
+    have text but no stored embedding are encoded (in batches, and saved).
+    The new index is built in a side directory and swapped in atomically, so
+    searches keep using the old one until it is complete.
     """
     try:
-        service = EmbeddingGenerationService()
-        resumes = ResumeRepository.list_all(skip=0, limit=10000)
-        count = 0
-        for r in resumes:
-            if r.embedding and r.raw_text:
-                try:
-                    service.generate_and_index_resume(r.id)
-                    count += 1
-                except Exception as e:
-                    logger.warning(f"Skip resume {r.id}: {e}")
-        return {"status": "success", "indexed": count}
+        embedding_svc = EmbeddingService()
+        index = get_vector_index(dimension=embedding_svc.dimension)
+        stats = {"encoded": 0}
+        items = chain(
+            ResumeRepository.iter_embeddings(chunk_size=REBUILD_CHUNK_SIZE),
+            _encode_missing(embedding_svc, stats),
+        )
+        indexed = index.rebuild(items, chunk_size=REBUILD_CHUNK_SIZE)
+        if isinstance(indexed, dict):  # sharded: per-shard counts
+            indexed = sum(indexed.values())
+        return {
+            "status": "success",
+            "indexed": indexed,
+            "encoded": stats["encoded"],
+            "embedding_cache": embedding_svc.cache_stats(),
+        }
     except Exception as e:
         logger.exception(f"Index rebuild failed: {e}")
         return {"status": "error", "message": str(e)}
+
+
+def _encode_missing(embedding_svc: EmbeddingService, stats: dict) -> Iterator[tuple]:
+    """
+    (id, embedding, created_at) for resumes with text but no stored
+    embedding, encoded ENCODE_BATCH_SIZE at a time and saved to the DB.
+    """
+    rows = ResumeRepository.iter_missing_embeddings(chunk_size=REBUILD_CHUNK_SIZE)
+    for chunk in iter_chunks(rows, ENCODE_BATCH_SIZE):
+        embeddings = [e.tolist() for e in embedding_svc.encode_resume_texts([text for _, text, _ in chunk])]
+        ResumeRepository.update_embeddings([(rid, e) for (rid, _, _), e in zip(chunk, embeddings)])
+        stats["encoded"] += len(chunk)
+        for (rid, _, created_at), embedding in zip(chunk, embeddings):
+            yield rid, embedding, created_at
+
+
+@app.task(name='resume_screening.rebuild_vector_index_shard')
+def rebuild_vector_index_shard_task(shard_key: str) -> dict:
+    """
+    Rebuild one shard of a sharded index (FAISS_SHARD_BY) from the stored
+    embeddings. The other shards keep serving and indexing meanwhile.
+    """
+    try:
+        index = get_vector_index(dimension=EmbeddingService().dimension)
+        if not isinstance(index, ShardedVectorIndex):
+            return {"status": "error", "message": "Vector index is not sharded"}
+        rows = ResumeRepository.iter_embeddings(
+            *index.shard_time_range(shard_key), chunk_size=REBUILD_CHUNK_SIZE
+        )
+        items = (
+            (rid, embedding)
+            for rid, embedding, created_at in rows
+            if embedding and index.shard_key(rid, created_at) == shard_key
+        )
+        indexed = index.rebuild_shard(shard_key, items)
+        return {"status": "success", "shard": shard_key, "indexed": indexed}
+    except Exception as e:
+        logger.exception(f"Shard rebuild failed for {shard_key}: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+@app.task(name='resume_screening.compact_vector_index')
+def compact_vector_index_task(force: bool = False) -> dict:
+    """
+    Physically reclaim tombstoned index slots (deleted or re-indexed resumes).
+    Unless force, only indexes (or shards) whose tombstones exceed
+    FAISS_TOMBSTONE_COMPACT_FRACTION are compacted, so it is cheap to queue
+    after every delete or to run periodically.
+    """
+    try:
+        index = get_vector_index(dimension=EmbeddingService().dimension)
+        reclaimed = index.compact(only_if_due=not force)
+        return {"status": "success", "reclaimed": reclaimed}
+    except Exception as e:
+        logger.exception(f"Index compaction failed: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+@app.task(name='resume_screening.reconcile_vector_index')
+def reconcile_vector_index_task(dry_run: bool = False) -> dict:
+    """
+    Repair drift between the index and the resumes table: index stored
+    embeddings that never reached it and drop entries of deleted resumes.
+    """
+    try:
+        report = IndexReconciliationService().reconcile(dry_run=dry_run)
+        return {"status": "success", **report}
+    except Exception as e:
+        logger.exception(f"Index reconciliation failed: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+@app.task(name='resume_screening.rebuild_job_index')
+def rebuild_job_index_task() -> dict:
+    """
+    Rebuild the job index (resume -> jobs matching) from the stored job
+    embeddings. Use once after upgrading, or to repair the job index.
+    """
+    try:
+        indexed = JobMatchingService().rebuild_index(
+            JobPostingRepository.iter_embeddings(chunk_size=REBUILD_CHUNK_SIZE)
+        )
+        return {"status": "success", "indexed": indexed}
+    except Exception as e:
+        logger.exception(f"Job index rebuild failed: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+@app.task(name='resume_screening.sync_job_index')
+def sync_job_index_task(job_id: str) -> dict:
+    """
+    Bring one job's entry in the job index in line with the database: index
+    its stored embedding, or remove it if the job no longer exists. Queued by
+    the job views after every create, description change and delete, so the
+    request never writes the index (a replica's is read-only anyway).
+    """
+    try:
+        matching = JobMatchingService()
+        job = JobPostingRepository.get_by_id(job_id)
+        if job is not None and job.embedding:
+            matching.index_job(job.id, job.embedding)
+            return {"status": "success", "job_id": job_id, "indexed": True}
+        matching.remove_job(job_id)
+        return {"status": "success", "job_id": job_id, "indexed": False}
+    except Exception as e:
+        logger.exception(f"Job index sync failed for {job_id}: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+@app.task(name='resume_screening.remove_resume_from_index')
+def remove_resume_from_index_task(resume_id: str, created_at: Optional[str] = None) -> dict:
+    """
+    Tombstone a deleted resume in the vector index (created_at, ISO format,
+    routes month shards) and queue compaction if due. Queued by replica
+    nodes, whose index is read-only, after deleting the resume.
+    """
+    try:
+        index = get_vector_index(dimension=EmbeddingService().dimension)
+        removed = index.delete(resume_id, created_at=datetime.fromisoformat(created_at) if created_at else None)
+        if index.needs_compaction():
+            compact_vector_index_task.delay()
+        return {"status": "success", "resume_id": resume_id, "removed": removed}
+    except Exception as e:
+        logger.exception(f"Index removal failed for resume {resume_id}: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+@app.task(name='resume_screening.publish_vector_index_snapshot')
+def publish_vector_index_snapshot_task() -> dict:
+    """
+    Publish the index to FAISS_REPLICATION_DIR for replica nodes. Run
+    periodically on the publisher node (e.g. with celery beat); a snapshot is
+    only written when the index has changed since the last one.
+    """
+    try:
+        dimension = EmbeddingService().dimension
+        versions = publish_snapshots(get_vector_index(dimension=dimension))
+        versions.update(publish_snapshots(get_job_index(dimension=dimension)))
+        return {"status": "success", "published": {d: v for d, v in versions.items() if v is not None}}
+    except Exception as e:
+        logger.exception(f"Index snapshot publish failed: {e}")
+        return {"status": "error", "message": str(e)}
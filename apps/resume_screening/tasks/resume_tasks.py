@@ -4,11 +4,14 @@ Celery tasks for resume processing.
 import logging
 from uuid import UUID
 
+from django.conf import settings
+
 from apps.resume_screening.celery_app import app
 from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
 from apps.resume_screening.infrastructure.services.pdf_extraction_service import PdfTextExtractionService
 from apps.resume_screening.infrastructure.services.skill_extraction_service import SkillExtractionService
 from apps.resume_screening.application.services.embedding_generation_service import EmbeddingGenerationService
+from apps.resume_screening.application.services.job_matching_service import JobMatchingService
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +25,8 @@ def generate_resume_embedding_task(resume_id: str) -> dict:
         service = EmbeddingGenerationService()
         service.generate_and_index_resume(UUID(resume_id))
         logger.info(f"Generated embedding and indexed resume {resume_id}")
+        if getattr(settings, 'JOB_MATCH_ON_INDEX', False):
+            record_resume_top_jobs_task.delay(resume_id)
         return {"status": "success", "resume_id": resume_id}
     except ValueError as e:
         logger.warning(f"Embedding generation skipped for {resume_id}: {e}")
@@ -31,6 +36,23 @@ def generate_resume_embedding_task(resume_id: str) -> dict:
         return {"status": "error", "resume_id": resume_id, "message": str(e)}
 
 
+@app.task(name='resume_screening.record_resume_top_jobs')
+def record_resume_top_jobs_task(resume_id: str) -> dict:
+    """
+    Post-indexing hook (JOB_MATCH_ON_INDEX): find the job postings a new
+    resume fits best and record them on the resume (Resume.top_jobs).
+    """
+    try:
+        jobs = JobMatchingService().record_top_jobs(UUID(resume_id))
+        return {"status": "success", "resume_id": resume_id, "jobs": len(jobs)}
+    except ValueError as e:
+        logger.warning(f"Job matching skipped for {resume_id}: {e}")
+        return {"status": "skipped", "resume_id": resume_id, "message": str(e)}
+    except Exception as e:
+        logger.exception(f"Failed to match jobs for resume {resume_id}: {e}")
+        return {"status": "error", "resume_id": resume_id, "message": str(e)}
+
+
 @app.task(name='resume_screening.extract_resume_text')
 def extract_resume_text_task(resume_id: str) -> dict:
     """
@@ -0,0 +1,111 @@
+"""
+Test configuration. pytest-django is not a dependency, so Django is set up
+here with the test settings (see settings.py).
+"""
+import hashlib
+import os
+
+import django
+import numpy as np
+import pytest
+
+# Importing the app package already set the default to config.settings
+os.environ['DJANGO_SETTINGS_MODULE'] = 'apps.resume_screening.tests.settings'
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import transaction  # noqa: E402
+
+from apps.resume_screening.infrastructure.ai import embedding_cache  # noqa: E402
+from apps.resume_screening.infrastructure.ai.embedding_protocol import EmbeddingProvider  # noqa: E402
+from apps.resume_screening.infrastructure.ai.embedding_service import set_embedding_provider  # noqa: E402
+
+
+class WordHashProvider(EmbeddingProvider):
+    """
+    Deterministic embeddings without a model: the sum of a fixed random
+    vector per word, so texts sharing words are similar.
+    """
+    
+    def __init__(self, dimension: int = 32):
+        self._dimension = dimension
+        self.calls = 0
+    
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+    
+    @property
+    def model_name(self) -> str:
+        return f"word-hash-{self._dimension}"
+    
+    def word_vector(self, word: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(word.lower().encode()).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self._dimension).astype(np.float32)
+    
+    def encode(self, texts, *, batch_size=32, show_progress=False, normalize=True) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        self.calls += 1
+        output = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split():
+                output[row] += self.word_vector(word)
+        if normalize:
+            output /= np.maximum(np.linalg.norm(output, axis=1, keepdims=True), 1e-12)
+        return output
+    
+    def encode_single(self, text, *, normalize=True):
+        return self.encode([text], normalize=normalize)[0].tolist()
+
+
+@pytest.fixture(scope='session')
+def django_db_setup():
+    call_command('migrate', verbosity=0)
+
+
+@pytest.fixture
+def db(django_db_setup):
+    """Database access; rows written by the test are rolled back."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+@pytest.fixture
+def index_path(tmp_path, monkeypatch):
+    """A fresh FAISS_INDEX_PATH for the process-wide indexes (get_vector_index, get_job_index)."""
+    from apps.resume_screening.infrastructure.ai.vector_index_service import reset_vector_index_cache
+    
+    monkeypatch.setattr(settings, 'FAISS_INDEX_PATH', tmp_path / 'faiss_indices')
+    reset_vector_index_cache()
+    yield settings.FAISS_INDEX_PATH
+    reset_vector_index_cache()
+
+
+@pytest.fixture
+def replica(index_path, tmp_path, monkeypatch):
+    """Configure this node as an index replica."""
+    monkeypatch.setattr(settings, 'FAISS_REPLICATION_DIR', str(tmp_path / 'shared'))
+    monkeypatch.setattr(settings, 'FAISS_REPLICATION_ROLE', 'replica')
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    """Install a WordHashProvider as the process-wide embedding provider, with empty embedding caches."""
+    monkeypatch.setattr(embedding_cache, '_caches', {})
+    cache.clear()
+    provider = WordHashProvider()
+    set_embedding_provider(provider)
+    yield provider
+    set_embedding_provider(None)
+
+
+@pytest.fixture
+def api(db, index_path, embeddings):
+    """DRF test client over an empty database and index, with model-free embeddings."""
+    from rest_framework.test import APIClient
+    
+    return APIClient()
@@ -0,0 +1,24 @@
+"""Settings for the test suite: the project settings on an in-memory SQLite database."""
+from config.settings import *  # noqa
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+# Pick up other processes' index writes immediately
+FAISS_RELOAD_CHECK_INTERVAL = 0.0
+
+# Search result and embedding caches without a Redis server
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+ALLOWED_HOSTS = ['testserver']
+
+# Queued tasks run in the calling process
+CELERY_TASK_ALWAYS_EAGER = True
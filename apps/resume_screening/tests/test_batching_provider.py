@@ -0,0 +1,72 @@
+"""Tests for the micro-batching embedding provider."""
+import threading
+
+import numpy as np
+
+from apps.resume_screening.infrastructure.ai.batching_provider import BatchingEmbeddingProvider
+from apps.resume_screening.tests.conftest import WordHashProvider
+
+TEXTS = [f"candidate {i} python developer" for i in range(16)]
+
+
+def encode_concurrently(provider, texts, normalize=None) -> list:
+    """Encode each text from its own thread, all released at once. Returns results or exceptions."""
+    results = [None] * len(texts)
+    normalize = normalize or [True] * len(texts)
+    start = threading.Barrier(len(texts))
+    
+    def encode(i):
+        start.wait()
+        try:
+            results[i] = provider.encode(texts[i], normalize=normalize[i])
+        except Exception as e:
+            results[i] = e
+    
+    threads = [threading.Thread(target=encode, args=(i,)) for i in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_encodes_share_one_forward_pass():
+    model = WordHashProvider()
+    batching = BatchingEmbeddingProvider(model, max_items=len(TEXTS), max_wait=5.0)
+    
+    results = encode_concurrently(batching, TEXTS)
+    
+    assert model.calls == 1
+    assert batching.stats() == {"batches": 1, "items": 16, "mean_batch_size": 16.0}
+    # Every caller gets its own row
+    np.testing.assert_allclose(np.concatenate(results), WordHashProvider().encode(TEXTS), rtol=1e-6)
+
+
+def test_bulk_encodes_and_unnormalized_requests_are_not_mixed_in():
+    model = WordHashProvider()
+    batching = BatchingEmbeddingProvider(model, max_items=4, max_wait=5.0)
+    
+    batching.encode(TEXTS[:4])
+    assert (model.calls, batching.stats()["batches"]) == (1, 0)  # went straight to the model
+    
+    normalize = [True, False, True, False]
+    results = encode_concurrently(batching, TEXTS[:4], normalize)
+    
+    assert model.calls == 3  # one forward pass per normalize flag
+    for text, flag, result in zip(TEXTS, normalize, results):
+        np.testing.assert_allclose(result, WordHashProvider().encode([text], normalize=flag), rtol=1e-6)
+
+
+def test_model_error_reaches_every_caller_of_the_batch():
+    class Failing(WordHashProvider):
+        def encode(self, texts, **options):
+            super().encode(texts, **options)
+            raise RuntimeError("CUDA out of memory")
+    
+    model = Failing()
+    batching = BatchingEmbeddingProvider(model, max_items=8, max_wait=5.0)
+    
+    results = encode_concurrently(batching, TEXTS[:8])
+    
+    assert model.calls == 1
+    assert all(isinstance(result, RuntimeError) and "out of memory" in str(result) for result in results)
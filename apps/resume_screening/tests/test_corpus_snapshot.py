@@ -0,0 +1,76 @@
+"""Tests for corpus snapshot export/import and ResumeRepository.bulk_insert."""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from apps.resume_screening.application.services.corpus_snapshot_service import CorpusSnapshotService
+from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_vector_index
+from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+from apps.resume_screening.models import Resume
+
+CREATED_AT = datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def make_resumes(n: int, dimension: int):
+    vectors = np.random.default_rng(0).standard_normal((n, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        Resume(
+            id=uuid.uuid4(),
+            filename=f"résumé-{i}.pdf",
+            file_path=f"/media/resumes/{i}.pdf",
+            raw_text=f"Ingénieur ✓ {i}",
+            extracted_skills=["python", "élan"][:i % 3],
+            embedding=vectors[i].tolist() if i % 4 else None,
+            created_at=CREATED_AT + timedelta(days=i),
+        )
+        for i in range(n)
+    ]
+
+
+def test_bulk_insert_keeps_created_at_and_existing_rows(db):
+    field = Resume._meta.get_field('created_at')
+    resumes = make_resumes(5, 4)
+    existing = ResumeRepository.create(resume_id=resumes[0].id, filename='kept.pdf', file_path='/kept.pdf')
+    
+    assert ResumeRepository.bulk_insert(resumes, batch_size=2) == 4
+    
+    assert field.auto_now_add
+    assert ResumeRepository.get_by_id(existing.id).filename == 'kept.pdf'
+    assert ResumeRepository.get_by_id(existing.id).created_at == existing.created_at
+    for resume in resumes[1:]:
+        assert ResumeRepository.get_by_id(resume.id).created_at == resume.created_at
+
+
+# 3 splits the string and embedding columns across import batches
+@pytest.mark.parametrize("batch_size", [2000, 3])
+def test_export_import_round_trip(db, index_path, tmp_path, batch_size):
+    dimension = EmbeddingService().dimension
+    resumes = make_resumes(10, dimension)
+    ResumeRepository.bulk_insert(resumes)
+    path = tmp_path / 'corpus.npz'
+    
+    report = CorpusSnapshotService.export_corpus(path)
+    assert report["resumes"] == 10
+    assert report["embeddings"] == 7
+    
+    Resume.objects.all().delete()
+    report = CorpusSnapshotService.import_corpus(path, batch_size=batch_size)
+    assert report["indexed"] == 7
+    
+    for resume in resumes:
+        loaded = ResumeRepository.get_by_id(resume.id)
+        assert (loaded.filename, loaded.raw_text, loaded.extracted_skills, loaded.created_at) == (
+            resume.filename, resume.raw_text, resume.extracted_skills, resume.created_at
+        )
+        if resume.embedding is None:
+            assert loaded.embedding is None
+        else:
+            np.testing.assert_allclose(loaded.embedding, resume.embedding, rtol=1e-6)
+    index = get_vector_index(dimension=dimension)
+    assert index.count() == 7
+    assert index.search(resumes[1].embedding, 1)[0][0] == str(resumes[1].id)
+
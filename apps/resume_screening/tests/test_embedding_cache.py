@@ -0,0 +1,69 @@
+"""Tests for the content-hash embedding cache in front of the embedding provider."""
+import numpy as np
+import pytest
+from django.core.cache import cache
+
+from apps.resume_screening.infrastructure.ai.embedding_cache import CACHE_PREFIX, EmbeddingCache
+from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
+from apps.resume_screening.tests.conftest import WordHashProvider
+
+
+@pytest.fixture
+def provider():
+    cache.clear()
+    return WordHashProvider()
+
+
+def service(provider, backend="redis", cache_dir=None) -> EmbeddingService:
+    """A service with its own memory tier, as in a separate worker process."""
+    return EmbeddingService(
+        provider, EmbeddingCache(provider.model_name, provider.dimension, backend=backend, cache_dir=cache_dir)
+    )
+
+
+def test_cache_hit_does_not_call_the_provider(provider):
+    embeddings = service(provider)
+    first = embeddings.encode(["python developer", "java  engineer", "python developer"])
+    assert provider.calls == 1
+    
+    again = embeddings.encode(["java engineer\n", "python developer"])
+    single = embeddings.encode_single("python developer")
+    
+    assert provider.calls == 1
+    np.testing.assert_array_equal(again, first[[1, 0]])
+    np.testing.assert_array_equal(single, first[0])
+    stats = embeddings.cache_stats()
+    assert (stats["misses"], stats["stores"], stats["memory_hits"]) == (2, 2, 3)
+    
+    embeddings.encode(["python developer"], normalize=False)  # a different vector
+    assert provider.calls == 2
+
+
+@pytest.mark.parametrize("backend", ["redis", "disk"])
+def test_shared_tier_serves_other_processes(provider, tmp_path, backend):
+    vectors = service(provider, backend, tmp_path).encode(["python developer", "data engineer"])
+    
+    other = service(provider, backend, tmp_path)
+    np.testing.assert_array_equal(other.encode(["data engineer", "python developer"]), vectors[[1, 0]])
+    
+    assert provider.calls == 1
+    assert other.cache_stats()["shared_hits"] == 2
+
+
+def test_unusable_cache_entries_are_misses(provider, monkeypatch):
+    embeddings = service(provider)
+    key = embeddings._cache.key("python developer")
+    cache.set(f"{CACHE_PREFIX}:{key}", b"truncated")
+    
+    embeddings.encode(["python developer"])
+    assert provider.calls == 1
+    
+    def unavailable(*args, **kwargs):
+        raise ConnectionError("redis is down")
+    
+    monkeypatch.setattr(cache, "get_many", unavailable)
+    monkeypatch.setattr(cache, "set_many", unavailable)
+    fresh = service(provider)
+    assert fresh.encode(["python developer"]).shape == (1, provider.dimension)
+    assert provider.calls == 2
+    assert fresh.cache_stats()["errors"] == 2
@@ -0,0 +1,45 @@
+"""Tests for the evaluate_vector_index command (recall/latency report)."""
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.resume_screening.management.commands.evaluate_vector_index import parse_config
+
+
+def test_parse_config_splits_build_settings_and_search_options():
+    assert parse_config("hnsw:m=16:ef_search=64") == ("hnsw", {"FAISS_HNSW_M": 16}, {"ef_search": 64})
+    assert parse_config("pq:m=8:rerank=4") == ("pq", {"FAISS_PQ_M": 8}, {"rerank_factor": 4})
+    with pytest.raises(CommandError, match="unknown parameter"):
+        parse_config("flat:nprobe=8:m=4")
+    with pytest.raises(CommandError, match="name=integer"):
+        parse_config("ivf:nprobe=many")
+
+
+def test_report_measures_recall_against_exact_search(db, tmp_path):
+    output = tmp_path / "eval.json"
+    
+    call_command(
+        "evaluate_vector_index",
+        size=2000,
+        dimension=16,
+        queries=50,
+        k=10,
+        configs="flat,ivf:nlist=20:nprobe=20,ivf:nlist=20:nprobe=1,hnsw:ef_search=64,sq8:rerank=4",
+        output=str(output),
+    )
+    
+    report = json.loads(output.read_text())
+    assert report["corpus"] == {"source": "synthetic", "size": 2000, "dimension": 16}
+    assert report["queries"] == {"source": "corpus", "count": 50}
+    results = {result["config"]: result for result in report["results"]}
+    assert [results[c]["built_type"] for c in results] == ["flat", "ivf", "ivf", "hnsw", "sq8"]
+    # Exact configurations reproduce the ground truth
+    assert results["flat"]["recall"] == 1.0
+    assert results["ivf:nlist=20:nprobe=20"]["recall"] == 1.0
+    assert results["ivf:nlist=20:nprobe=1"]["recall"] < 1.0
+    assert results["sq8:rerank=4"]["recall"] >= 0.95
+    assert results["sq8:rerank=4"]["memory_bytes"] < results["flat"]["memory_bytes"]
+    assert results["sq8:rerank=4"]["rerank_store_bytes"] == 2000 * 16 * 4
+    assert all(r["latency_ms"]["p50"] <= r["latency_ms"]["p99"] for r in report["results"])
@@ -0,0 +1,56 @@
+"""Tests for the binary resume UUID <-> FAISS label mapping."""
+import json
+import uuid
+
+import faiss
+import numpy as np
+
+from apps.resume_screening.infrastructure.ai.id_mapping import IdMapping
+from apps.resume_screening.infrastructure.ai.vector_index_service import VectorIndexService
+
+
+def test_saved_mapping_is_memory_mapped_with_overlay_folded_in(tmp_path):
+    ids = [str(uuid.uuid4()) for _ in range(6)]
+    mapping = IdMapping([0, 1, 2, 3], ids[:4], next_label=4)
+    mapping.remove(ids[1])
+    _, previous = mapping.assign(ids[2])  # replaced: fresh label
+    mapping.assign(ids[4])
+    path = tmp_path / "ids.npy"
+    
+    mapping.save(path)
+    loaded = IdMapping.load(path, mapping.next_label)
+    
+    assert isinstance(loaded._table, np.memmap)
+    for m in (mapping, loaded):
+        assert len(m) == 4
+        assert m.label_of(ids[1]) is None and m.id_of(1) is None
+        assert previous == 2 and m.id_of(2) is None
+        assert {rid: m.id_of(m.label_of(rid)) for rid in (ids[0], ids[2], ids[3], ids[4])} == {
+            rid: rid for rid in (ids[0], ids[2], ids[3], ids[4])
+        }
+        assert sorted(m.labels().tolist()) == [0, 3, 4, 5]
+        assert m.sorted_uuids().tolist() == sorted(uuid.UUID(rid).bytes for rid in (ids[0], ids[2], ids[3], ids[4]))
+    
+    # Vectorized lookup over table and overlay, -1 where unknown
+    query = np.array([uuid.UUID(rid).bytes for rid in ids], dtype="S16")
+    loaded.assign(ids[5])
+    assert loaded.labels_of(query).tolist() == [0, -1, 4, 3, 5, 6]
+
+
+def test_legacy_json_mapping_is_read_and_rewritten_as_binary(tmp_path):
+    ids = [str(uuid.uuid4()) for _ in range(3)]
+    vectors = np.eye(3, 8, dtype=np.float32)
+    legacy = faiss.IndexFlatIP(8)
+    legacy.add(vectors)
+    faiss.write_index(legacy, str(tmp_path / "resume_index.faiss"))
+    with open(tmp_path / "resume_index_ids.json", "w") as f:
+        json.dump(ids, f)  # position-ordered list
+    
+    index = VectorIndexService(dimension=8, index_dir=tmp_path, reload_check_interval=0.0)
+    assert [index.search(v.tolist(), 1)[0][0] for v in vectors] == ids
+    
+    index.checkpoint()
+    
+    assert index.manifest()["ids_file"].endswith(".npy")
+    reloaded = VectorIndexService(dimension=8, index_dir=tmp_path, reload_check_interval=0.0)
+    assert [reloaded.search(v.tolist(), 1)[0][0] for v in vectors] == ids
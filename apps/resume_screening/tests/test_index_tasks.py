@@ -0,0 +1,113 @@
+"""Tests for the index maintenance tasks, run in-process against the test database."""
+import uuid
+
+import numpy as np
+
+from apps.resume_screening.application.services.index_reconciliation_service import _as_uuids, _not_in
+from apps.resume_screening.application.services.job_matching_service import JobMatchingService
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_job_index, get_vector_index
+from apps.resume_screening.infrastructure.repositories.job_repository import JobPostingRepository
+from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+from apps.resume_screening.tasks.index_tasks import (
+    rebuild_job_index_task,
+    rebuild_vector_index_task,
+    reconcile_vector_index_task,
+    sync_job_index_task,
+)
+
+
+def create_resume(text: str, embedding=None):
+    resume = ResumeRepository.create(resume_id=uuid.uuid4(), filename="resume.pdf", file_path="", raw_text=text)
+    if embedding is not None:
+        resume = ResumeRepository.update_embedding(resume.id, embedding)
+    return resume
+
+
+def test_rebuild_indexes_stored_embeddings_and_encodes_missing_ones(db, index_path, embeddings):
+    texts = ["python developer", "java engineer", "data engineer spark"]
+    stored = [create_resume(text, embeddings.encode_single(text)) for text in texts]
+    missing = create_resume("react frontend developer")
+    create_resume("")  # nothing to index
+    index = get_vector_index(dimension=embeddings.dimension)
+    stale = uuid.uuid4()
+    index.add(stale, embeddings.encode_single("deleted resume"))
+    embeddings.calls = 0
+    
+    result = rebuild_vector_index_task()
+    
+    assert result["status"] == "success"
+    assert (result["indexed"], result["encoded"]) == (4, 1)
+    assert embeddings.calls == 1  # only the resume without an embedding
+    assert index.count() == 4 and not index.contains(stale)
+    assert all(index.contains(resume.id) for resume in stored + [missing])
+    saved = ResumeRepository.get_by_id(missing.id).embedding
+    assert index.search(saved, 1)[0][0] == str(missing.id)
+
+
+def test_not_in_compares_uuid_bytes_including_trailing_nuls():
+    ids = [uuid.UUID(bytes=bytes(15) + bytes([i])) for i in range(4)] + [uuid.UUID(bytes=bytes([1]) + bytes(15))]
+    values = np.array([rid.bytes for rid in ids], dtype="S16")
+    other = np.sort(values[[0, 2, 4]])
+    
+    assert _as_uuids(_not_in(values, other)) == [ids[1], ids[3]]
+    assert _as_uuids(_not_in(values, other[:0])) == ids
+    assert not len(_not_in(values[:0], other))
+
+
+def test_reconcile_indexes_missing_resumes_and_drops_orphans(db, index_path, embeddings):
+    texts = ["python developer", "java engineer", "data engineer spark", "react developer"]
+    resumes = [create_resume(text, embeddings.encode_single(text)) for text in texts]
+    create_resume("no embedding yet")
+    index = get_vector_index(dimension=embeddings.dimension)
+    index.add_batch([(r.id, r.embedding) for r in resumes[:2]])  # resumes[2:] never indexed
+    orphans = [uuid.uuid4(), uuid.UUID(bytes=bytes(16))]
+    index.add_batch([(rid, embeddings.encode_single("deleted resume")) for rid in orphans])
+    
+    dry_run = reconcile_vector_index_task(dry_run=True)
+    
+    assert dry_run["status"] == "success"
+    assert {key: dry_run[key] for key in ("indexed", "resumes", "missing", "orphans", "added", "removed")} == {
+        "indexed": 4, "resumes": 5, "missing": 2, "orphans": 2, "added": 0, "removed": 0
+    }
+    assert index.count() == 4
+    
+    report = reconcile_vector_index_task()
+    
+    assert (report["added"], report["removed"]) == (2, 2)
+    assert sorted(map(str, _as_uuids(index.indexed_ids()))) == sorted(str(r.id) for r in resumes)
+    assert index.search(resumes[3].embedding, 1)[0][0] == str(resumes[3].id)
+    again = reconcile_vector_index_task(dry_run=True)
+    assert (again["missing"], again["orphans"]) == (0, 0)
+
+
+def test_job_index_rebuild_and_sync_follow_the_jobs_table(db, index_path, embeddings):
+    descriptions = {
+        "Backend": "python django backend developer",
+        "Data": "spark airflow data engineer",
+        "Frontend": "react typescript frontend developer",
+    }
+    jobs = {
+        title: JobPostingRepository.create(
+            job_id=uuid.uuid4(), title=title, description=text, embedding=embeddings.encode_single(text)
+        )
+        for title, text in descriptions.items()
+    }
+    resume = create_resume("python django developer", embeddings.encode_single("python django developer"))
+    
+    assert rebuild_job_index_task() == {"status": "success", "indexed": 3}
+    recorded = JobMatchingService().record_top_jobs(resume.id, k=3)
+    
+    query = np.array(resume.embedding)
+    expected = sorted(descriptions, key=lambda title: -query @ jobs[title].embedding)
+    assert [job["title"] for job in recorded] == expected
+    assert [job["title"] for job in ResumeRepository.get_by_id(resume.id).top_jobs] == expected
+    
+    # A description change is re-indexed, a deleted job dropped
+    text = "python django postgresql backend developer"
+    JobPostingRepository.update(jobs["Data"].id, description=text, embedding=embeddings.encode_single(text))
+    JobPostingRepository.delete(jobs["Backend"].id)
+    assert sync_job_index_task(str(jobs["Data"].id))["indexed"] is True
+    assert sync_job_index_task(str(jobs["Backend"].id))["indexed"] is False
+    
+    assert [job["title"] for job in JobMatchingService().find_jobs_for_resume(resume.id, k=3)] == ["Data", "Frontend"]
+    assert get_job_index(dimension=embeddings.dimension).count() == 2
@@ -0,0 +1,65 @@
+"""Tests for length-bucketed batching of bulk encodes."""
+import numpy as np
+import pytest
+
+from apps.resume_screening.infrastructure.ai.length_batching import length_batches
+from apps.resume_screening.infrastructure.ai.sentence_transformer_provider import (
+    MINILM_DIMENSION,
+    SentenceTransformerProvider,
+    estimate_token_lengths,
+)
+from apps.resume_screening.tests.conftest import WordHashProvider
+
+LENGTHS = [12, 250, 3, 3, 90, 256, 40, 7, 128, 1, 64, 200]
+
+
+@pytest.mark.parametrize("batch_size, max_tokens", [(4, 0), (5, 0), (32, 512), (32, 1000)])
+def test_length_batches_are_a_permutation_of_similar_lengths(batch_size, max_tokens):
+    batches = length_batches(LENGTHS, batch_size, max_tokens)
+    
+    assert sorted(np.concatenate(batches).tolist()) == list(range(len(LENGTHS)))
+    lengths = [[LENGTHS[i] for i in batch] for batch in batches]
+    # Batches run longest first and hold neighbours in length order
+    assert [length for batch in lengths for length in batch] == sorted(LENGTHS, reverse=True)
+    for batch in lengths:
+        if max_tokens:
+            assert len(batch) == 1 or len(batch) * batch[0] <= max_tokens
+        else:
+            assert len(batch) <= batch_size
+
+
+def test_token_budget_puts_short_texts_in_big_batches():
+    batches = length_batches([256] * 4 + [16] * 64, batch_size=32, max_tokens=1024)
+    
+    assert [len(batch) for batch in batches] == [4, 64]
+
+
+def test_estimated_token_lengths_are_capped_at_max_seq_length():
+    assert estimate_token_lengths(["", "python", "x" * 4000], max_seq_length=256) == [2, 3, 256]
+
+
+class RecordingModel:
+    """Stands in for a loaded SentenceTransformer: hash embeddings, records each batch."""
+    
+    def __init__(self):
+        self.embedder = WordHashProvider(MINILM_DIMENSION)
+        self.batches = []
+    
+    def encode(self, texts, batch_size, show_progress_bar, convert_to_numpy, normalize_embeddings):
+        self.batches.append(list(texts))
+        return self.embedder.encode(texts, normalize=normalize_embeddings)
+
+
+def test_token_budget_encode_returns_rows_in_input_order():
+    texts = [" ".join(["skill"] * (length * 4 // 6)) for length in LENGTHS]
+    provider = SentenceTransformerProvider(length_bucketing=True, max_batch_tokens=512)
+    provider._model = RecordingModel()
+    
+    embeddings = provider.encode(texts)
+    
+    np.testing.assert_allclose(embeddings, WordHashProvider(MINILM_DIMENSION).encode(texts), rtol=1e-5)
+    batches = provider._model.batches
+    assert len(batches) > 1
+    assert sorted(text for batch in batches for text in batch) == sorted(texts)
+    estimated = dict(zip(texts, estimate_token_lengths(texts)))
+    assert all(len(batch) == 1 or len(batch) * estimated[batch[0]] <= 512 for batch in batches)
@@ -0,0 +1,57 @@
+"""
+Parity of the ONNX Runtime embedding provider with the PyTorch
+(sentence-transformers) one. Skipped unless onnxruntime, sentence-transformers
+and an exported model (`python manage.py onnx_embedding_model export`) are
+available.
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+from django.conf import settings
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+pytest.importorskip("sentence_transformers")
+
+from apps.resume_screening.infrastructure.ai.onnx_provider import (  # noqa: E402
+    EXPORT_MANIFEST,
+    MODEL_FILENAME,
+    QUANTIZED_MODEL_FILENAME,
+    OnnxEmbeddingProvider,
+)
+from apps.resume_screening.infrastructure.ai.sentence_transformer_provider import (  # noqa: E402
+    SentenceTransformerProvider,
+)
+from apps.resume_screening.management.commands.onnx_embedding_model import MIN_COSINE  # noqa: E402
+
+TEXTS = [
+    "python",
+    "Senior Python Developer",
+    "data engineer spark airflow",
+    "5+ years Python, Django and PostgreSQL; REST API design; Docker and Kubernetes in production.",
+    "Frontend engineer (React, TypeScript). Built design systems and led accessibility audits.",
+    "Registered nurse with ICU experience, BLS/ACLS certified, fluent in English and Spanish.",
+    " ".join(["Experienced backend engineer who designed and operated payment services."] * 40),
+    "Développeur full-stack: Node.js, Vue, MongoDB — télétravail possible.",
+]
+
+
+@pytest.fixture(scope="module")
+def torch_embeddings():
+    return SentenceTransformerProvider().encode(TEXTS)
+
+
+@pytest.mark.parametrize("quantized", [False, True], ids=["fp32", "int8"])
+def test_onnx_embeddings_match_sentence_transformers(quantized, torch_embeddings):
+    model_dir = Path(settings.EMBEDDING_ONNX_DIR)
+    filename = QUANTIZED_MODEL_FILENAME if quantized else MODEL_FILENAME
+    if not (model_dir / EXPORT_MANIFEST).exists() or not (model_dir / filename).exists():
+        pytest.skip(f"No exported {filename} in {model_dir}")
+    
+    onnx_embeddings = OnnxEmbeddingProvider(model_dir=str(model_dir), quantized=quantized).encode(TEXTS)
+    
+    assert onnx_embeddings.shape == torch_embeddings.shape
+    # Both L2-normalized: the row-wise dot product is the cosine
+    cosines = np.sum(onnx_embeddings * torch_embeddings, axis=1)
+    assert cosines.min() >= MIN_COSINE, dict(zip(TEXTS, cosines.round(4)))
@@ -0,0 +1,76 @@
+"""Tests for index writes queued from the API (a replica's index is read-only)."""
+import uuid
+
+import pytest
+
+from apps.resume_screening.application.services.job_service import JobPostingService
+from apps.resume_screening.application.services.resume_deletion_service import ResumeDeletionService
+from apps.resume_screening.infrastructure.ai.embedding_service import EmbeddingService
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_job_index
+from apps.resume_screening.infrastructure.repositories.job_repository import JobPostingRepository
+from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+from apps.resume_screening.tasks.index_tasks import sync_job_index_task
+
+
+class QueuedTask:
+    """Stands in for a Celery task; records .delay() calls."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def delay(self, *args):
+        self.calls.append(args)
+
+
+@pytest.fixture
+def queued():
+    return {'sync_job': QueuedTask(), 'remove_resume': QueuedTask(), 'compact': QueuedTask()}
+
+
+def test_resume_delete_on_replica_queues_tombstone(db, replica, queued, tmp_path):
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(b'%PDF')
+    resume = ResumeRepository.create(resume_id=uuid.uuid4(), filename='resume.pdf', file_path=str(path))
+    
+    service = ResumeDeletionService(
+        remove_from_index=queued['remove_resume'].delay, compact_index=queued['compact'].delay
+    )
+    assert service.delete_resume(resume.id)
+    
+    assert ResumeRepository.get_by_id(resume.id) is None
+    assert not path.exists()
+    assert queued['remove_resume'].calls == [(str(resume.id), resume.created_at.isoformat())]
+
+
+def test_job_changes_queue_index_sync(db, index_path, queued, embeddings):
+    service = JobPostingService(sync_index=queued['sync_job'].delay)
+    
+    job = service.create_job('Engineer', 'Python Django')
+    service.update_job(job['id'], title='Senior Engineer')
+    service.update_job(job['id'], description='Python Django Kubernetes')
+    
+    assert queued['sync_job'].calls == [(job['id'],), (job['id'],)]
+    assert not get_job_index(dimension=embeddings.dimension).contains(job['id'])
+
+
+def test_job_delete_on_replica_queues_index_sync(db, replica, queued):
+    job = JobPostingRepository.create(job_id=uuid.uuid4(), title='Engineer', description='Python', embedding=[0.0] * 4)
+    
+    assert JobPostingService(sync_index=queued['sync_job'].delay).delete_job(job.id)
+    
+    assert JobPostingRepository.get_by_id(job.id) is None
+    assert queued['sync_job'].calls == [(str(job.id),)]
+
+
+def test_sync_job_index_task_follows_database(db, index_path):
+    dimension = EmbeddingService().dimension
+    job = JobPostingRepository.create(
+        job_id=uuid.uuid4(), title='Engineer', description='Python', embedding=[1.0] + [0.0] * (dimension - 1)
+    )
+    
+    assert sync_job_index_task(str(job.id))["indexed"]
+    assert get_job_index(dimension=dimension).contains(job.id)
+    
+    JobPostingRepository.delete(job.id)
+    assert not sync_job_index_task(str(job.id))["indexed"]
+    assert not get_job_index(dimension=dimension).contains(job.id)
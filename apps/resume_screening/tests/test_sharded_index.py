@@ -0,0 +1,62 @@
+"""Tests for the sharded vector index: fan-out search and month partitioning."""
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+from apps.resume_screening.infrastructure.ai.sharded_index import ShardedVectorIndex
+from apps.resume_screening.tests.test_vector_index_service import (
+    DIMENSION,
+    assert_same_results,
+    open_index,
+    unit_vectors,
+)
+
+
+def open_sharded(index_dir, **options) -> ShardedVectorIndex:
+    return ShardedVectorIndex(dimension=DIMENSION, index_dir=index_dir, reload_check_interval=0.0, **options)
+
+
+def test_hash_shards_search_like_one_index(tmp_path):
+    vectors, queries = unit_vectors(200, seed=5), unit_vectors(8, seed=6)
+    items = list(zip([uuid.uuid4() for _ in vectors], vectors))
+    sharded = open_sharded(tmp_path / "sharded", partition="hash", num_shards=4)
+    single = open_index(tmp_path / "single")
+    sharded.add_batch(items)
+    single.add_batch(items)
+    
+    assert sum(sharded.counts().values()) == 200
+    assert all(count for count in sharded.counts().values())
+    assert_same_results(sharded.search_batch(queries, 10), single.search_batch(queries, 10))
+    assert_same_results(
+        [sharded.search(q.tolist(), 10) for q in queries], single.search_batch(queries, 10)
+    )
+    assert_same_results(
+        [sharded.range_search(queries[0].tolist(), 0.3)], [single.range_search(queries[0].tolist(), 0.3)]
+    )
+    
+    deleted = [rid for rid, _ in items[:20]]
+    assert sharded.delete_batch(deleted) == 20
+    single.delete_batch(deleted)
+    assert sharded.count() == 180
+    assert_same_results(sharded.search_batch(queries, 10), single.search_batch(queries, 10))
+
+
+def test_month_shards_skip_months_outside_the_time_range(tmp_path):
+    vectors = unit_vectors(30, seed=7)
+    months = [datetime(2024, m, 15, tzinfo=timezone.utc) for m in (3, 4, 5)]
+    items = [(uuid.uuid4(), vector, months[i % 3]) for i, vector in enumerate(vectors)]
+    sharded = open_sharded(tmp_path, partition="month")
+    sharded.add_batch(items)
+    
+    assert sharded.counts() == {"2024-03": 10, "2024-04": 10, "2024-05": 10}
+    assert sharded.shard_keys_between(since=datetime(2024, 4, 30)) == ["2024-04", "2024-05"]
+    april = {str(rid) for rid, _, created_at in items if created_at == months[1]}
+    found = sharded.search(vectors[0].tolist(), 30, since=datetime(2024, 4, 1), until=datetime(2024, 4, 30))
+    assert {rid for rid, _ in found} == april
+    
+    # Without created_at the holding shard is found by probing
+    assert sharded.delete(items[1][0])
+    assert not sharded.contains(items[1][0])
+    assert sharded.counts()["2024-04"] == 9
+    np.testing.assert_allclose(sharded.get_vector(items[2][0]), vectors[2], rtol=1e-6)
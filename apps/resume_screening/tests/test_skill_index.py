@@ -0,0 +1,88 @@
+"""Tests for skill-filtered search: the skill bitmap index and the FAISS prefilter."""
+import uuid
+
+import numpy as np
+import pytest
+from django.conf import settings
+from django.urls import reverse
+
+from apps.resume_screening.infrastructure.ai import skill_index
+from apps.resume_screening.infrastructure.ai.skill_index import SkillIndex
+from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+from apps.resume_screening.tests.test_vector_index_service import exact_top_k, open_index, unit_vectors
+from apps.resume_screening.tests.test_views import indexed_resumes
+
+SKILLS = ["python", "java", "sql", "docker", "react"]
+
+
+def random_skills(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [[skill for skill in SKILLS if rng.random() < 0.3] for _ in range(n)]
+
+
+def test_select_combines_skills_all_and_skills_any():
+    ids = [uuid.uuid4() for _ in range(5)]
+    skills = [["Python", "SQL"], ["python"], ["java", " sql "], ["react"], None]
+    index = SkillIndex(lambda: list(zip(ids, skills)))
+    
+    def selected(**query):
+        return {uuid.UUID(bytes=raw.tobytes()) for raw in index.select(**query).uuids}
+    
+    assert index.select() is None
+    assert selected(skills_all=["python"]) == {ids[0], ids[1]}
+    assert selected(skills_all=["python", "sql"]) == {ids[0]}
+    assert selected(skills_any="java, react") == {ids[2], ids[3]}
+    assert selected(skills_all=["sql"], skills_any=["python", "react"]) == {ids[0]}
+    assert selected(skills_all=["python", "cobol"]) == set()
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf", "hnsw", "sq8", "pq"])
+def test_filtered_top_k_equals_brute_force_over_allowed_resumes(tmp_path, monkeypatch, index_type):
+    monkeypatch.setattr(settings, 'FAISS_INDEX_TYPE', index_type, raising=False)
+    monkeypatch.setattr(settings, 'FAISS_ANN_MIN_SIZE', 300, raising=False)
+    monkeypatch.setattr(settings, 'FAISS_PQ_M', 4, raising=False)
+    n = 10000 if index_type == "pq" else 400
+    vectors, queries = unit_vectors(n, seed=8), unit_vectors(10, seed=9)
+    ids = [str(uuid.uuid4()) for _ in range(n)]
+    skills = random_skills(n)
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids, vectors)))
+    deleted = next(i for i in range(n) if "java" in skills[i] and "sql" in skills[i])
+    index.delete(ids[deleted])
+    assert index.index_type == index_type
+    skill_filter = SkillIndex(lambda: list(zip(ids, skills))).select(
+        skills_all=["java"], skills_any=["sql", "docker"]
+    )
+    
+    allowed = np.array([
+        i != deleted and "java" in s and ("sql" in s or "docker" in s) for i, s in enumerate(skills)
+    ])
+    assert 0 < allowed.sum() < n / 4
+    positions = np.flatnonzero(allowed)
+    expected = [[ids[positions[j]] for j in row] for row in exact_top_k(vectors[allowed], queries, 10)]
+    found = [[rid for rid, _ in results] for results in index.search_batch(queries, 10, skill_filter=skill_filter)]
+    if index_type in ("flat", "ivf"):
+        # IVF probes are widened by the filter's selectivity: every list here
+        assert found == expected
+    else:
+        assert all(set(rids) <= {ids[i] for i in positions} for rids in found)
+        recall = np.mean([len(set(f) & set(e)) / 10 for f, e in zip(found, expected)])
+        assert recall >= 0.9
+
+
+def test_search_view_passes_skill_filters(api, embeddings, monkeypatch):
+    monkeypatch.setattr(skill_index, '_skill_index', None)
+    resumes = indexed_resumes(embeddings)
+    for resume, skills in zip(resumes, [["python", "django"], ["python", "docker"], ["java"], [], ["react"], []]):
+        ResumeRepository.update_extracted_skills(resume.id, skills)
+    url = reverse("semantic-search")
+    
+    response = api.post(url, {"query": "python developer", "k": 5, "skills_all": ["python"]}, format="json")
+    assert {r["resume_id"] for r in response.data["results"]} == {str(resumes[0].id), str(resumes[1].id)}
+    
+    response = api.post(
+        url, {"queries": ["developer", "engineer"], "k": 5, "skills_any": ["java", "react"]}, format="json"
+    )
+    assert [{r["resume_id"] for r in entry["results"]} for entry in response.data["queries"]] == [
+        {str(resumes[2].id), str(resumes[4].id)}
+    ] * 2
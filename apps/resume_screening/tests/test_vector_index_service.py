@@ -0,0 +1,363 @@
+"""Tests for the FAISS vector index: persistence, delta log and crash recovery."""
+import threading
+import time
+import uuid
+
+import numpy as np
+import pytest
+from django.conf import settings
+
+from apps.resume_screening.infrastructure.ai.delta_log import OP_UPSERT, make_records, record_ids
+from apps.resume_screening.infrastructure.ai.mmap_index import MmapFlatIndex
+from apps.resume_screening.infrastructure.ai.vector_index_service import VectorIndexService
+from apps.resume_screening.infrastructure.ai.write_queue import PendingWriteQueue
+
+DIMENSION = 16
+
+
+def unit_vectors(n: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((n, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def vectors():
+    return unit_vectors(50)
+
+
+@pytest.fixture
+def ids():
+    return [uuid.uuid4() for _ in range(50)]
+
+
+def open_index(index_dir) -> VectorIndexService:
+    return VectorIndexService(dimension=DIMENSION, index_dir=index_dir, reload_check_interval=0.0)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Row positions of the brute-force top k of each query."""
+    return np.argsort(-(queries @ vectors.T), axis=1, kind='stable')[:, :k]
+
+
+def assert_same_results(batch, expected):
+    assert [[rid for rid, _ in results] for results in batch] == [[rid for rid, _ in results] for results in expected]
+    np.testing.assert_allclose(
+        [score for results in batch for _, score in results],
+        [score for results in expected for _, score in results],
+        rtol=1e-5,
+    )
+
+
+def test_add_search_and_reload(tmp_path, ids, vectors):
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids[:20], vectors[:20])))
+    index.add(ids[20], vectors[20].tolist())
+    
+    reloaded = open_index(tmp_path)
+    assert reloaded.count() == 21
+    for i in (0, 19, 20):
+        assert reloaded.search(vectors[i].tolist(), 1)[0][0] == str(ids[i])
+
+
+def test_upsert_replaces_previous_vector(tmp_path, ids, vectors):
+    index = open_index(tmp_path)
+    index.add(ids[0], vectors[0].tolist())
+    index.add(ids[0], vectors[1].tolist())
+    
+    assert index.count() == 1
+    np.testing.assert_allclose(index.get_vector(ids[0]), vectors[1], rtol=1e-6)
+    assert open_index(tmp_path).search(vectors[1].tolist(), 1)[0][0] == str(ids[0])
+
+
+def test_delete_hides_resume_and_survives_reload(tmp_path, ids, vectors):
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids[:10], vectors[:10])))
+    assert index.delete(ids[3])
+    assert not index.delete(ids[3])
+    
+    for service in (index, open_index(tmp_path)):
+        assert service.count() == 9
+        assert not service.contains(ids[3])
+        assert str(ids[3]) not in [rid for rid, _ in service.search(vectors[3].tolist(), 10)]
+
+
+def test_compact_reclaims_tombstones(tmp_path, ids, vectors):
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids[:10], vectors[:10])))
+    index.delete_batch(ids[:4])
+    index.add(ids[4], vectors[4].tolist())  # replaced: its old vector is a tombstone too
+    
+    assert index.compact() == 5
+    assert index.tombstone_fraction() == 0.0
+    reloaded = open_index(tmp_path)
+    assert reloaded.count() == 6
+    assert reloaded.search(vectors[4].tolist(), 1)[0][0] == str(ids[4])
+    assert reloaded.tombstone_fraction() == 0.0
+
+
+def test_checkpoint_folds_log_into_new_generation(tmp_path, ids, vectors):
+    index = VectorIndexService(
+        dimension=DIMENSION, index_dir=tmp_path, reload_check_interval=0.0, checkpoint_records=5
+    )
+    for i in range(12):
+        index.add(ids[i], vectors[i].tolist())
+    
+    assert index.generation > 1
+    assert index.manifest()["generation"] == index.generation
+    reloaded = open_index(tmp_path)
+    assert reloaded.count() == 12
+    assert reloaded.search(vectors[11].tolist(), 1)[0][0] == str(ids[11])
+
+
+def test_other_instance_picks_up_writes(tmp_path, ids, vectors):
+    writer, reader = open_index(tmp_path), open_index(tmp_path)
+    writer.add(ids[0], vectors[0].tolist())
+    assert reader.count() == 1
+    
+    writer.add(ids[1], vectors[1].tolist())
+    writer.delete(ids[0])
+    assert reader.search(vectors[1].tolist(), 1)[0][0] == str(ids[1])
+    assert not reader.contains(ids[0])
+    
+    writer.checkpoint()
+    assert reader.search(vectors[1].tolist(), 1)[0][0] == str(ids[1])
+    assert reader.generation == writer.generation
+
+
+def test_torn_log_tail_is_overwritten_by_next_append(tmp_path, ids, vectors):
+    index = open_index(tmp_path)
+    index.add(ids[0], vectors[0].tolist())
+    index.add(ids[1], vectors[1].tolist())
+    assert index._store.log_path is not None
+    # Crash mid-append: a partial record is left at the end of the log
+    with open(index._store.log_path, 'ab') as f:
+        f.write(b'\xff' * 37)
+    
+    open_index(tmp_path).add(ids[2], vectors[2].tolist())
+    
+    reloaded = open_index(tmp_path)
+    assert reloaded.count() == 3
+    for i in range(3):
+        assert reloaded.contains(ids[i])
+        top_id, score = reloaded.search(vectors[i].tolist(), 1)[0]
+        assert top_id == str(ids[i])
+        assert score == pytest.approx(1.0, abs=1e-4)
+
+
+def test_pending_queue_overwrites_torn_tail(tmp_path, ids, vectors):
+    queue = PendingWriteQueue(tmp_path / 'pending', DIMENSION)
+    queue.append(make_records(DIMENSION, OP_UPSERT, np.array([-1]), [str(ids[0])], vectors[:1]))
+    with open(queue.path, 'ab') as f:
+        f.write(b'\xff' * 37)
+    queue.append(make_records(DIMENSION, OP_UPSERT, np.array([-1]), [str(ids[1])], vectors[1:2]))
+    
+    records, _ = queue.read()
+    assert record_ids(records) == [str(ids[0]), str(ids[1])]
+    np.testing.assert_array_equal(records["vector"], vectors[:2])
+
+
+def test_enqueue_during_rebuild_is_applied_after_swap(tmp_path, ids, vectors):
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids[:10], vectors[:10])))
+    worker = open_index(tmp_path)  # another process sharing the index dir
+    worker.count()
+    
+    rebuilding = threading.Event()
+    
+    def rebuild():
+        with index.rebuilding() as side:
+            side.add_batch(list(zip(ids[10:20], vectors[10:20])))
+            rebuilding.set()
+            deadline = time.monotonic() + 5
+            while not len(index._pending) and time.monotonic() < deadline:
+                time.sleep(0.01)
+    
+    thread = threading.Thread(target=rebuild)
+    thread.start()
+    assert rebuilding.wait(5)
+    worker.enqueue(ids[20], vectors[20].tolist())  # lock taken: queued for the rebuilding writer
+    thread.join()
+    
+    assert len(index._pending) == 0
+    reloaded = open_index(tmp_path)
+    assert reloaded.count() == 11
+    assert reloaded.contains(ids[20])
+    assert not reloaded.contains(ids[0])
+    assert reloaded.search(vectors[20].tolist(), 1)[0][0] == str(ids[20])
+
+
+@pytest.mark.parametrize("index_type, exhaustive", [("ivf", {"nprobe": 10}), ("hnsw", {"ef_search": 400})])
+def test_flat_index_migrates_to_ann_at_min_size(tmp_path, monkeypatch, index_type, exhaustive):
+    monkeypatch.setattr(settings, 'FAISS_INDEX_TYPE', index_type, raising=False)
+    monkeypatch.setattr(settings, 'FAISS_ANN_MIN_SIZE', 300, raising=False)
+    monkeypatch.setattr(settings, 'FAISS_IVF_NPROBE', 3, raising=False)  # of 10 lists
+    vectors, queries = unit_vectors(400, seed=1), unit_vectors(20, seed=2)
+    ids = [uuid.uuid4() for _ in range(len(vectors))]
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids[:250], vectors[:250])))
+    assert index.index_type == "flat"
+    
+    index.add_batch(list(zip(ids[250:], vectors[250:])))
+    
+    assert index.index_type == index_type
+    reloaded = open_index(tmp_path)
+    assert reloaded.index_type == index_type and reloaded.count() == 400
+    expected = [[str(ids[i]) for i in row] for row in exact_top_k(vectors, queries, 10)]
+    # Probing every list / a beam as large as the corpus is exact
+    assert [[rid for rid, _ in reloaded.search(q.tolist(), 10, **exhaustive)] for q in queries] == expected
+    found = [[rid for rid, _ in reloaded.search(q.tolist(), 10)] for q in queries]
+    recall = np.mean([len(set(f) & set(e)) / 10 for f, e in zip(found, expected)])
+    assert recall >= 0.6
+    
+    assert reloaded.delete(ids[0])
+    assert str(ids[0]) not in [rid for rid, _ in reloaded.search(vectors[0].tolist(), 10, **exhaustive)]
+
+
+def test_add_batch_upserts_without_touching_other_vectors(tmp_path, ids, vectors):
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids[:10], vectors[:10])))
+    labels = {rid: index._mapping.label_of(str(rid)) for rid in ids[:10]}
+    
+    index.add_batch(list(zip(ids[:3], vectors[10:13])))
+    
+    # Replaced vectors are tombstoned and appended, nothing is rebuilt
+    assert index.count() == 10
+    assert index._index.ntotal == 13
+    assert index.tombstone_fraction() == pytest.approx(3 / 13)
+    assert all(index._mapping.label_of(str(rid)) == labels[rid] for rid in ids[3:10])
+    assert all(index._mapping.label_of(str(rid)) > max(labels.values()) for rid in ids[:3])
+    reloaded = open_index(tmp_path)
+    for i in range(3):
+        np.testing.assert_allclose(reloaded.get_vector(ids[i]), vectors[10 + i], rtol=1e-6)
+        assert reloaded.search(vectors[10 + i].tolist(), 1)[0][0] == str(ids[i])
+        # The old vector is no longer found under any id
+        assert reloaded.search(vectors[i].tolist(), 1)[0][1] < 0.999
+
+
+def test_read_only_instance_maps_generation_and_follows_log(tmp_path, ids, vectors):
+    writer = open_index(tmp_path)
+    writer.add_batch(list(zip(ids[:20], vectors[:20])))
+    writer.checkpoint()
+    reader = VectorIndexService(dimension=DIMENSION, index_dir=tmp_path, reload_check_interval=0.0, read_only=True)
+    
+    assert reader.count() == 20
+    assert isinstance(reader._index, MmapFlatIndex)
+    assert isinstance(reader._index.vectors.base, np.memmap)
+    queries = vectors[:5].tolist()
+    assert_same_results(reader.search_batch(queries, 3), writer.search_batch(queries, 3))
+    
+    # Log records since the checkpoint are served from the in-memory delta
+    writer.add(ids[20], vectors[20].tolist())
+    writer.delete(ids[0])
+    assert reader.search(vectors[20].tolist(), 1)[0][0] == str(ids[20])
+    assert str(ids[0]) not in [rid for rid, _ in reader.search(vectors[0].tolist(), 5)]
+    assert_same_results(reader.search_batch(queries, 3), writer.search_batch(queries, 3))
+    
+    with pytest.raises(RuntimeError, match="read-only"):
+        reader.add(ids[21], vectors[21].tolist())
+
+
+@pytest.mark.parametrize("index_type, n", [("sq8", 400), ("pq", 10000)])
+def test_quantized_index_reranks_candidates_exactly(tmp_path, monkeypatch, index_type, n):
+    monkeypatch.setattr(settings, 'FAISS_INDEX_TYPE', index_type, raising=False)
+    monkeypatch.setattr(settings, 'FAISS_ANN_MIN_SIZE', 300, raising=False)
+    monkeypatch.setattr(settings, 'FAISS_PQ_M', 4, raising=False)
+    vectors, queries = unit_vectors(n, seed=3), unit_vectors(10, seed=4)
+    ids = [str(uuid.uuid4()) for _ in range(n)]
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids, vectors)))
+    assert index.index_type == index_type
+    
+    reloaded = open_index(tmp_path)
+    expected = exact_top_k(vectors, queries, 5)
+    for query, top in zip(queries, expected):
+        results = reloaded.search(query.tolist(), 5, rerank_factor=n)
+        # Re-ranking every candidate is exact, scores included
+        assert [rid for rid, _ in results] == [ids[i] for i in top]
+        np.testing.assert_allclose([s for _, s in results], vectors[top] @ query, rtol=1e-5)
+        approximate = reloaded.search(query.tolist(), 5, rerank_factor=1)
+        assert not np.allclose([s for _, s in approximate], vectors[top] @ query, rtol=1e-5)
+
+
+def test_rebuild_streams_items_and_swaps_atomically(tmp_path, ids, vectors):
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids[:10], vectors[:10])))
+    reader = open_index(tmp_path)  # another process serving searches
+    
+    def items(live, fail_at=None):
+        for i in range(10, 40):
+            if i == 25:
+                # Mid-rebuild: searches are still served from the old index
+                assert reader.count() == live
+                assert reader.search(vectors[0].tolist(), 1)[0][0] == str(ids[0])
+            if i == fail_at:
+                raise RuntimeError("database went away")
+            yield ids[i], vectors[i].tolist()
+    
+    assert index.rebuild(items(live=10), chunk_size=7) == 30
+    
+    for service in (index, reader, open_index(tmp_path)):
+        assert service.count() == 30
+        assert not service.contains(ids[0])
+        assert service.search(vectors[39].tolist(), 1)[0][0] == str(ids[39])
+    
+    index.add_batch(list(zip(ids[:10], vectors[:10])))
+    with pytest.raises(RuntimeError, match="went away"):
+        index.rebuild(items(live=40, fail_at=30), chunk_size=7)
+    
+    # A failed rebuild leaves the live index as it was
+    assert not list(tmp_path.glob("rebuild.*"))
+    for service in (index, open_index(tmp_path)):
+        assert service.count() == 40
+        assert service.search(vectors[0].tolist(), 1)[0][0] == str(ids[0])
+
+
+@pytest.mark.parametrize("index_type", ["flat", "mmap", "ivf", "hnsw", "sq8"])
+def test_range_search_equals_brute_force_count(tmp_path, monkeypatch, index_type):
+    monkeypatch.setattr(settings, 'FAISS_INDEX_TYPE', "flat" if index_type == "mmap" else index_type, raising=False)
+    monkeypatch.setattr(settings, 'FAISS_ANN_MIN_SIZE', 300, raising=False)
+    vectors, query = unit_vectors(400, seed=10), unit_vectors(1, seed=11)[0]
+    ids = [str(uuid.uuid4()) for _ in range(len(vectors))]
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids[:350], vectors[:350])))
+    index.checkpoint()
+    index.add_batch(list(zip(ids[350:], vectors[350:])))  # delta log records
+    index.delete(ids[int(np.argmax(vectors @ query))])
+    if index_type == "mmap":
+        index = VectorIndexService(dimension=DIMENSION, index_dir=tmp_path, reload_check_interval=0.0, read_only=True)
+    
+    scores = vectors @ query
+    scores[np.argmax(scores)] = -np.inf  # deleted
+    expected = [ids[i] for i in np.argsort(-scores, kind='stable') if scores[i] >= 0.4]
+    assert 10 < len(expected) < 100
+    
+    found = index.range_search(query.tolist(), 0.4, nprobe=10)
+    
+    assert [rid for rid, _ in found] == expected
+    assert all(score >= 0.4 for _, score in found)
+    # Capped at max_results, best first
+    assert [rid for rid, _ in index.range_search(query.tolist(), 0.4, max_results=5, nprobe=10)] == expected[:5]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "mmap", "hnsw", "sq8"])
+def test_search_batch_equals_one_search_per_query(tmp_path, monkeypatch, index_type):
+    monkeypatch.setattr(settings, 'FAISS_INDEX_TYPE', "flat" if index_type == "mmap" else index_type, raising=False)
+    monkeypatch.setattr(settings, 'FAISS_ANN_MIN_SIZE', 300, raising=False)
+    vectors, queries = unit_vectors(400, seed=12), unit_vectors(7, seed=13)
+    ids = [str(uuid.uuid4()) for _ in range(len(vectors))]
+    index = open_index(tmp_path)
+    index.add_batch(list(zip(ids[:350], vectors[:350])))
+    index.checkpoint()
+    index.add_batch(list(zip(ids[350:], vectors[350:])))
+    index.delete_batch(ids[::10])
+    if index_type == "mmap":
+        index = VectorIndexService(dimension=DIMENSION, index_dir=tmp_path, reload_check_interval=0.0, read_only=True)
+    
+    batch = index.search_batch(queries, 8)
+    
+    assert len(batch) == len(queries)
+    assert_same_results(batch, [index.search(q.tolist(), 8) for q in queries])
+    assert_same_results(index.search_batch(queries.tolist(), 8), batch)
+    assert index.search_batch(np.zeros((0, DIMENSION)), 8) == []
+    with pytest.raises(ValueError):
+        index.search_batch(queries[:, :8], 8)
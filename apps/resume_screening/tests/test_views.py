@@ -0,0 +1,198 @@
+"""API tests for the resume search, matching and deletion endpoints."""
+import uuid
+
+import numpy as np
+from django.urls import reverse
+
+from apps.resume_screening.application.services.resume_deletion_service import ResumeDeletionService
+
+from apps.resume_screening.infrastructure.ai.vector_index_service import get_vector_index
+from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
+
+RESUME_TEXTS = [
+    "python django postgresql rest api developer",
+    "python flask backend developer docker",
+    "java spring microservices kafka engineer",
+    "data engineer spark airflow python sql",
+    "frontend react typescript css developer",
+    "kubernetes terraform aws devops engineer",
+]
+
+
+def indexed_resumes(embeddings, texts=RESUME_TEXTS) -> list:
+    """Resume rows for `texts`, embedded and added to the resume index."""
+    index = get_vector_index(dimension=embeddings.dimension)
+    resumes = []
+    for i, text in enumerate(texts):
+        resume = ResumeRepository.create(
+            resume_id=uuid.uuid4(), filename=f"resume-{i}.pdf", file_path="", raw_text=text
+        )
+        vector = embeddings.encode_single(text)
+        ResumeRepository.update_embedding(resume.id, vector)
+        index.add(resume.id, vector, created_at=resume.created_at)
+        resumes.append(resume)
+    return resumes
+
+
+def test_similar_resumes_excludes_the_resume_itself(api, embeddings):
+    resumes = indexed_resumes(embeddings)
+    
+    response = api.get(reverse("resume-similar", args=[resumes[0].id]), {"k": 3})
+    
+    assert response.status_code == 200
+    similar = [r["resume_id"] for r in response.data["similar"]]
+    assert len(similar) == 3
+    assert str(resumes[0].id) not in similar
+    # Shares "python" and "developer" with the query resume
+    assert similar[0] == str(resumes[1].id)
+
+
+def test_similar_resumes_of_unindexed_resume_uses_stored_embedding(api, embeddings):
+    resumes = indexed_resumes(embeddings)
+    pending = ResumeRepository.create(
+        resume_id=uuid.uuid4(), filename="pending.pdf", file_path="", raw_text=RESUME_TEXTS[0]
+    )
+    ResumeRepository.update_embedding(pending.id, embeddings.encode_single(RESUME_TEXTS[0]))
+    embeddings.calls = 0
+    
+    response = api.get(reverse("resume-similar", args=[pending.id]), {"k": 2})
+    
+    assert response.status_code == 200
+    assert response.data["similar"][0]["resume_id"] == str(resumes[0].id)
+    assert embeddings.calls == 0
+
+
+def test_similar_resumes_of_unknown_resume_is_404(api):
+    response = api.get(reverse("resume-similar", args=[uuid.uuid4()]))
+    
+    assert response.status_code == 404
+
+
+def test_resume_jobs_ranks_jobs_created_through_the_api(api, embeddings):
+    resume = indexed_resumes(embeddings, ["python django postgresql backend developer"])[0]
+    created = {}
+    for title, description in [
+        ("Backend Developer", "python django postgresql backend developer"),
+        ("Data Engineer", "spark airflow sql pipelines"),
+        ("Frontend Developer", "react typescript css"),
+    ]:
+        response = api.post(reverse("job-create"), {"title": title, "description": description}, format="json")
+        assert response.status_code == 201
+        created[response.data["id"]] = title
+    
+    response = api.get(reverse("resume-jobs", args=[resume.id]), {"k": 2})
+    
+    assert response.status_code == 200
+    jobs = response.data["jobs"]
+    assert [j["title"] for j in jobs][:1] == ["Backend Developer"]
+    assert len(jobs) == 2 and all(j["job_id"] in created for j in jobs)
+
+
+def test_resume_jobs_drops_deleted_job(api, embeddings):
+    resume = indexed_resumes(embeddings, ["python django developer"])[0]
+    job = api.post(reverse("job-create"), {"title": "Python", "description": "python django developer"}, format="json")
+    
+    assert api.delete(reverse("job-detail", args=[job.data["id"]])).status_code == 204
+    
+    response = api.get(reverse("resume-jobs", args=[resume.id]))
+    assert response.status_code == 200
+    assert response.data["jobs"] == []
+
+
+def test_delete_resume_removes_it_from_search(api, embeddings):
+    resumes = indexed_resumes(embeddings)
+    url = reverse("resume-detail", args=[resumes[0].id])
+    
+    assert api.delete(url).status_code == 204
+    assert api.delete(url).status_code == 404
+    assert api.get(url).status_code == 404
+    
+    response = api.post(reverse("semantic-search"), {"query": RESUME_TEXTS[0], "k": 10}, format="json")
+    assert response.status_code == 200
+    found = [r["resume_id"] for r in response.data["results"]]
+    assert str(resumes[0].id) not in found
+    assert len(found) == len(resumes) - 1
+    assert not get_vector_index(dimension=embeddings.dimension).contains(resumes[0].id)
+
+
+def test_failed_delete_is_logged(api, embeddings, monkeypatch, caplog):
+    resume = indexed_resumes(embeddings, ["python developer"])[0]
+    
+    def fail(self, resume_id):
+        raise OSError("index directory is read-only")
+    
+    monkeypatch.setattr(ResumeDeletionService, "delete_resume", fail)
+    
+    response = api.delete(reverse("resume-detail", args=[resume.id]))
+    
+    assert response.status_code == 500
+    assert any(r.exc_info and "read-only" in str(r.exc_info[1]) for r in caplog.records)
+
+
+def test_search_with_queries_returns_one_result_list_per_query(api, embeddings):
+    resumes = indexed_resumes(embeddings)
+    queries = ["java spring kafka", "react typescript", "kubernetes aws terraform"]
+    
+    response = api.post(reverse("semantic-search"), {"queries": queries, "k": 2}, format="json")
+    
+    assert response.status_code == 200
+    batch = response.data["queries"]
+    assert [entry["query"] for entry in batch] == queries
+    assert all(len(entry["results"]) == 2 for entry in batch)
+    assert [entry["results"][0]["resume_id"] for entry in batch] == [
+        str(resumes[2].id), str(resumes[4].id), str(resumes[5].id)
+    ]
+    # Same ranking as one query at a time
+    single = api.post(reverse("semantic-search"), {"query": queries[0], "k": 2}, format="json")
+    assert single.data["results"] == batch[0]["results"]
+
+
+def test_search_needs_exactly_one_of_query_and_queries(api):
+    url = reverse("semantic-search")
+    
+    assert api.post(url, {"k": 2}, format="json").status_code == 400
+    assert api.post(url, {"query": "python", "queries": ["python"]}, format="json").status_code == 400
+    assert api.post(url, {"queries": ["python"] * 101}, format="json").status_code == 400
+
+
+def test_match_search_and_similar_share_the_result_format(api, embeddings):
+    resumes = indexed_resumes(embeddings)
+    text = "python developer"
+    
+    match = api.post(reverse("match-resumes"), {"description": text, "k": 3}, format="json").data["matches"]
+    search = api.post(reverse("semantic-search"), {"query": text, "k": 3}, format="json").data["results"]
+    similar = api.get(reverse("resume-similar", args=[resumes[0].id]), {"k": 3}).data["similar"]
+    
+    assert match == search
+    assert {tuple(sorted(r)) for r in match + similar} == {
+        ("extracted_skills", "filename", "raw_text_preview", "resume_id", "similarity_score")
+    }
+
+
+def test_match_with_min_score_returns_every_resume_above_it(api, embeddings):
+    resumes = indexed_resumes(embeddings)
+    text = "python developer"
+    query = np.array(embeddings.encode_single(text))
+    scores = {str(r.id): float(query @ embeddings.encode_single(t)) for r, t in zip(resumes, RESUME_TEXTS)}
+    expected = sorted((rid for rid, score in scores.items() if score >= 0.3), key=scores.get, reverse=True)
+    assert 1 < len(expected) < len(resumes)
+    url = reverse("match-resumes")
+    
+    response = api.post(url, {"description": text, "min_score": 0.3}, format="json")
+    
+    assert response.status_code == 200
+    assert [r["resume_id"] for r in response.data["matches"]] == expected
+    capped = api.post(url, {"description": text, "min_score": 0.3, "max_results": 1}, format="json")
+    assert [r["resume_id"] for r in capped.data["matches"]] == expected[:1]
+    assert api.post(url, {"description": text, "min_score": 2}, format="json").status_code == 400
+
+
+def test_search_with_blank_query_in_batch_returns_empty_list(api, embeddings):
+    indexed_resumes(embeddings)
+    embeddings.calls = 0
+    
+    response = api.post(reverse("semantic-search"), {"queries": ["python", "  ", "java"], "k": 2}, format="json")
+    
+    assert response.status_code == 200
+    assert [len(entry["results"]) for entry in response.data["queries"]] == [2, 0, 2]
+    assert embeddings.calls == 1  # all queries encoded together
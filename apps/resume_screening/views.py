@@ -2,6 +2,9 @@
 Views for resume screening API.
 Thin layer - no business logic, delegates to services.
 """
+import logging
+
+from django.conf import settings
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.request import Request
@@ -9,10 +12,13 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.resume_screening.application.services.batch_upload_service import BatchResumeUploadService
+from apps.resume_screening.application.services.job_matching_service import JobMatchingService
 from apps.resume_screening.application.services.job_service import JobPostingService
 from apps.resume_screening.application.services.matching_service import MatchingService
+from apps.resume_screening.application.services.resume_deletion_service import ResumeDeletionService
 from apps.resume_screening.application.services.resume_upload_service import ResumeUploadService
 from apps.resume_screening.application.services.semantic_search_service import SemanticSearchService
+from apps.resume_screening.infrastructure.ai.vector_index_service import DEFAULT_RANGE_MAX_RESULTS
 from apps.resume_screening.infrastructure.repositories.resume_repository import ResumeRepository
 from apps.resume_screening.serializers import (
     JobPostingCreateSerializer,
@@ -21,6 +27,13 @@ from apps.resume_screening.serializers import (
     ResumeUploadSerializer,
     SemanticSearchSerializer,
 )
+from apps.resume_screening.tasks.index_tasks import (
+    compact_vector_index_task,
+    remove_resume_from_index_task,
+    sync_job_index_task,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class BatchResumeUploadView(APIView):
@@ -77,7 +90,7 @@ class ResumeUploadView(APIView):
 
 
 class ResumeDetailView(APIView):
-    """Retrieve resume by ID."""
+    """Retrieve or delete resume by ID."""
     
     def get(self, request: Request, resume_id: str) -> Response:
         """Get resume details including extracted text."""
@@ -95,9 +108,84 @@ class ResumeDetailView(APIView):
             "file_path": resume.file_path,
             "raw_text": resume.raw_text,
             "extracted_skills": resume.extracted_skills or [],
+            "top_jobs": resume.top_jobs or [],
             "created_at": resume.created_at,
         })
         return Response(serializer.data)
+    
+    def delete(self, request: Request, resume_id: str) -> Response:
+        """Delete resume, its file and its index entry."""
+        try:
+            deleted = ResumeDeletionService(
+                remove_from_index=remove_resume_from_index_task.delay,
+                compact_index=compact_vector_index_task.delay,
+            ).delete_resume(resume_id)
+        except Exception:
+            logger.exception(f"Resume delete failed for {resume_id}")
+            return Response(
+                {"error": "Delete failed"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        if not deleted:
+            return Response(
+                {"error": "Resume not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SimilarResumesView(APIView):
+    """Resumes most similar to a given resume ("more like this")."""
+    
+    def get(self, request: Request, resume_id: str) -> Response:
+        """
+        Query param: k (default 5, max 20).
+        Uses the resume's stored vector, so no model call is made.
+        """
+        try:
+            k = max(1, min(int(request.query_params.get("k", 5)), 20))
+        except ValueError:
+            return Response(
+                {"error": "k must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            results = MatchingService().find_similar_resumes(resume_id, k=k)
+            return Response({"resume_id": str(resume_id), "similar": results})
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception:
+            return Response(
+                {"error": "Similarity search failed"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class ResumeJobsView(APIView):
+    """Job postings a resume fits best (reverse matching)."""
+    
+    def get(self, request: Request, resume_id: str) -> Response:
+        """
+        Query param: k (default 5, max 20).
+        Uses the resume's stored vector and the job index, so no model call is made.
+        """
+        try:
+            k = max(1, min(int(request.query_params.get("k", 5)), 20))
+        except ValueError:
+            return Response(
+                {"error": "k must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            results = JobMatchingService().find_jobs_for_resume(resume_id, k=k)
+            return Response({"resume_id": str(resume_id), "jobs": results})
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception:
+            return Response(
+                {"error": "Job matching failed"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
 
 class JobPostingCreateView(APIView):
@@ -109,7 +197,7 @@ class JobPostingCreateView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         try:
-            result = JobPostingService().create_job(
+            result = JobPostingService(sync_index=sync_job_index_task.delay).create_job(
                 title=serializer.validated_data["title"],
                 description=serializer.validated_data["description"],
             )
@@ -137,7 +225,7 @@ class JobPostingDetailView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         data = serializer.validated_data
-        job = JobPostingService().update_job(
+        job = JobPostingService(sync_index=sync_job_index_task.delay).update_job(
             job_id,
             title=data.get("title"),
             description=data.get("description"),
@@ -147,7 +235,7 @@ class JobPostingDetailView(APIView):
         return Response(job)
     
     def delete(self, request: Request, job_id: str) -> Response:
-        if not JobPostingService().delete_job(job_id):
+        if not JobPostingService(sync_index=sync_job_index_task.delay).delete_job(job_id):
             return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -169,7 +257,11 @@ class MatchResumesView(APIView):
     def post(self, request: Request) -> Response:
         """
         Body: {"job_id": "uuid"} or {"description": "job description text"}
+        Optional: "k", "uploaded_within_days" (only resumes uploaded in the last N days),
+        "skills_all" / "skills_any" (lists of skills the resume must have all / any of).
         Returns top 5 matching resumes.
+        Threshold mode: "min_score" returns every resume with similarity >= min_score,
+        best first, up to "max_results" (capped by FAISS_RANGE_MAX_RESULTS).
         """
         job_id = request.data.get("job_id")
         description = request.data.get("description")
@@ -185,14 +277,41 @@ class MatchResumesView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         
+        max_range = getattr(settings, 'FAISS_RANGE_MAX_RESULTS', DEFAULT_RANGE_MAX_RESULTS)
+        min_score = request.data.get("min_score")
+        if min_score is not None:
+            try:
+                min_score = float(min_score)
+                max_results = int(request.data.get("max_results", max_range))
+            except (TypeError, ValueError):
+                return Response(
+                    {"error": "min_score must be a number and max_results an integer"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if not -1.0 <= min_score <= 1.0:
+                return Response(
+                    {"error": "min_score must be between -1 and 1"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        
         try:
             service = MatchingService()
-            k = min(int(request.data.get("k", 5)), 20)
+            if min_score is None:
+                k = min(int(request.data.get("k", 5)), 20)
+            else:
+                k = max(1, min(max_results, max_range))
+            days = request.data.get("uploaded_within_days")
+            filters = {
+                "uploaded_within_days": int(days) if days else None,
+                "skills_all": request.data.get("skills_all"),
+                "skills_any": request.data.get("skills_any"),
+                "min_score": min_score,
+            }
             if job_id:
                 from uuid import UUID
-                results = service.find_top_resumes(UUID(str(job_id)), k=k)
+                results = service.find_top_resumes(UUID(str(job_id)), k=k, **filters)
             else:
-                results = service.find_top_resumes_by_description(description, k=k)
+                results = service.find_top_resumes_by_description(description, k=k, **filters)
             return Response({"matches": results})
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
@@ -201,3 +320,41 @@ class MatchResumesView(APIView):
                 {"error": "Matching failed"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+class SemanticSearchView(APIView):
+    """Free-text semantic search over resumes."""
+    parser_classes = [JSONParser]
+    
+    def post(self, request: Request) -> Response:
+        """
+        Body: {"query": "text", "k": 10}
+        or {"queries": ["text", ...], "k": 10} for many queries in one batch.
+        Optional: "skills_all", "skills_any", "uploaded_within_days" (as for /match/).
+        """
+        serializer = SemanticSearchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        options = dict(
+            k=data.get("k", 10),
+            uploaded_within_days=data.get("uploaded_within_days"),
+            skills_all=data.get("skills_all"),
+            skills_any=data.get("skills_any"),
+        )
+        try:
+            if "queries" in data:
+                batch = SemanticSearchService().search_batch(data["queries"], **options)
+                return Response({
+                    "queries": [
+                        {"query": query, "results": results}
+                        for query, results in zip(data["queries"], batch)
+                    ]
+                })
+            results = SemanticSearchService().search(data["query"], **options)
+            return Response({"results": results})
+        except Exception:
+            return Response(
+                {"error": "Search failed"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -176,9 +176,73 @@ CACHES = {
 # HuggingFace / Transformers Configuration
 HF_MODEL_CACHE_DIR = BASE_DIR / 'models_cache'
 HF_MODEL_NAME = os.getenv('HF_MODEL_NAME', 'sentence-transformers/all-MiniLM-L6-v2')
+# Embedding model runtime: sentence_transformers (PyTorch) or onnx (ONNX Runtime, CPU;
+# export the model first with `manage.py onnx_embedding_model export`)
+EMBEDDING_PROVIDER = os.getenv('EMBEDDING_PROVIDER', 'sentence_transformers')
+EMBEDDING_ONNX_DIR = os.getenv('EMBEDDING_ONNX_DIR', str(HF_MODEL_CACHE_DIR / 'onnx'))
+EMBEDDING_ONNX_QUANTIZED = os.getenv('EMBEDDING_ONNX_QUANTIZED', 'True') == 'True'  # int8 weights
+EMBEDDING_ONNX_THREADS = int(os.getenv('EMBEDDING_ONNX_THREADS', '0'))  # 0 = onnxruntime default
+# Bulk encodes: batch texts of similar token length (less padding); with a token budget,
+# size batches by padded tokens instead of batch_size (0 = fixed batch_size)
+EMBEDDING_LENGTH_BUCKETING = os.getenv('EMBEDDING_LENGTH_BUCKETING', 'True') == 'True'
+EMBEDDING_MAX_BATCH_TOKENS = int(os.getenv('EMBEDDING_MAX_BATCH_TOKENS', '0'))
+# Embedding cache: vectors keyed by a hash of model + text, in a per-process LRU
+# and a shared tier (redis = the Django cache, disk = EMBEDDING_CACHE_DIR, or none)
+EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'True') == 'True'
+EMBEDDING_CACHE_BACKEND = os.getenv('EMBEDDING_CACHE_BACKEND', 'redis')
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MEMORY_ENTRIES', '5000'))
+EMBEDDING_CACHE_TTL = int(os.getenv('EMBEDDING_CACHE_TTL', str(7 * 24 * 3600)))
+EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR', str(BASE_DIR / 'embedding_cache'))
+# Micro-batching: concurrent encode calls (search/match queries) share one forward
+# pass of up to N texts, waiting at most T ms for the batch to fill
+EMBEDDING_BATCHING = os.getenv('EMBEDDING_BATCHING', 'False') == 'True'
+EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv('EMBEDDING_BATCH_MAX_ITEMS', '32'))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv('EMBEDDING_BATCH_WAIT_MS', '5'))
 
 # FAISS Configuration
 FAISS_INDEX_PATH = BASE_DIR / 'faiss_indices'
+# Seconds between checks for an index generation persisted by another process
+FAISS_RELOAD_CHECK_INTERVAL = float(os.getenv('FAISS_RELOAD_CHECK_INTERVAL', '1.0'))
+# Index writes go to an append-only delta log, folded into a full checkpoint every N records
+FAISS_LOG_CHECKPOINT_RECORDS = int(os.getenv('FAISS_LOG_CHECKPOINT_RECORDS', '10000'))
+# Group commit for concurrent ingest: the index writer batches queued resumes
+# until N are pending or T ms pass (or no more arrive)
+FAISS_GROUP_COMMIT_MAX_ITEMS = int(os.getenv('FAISS_GROUP_COMMIT_MAX_ITEMS', '256'))
+FAISS_GROUP_COMMIT_WAIT_MS = int(os.getenv('FAISS_GROUP_COMMIT_WAIT_MS', '50'))
+# Web search serves a read-only, memory-mapped index shared by all workers on the host
+FAISS_MMAP_SEARCH = os.getenv('FAISS_MMAP_SEARCH', 'False') == 'True'
+# Index type: flat (exact), ivf (IVF-Flat), hnsw, or the compressed sq8 / pq.
+# Non-flat types are used once the corpus reaches FAISS_ANN_MIN_SIZE; below that
+# the exact flat index is kept.
+FAISS_INDEX_TYPE = os.getenv('FAISS_INDEX_TYPE', 'flat')
+FAISS_ANN_MIN_SIZE = int(os.getenv('FAISS_ANN_MIN_SIZE', '50000'))
+FAISS_IVF_NLIST = int(os.getenv('FAISS_IVF_NLIST', '0'))  # 0 = ~4*sqrt(corpus size)
+FAISS_IVF_NPROBE = int(os.getenv('FAISS_IVF_NPROBE', '16'))
+FAISS_HNSW_M = int(os.getenv('FAISS_HNSW_M', '32'))
+FAISS_HNSW_EF_CONSTRUCTION = int(os.getenv('FAISS_HNSW_EF_CONSTRUCTION', '80'))
+FAISS_HNSW_EF_SEARCH = int(os.getenv('FAISS_HNSW_EF_SEARCH', '64'))
+FAISS_PQ_M = int(os.getenv('FAISS_PQ_M', '48'))  # PQ bytes per vector
+# sq8/pq: fetch k * factor candidates and re-rank exactly from full vectors on disk (1 = off)
+FAISS_RERANK_FACTOR = int(os.getenv('FAISS_RERANK_FACTOR', '4'))
+# Background compaction reclaims tombstoned (deleted) slots once they exceed this share of the index
+FAISS_TOMBSTONE_COMPACT_FRACTION = float(os.getenv('FAISS_TOMBSTONE_COMPACT_FRACTION', '0.2'))
+# Sharding: none, hash (FAISS_SHARD_COUNT shards by resume id) or month (one shard per
+# created_at month, so time-bounded searches skip old shards). Changing it requires a rebuild.
+FAISS_SHARD_BY = os.getenv('FAISS_SHARD_BY', 'none')
+FAISS_SHARD_COUNT = int(os.getenv('FAISS_SHARD_COUNT', '8'))
+FAISS_SHARD_SEARCH_THREADS = int(os.getenv('FAISS_SHARD_SEARCH_THREADS', '8'))
+# Seconds between rebuilds of the skill -> resume bitmap index used by skill-filtered search
+FAISS_SKILL_INDEX_REFRESH = float(os.getenv('FAISS_SKILL_INDEX_REFRESH', '60'))
+# Most results a threshold (min_score) match may return
+FAISS_RANGE_MAX_RESULTS = int(os.getenv('FAISS_RANGE_MAX_RESULTS', '1000'))
+# Multi-node replication: one publisher writes snapshots to a shared dir, replicas poll it
+FAISS_REPLICATION_ROLE = os.getenv('FAISS_REPLICATION_ROLE', 'none')  # none | publisher | replica
+FAISS_REPLICATION_DIR = os.getenv('FAISS_REPLICATION_DIR', '')
+FAISS_REPLICATION_POLL_INTERVAL = float(os.getenv('FAISS_REPLICATION_POLL_INTERVAL', '10'))
+FAISS_REPLICATION_KEEP = int(os.getenv('FAISS_REPLICATION_KEEP', '3'))
+# Reverse matching: record each newly indexed resume's best-fit jobs (Resume.top_jobs)
+JOB_MATCH_ON_INDEX = os.getenv('JOB_MATCH_ON_INDEX', 'False') == 'True'
+JOB_MATCH_TOP_K = int(os.getenv('JOB_MATCH_TOP_K', '5'))
 
 # Logging
 LOGGING = {